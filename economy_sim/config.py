@@ -17,6 +17,155 @@ INVENTORY_DEPRECIATION = 0.10  # 10% of unsold goods rot per month
 # RL Parameters
 EPISODE_LENGTH = 360  # 30 Years (1 Step = 1 Month)
 WARMUP_STEPS = 50  # Steps to run before AI takes control
+OBS_SCALE_INVARIANT = False  # Per-household GDP/tax revenue/subsistence failures (existing checkpoints use totals)
+DECISION_INTERVAL = 1  # Months each action is held for (3 = quarterly, 12 = yearly policy)
+
+# Population Curriculum (train_ppo --curriculum): (from timestep, households, firms, episode length)
+CURRICULUM = (
+    (0, 20, 2, 120),
+    (30_000, 50, 5, 240),
+    (60_000, N_HOUSEHOLDS, N_FIRMS, EPISODE_LENGTH),
+)
+CURRICULUM_EVAL_SCALES = ((N_HOUSEHOLDS, N_FIRMS), (1000, 100))  # (households, firms) checked after training
+
+# PPO Hyperparameters (train_ppo defaults; hp_search explores HP_SEARCH_SPACE around them)
+PPO_HYPERPARAMS = {
+    "learning_rate": 0.0003,
+    "n_steps": 2048,
+    "batch_size": 64,
+    "n_epochs": 10,
+    "gamma": 0.99,
+    "gae_lambda": 0.95,
+    "clip_range": 0.2,
+}
+PIPELINE_ENVS = 8  # Worker envs for train_ppo --collector pipelined (split into two groups)
+
+# Cohort Mode (Representative Agents for Very Large Populations)
+COHORT_POPULATION = 10_000_000  # Real households represented by the cohorts
+COHORT_MAX_COUNT = 256  # Upper bound on cohorts kept after merging
+COHORT_SKILL_TOLERANCE = 0.01  # Relative skill band for merging (1%)
+COHORT_CASH_TOLERANCE = 0.05  # Relative cash/inventory/reservation wage band for merging (5%)
+COHORT_MIN_WEIGHT = 1e-9  # Smallest fraction of a model household worth keeping
+COHORT_MAX_DOUBLINGS = 16  # Band widenings per merge-key level before coarser discrete keys are tried
+
+# Distribution Summaries (Histograms + Quantile Sketches)
+# Field -> upper bound of the sketch range (log1p-spaced bins over [0, bound])
+DISTRIBUTION_RANGES = {
+    "cash": 1e9,
+    "skill": 100.0,
+    "wage": 1e7,
+    "reservation_wage": 1e7,
+    "inventory": 24.0,  # Household inventory cap
+}
+DISTRIBUTION_SKETCH_BINS = 2048  # Fine bins used for quantiles (~1% relative error on cash)
+DISTRIBUTION_HISTOGRAM_BINS = 16  # Coarse bins sent to the dashboard
+DISTRIBUTION_QUANTILES = (0.01, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.99)
+OBS_DISTRIBUTION_QUANTILES = (0.1, 0.5, 0.9)  # Appended per field when enabled in EconomyEnv
 
 # System
 RANDOM_SEED = 42
+FAST_FORWARD_REPORT_EVERY = 12  # Steps between summary frames while fast forwarding (1 Year)
+
+# Episode Archive (memory-mapped per-step records of every episode the server runs)
+ARCHIVE_ENABLED = True
+ARCHIVE_DIR = "archive"  # Relative to the project root
+ARCHIVE_KEEP_RUNS = 20  # Newest runs kept; older ones (and their ledgers) are deleted when a new run starts
+ARCHIVE_OPEN_READERS = 8  # Memory-mapped runs the server keeps open for SEEK / /archive reads
+
+# Startup Budgets (checked by launcher --startup-check)
+STARTUP_IMPORT_BUDGET_S = 1.5  # Importing the API server module (no torch)
+STARTUP_LISTEN_BUDGET_S = 3.0  # Process start until /ready answers
+STARTUP_READY_BUDGET_S = 30.0  # Process start until env + model are loaded
+
+# Precision Probe (EconomyEnv(float32_probe=True), see utils/precision_check.py)
+PRECISION_DRIFT_TOLERANCE = 0.01  # Relative gap at which a float32-probe run counts as diverged
+
+# Money Ledger (one row per flow, see envs/components/ledger.py)
+LEDGER_CHUNK_ROWS = 65536  # Rows buffered before a flush (~1.7 MB)
+LEDGER_TOLERANCE = 1e-9  # Relative balance mismatch tolerated by the conservation check
+AUDIT_ACTION = (0.25, 0.25, 0.25)  # Fixed normalized [income tax, corp tax, UBI] of the precision and ledger audits
+
+# Training Telemetry (UDP from the training process to the API server, see training/telemetry.py)
+TELEMETRY_HOST = "127.0.0.1"
+TELEMETRY_PORT = 8799
+TELEMETRY_QUEUE_SIZE = 1024  # Messages buffered by the trainer before the oldest are dropped
+TELEMETRY_POLL_S = 0.05  # Sender thread idle poll interval
+TELEMETRY_HISTORY = 200  # Messages kept by the API server for late-joining dashboards
+
+# Hyperparameter Search (training/hp_search.py)
+# Name -> ("log", low, high) | ("uniform", low, high) | ("int", low, high) | ("choice", options)
+HP_SEARCH_SPACE = {
+    "learning_rate": ("log", 1e-5, 1e-3),
+    "n_steps": ("choice", (256, 512, 1024, 2048)),
+    "batch_size": ("choice", (32, 64, 128, 256)),
+    "n_epochs": ("int", 3, 20),
+    "gamma": ("uniform", 0.9, 0.999),
+    "gae_lambda": ("uniform", 0.8, 1.0),
+    "clip_range": ("uniform", 0.1, 0.4),
+}
+HP_STUDY_PATH = "hp_study.db"  # SQLite file holding all trials (reused to resume)
+HP_TRIAL_TIMESTEPS = 50_000  # Training budget per trial
+HP_TRIAL_ENVS = 4  # Vectorized envs per trial
+HP_EVAL_EVERY = 5_000  # Timesteps between intermediate evaluations
+HP_EVAL_EPISODES = 2  # Deterministic episodes per evaluation
+HP_PRUNE_STARTUP_TRIALS = 4  # Other trials that must have reported at a step before pruning there
+HP_PRUNE_WARMUP_EVALS = 2  # Evaluations each trial gets before it can be pruned
+
+# Golden Trajectories (backend equivalence harness, see utils/golden.py)
+GOLDEN_DIR = "golden"  # manifest.json + one .npz per seed
+GOLDEN_SEEDS = (0, 1, 2)
+GOLDEN_STEPS = EPISODE_LENGTH
+GOLDEN_RTOL = 1e-9  # Relative tolerance when checking a backend against the golden files
+GOLDEN_ATOL = 1e-9  # Absolute tolerance (values near zero)
+
+# Surrogate Dynamics (learned macro transition for cheap pre-training, see training/surrogate.py)
+SURROGATE_PATH = "models/surrogate.npz"
+SURROGATE_KIND = "ridge"  # "ridge" (quadratic features) or "mlp"
+SURROGATE_EPISODES = 40  # Real episodes recorded for fitting
+SURROGATE_EVAL_EPISODES = 5  # Held-out real episodes for the error report
+SURROGATE_ACTION_SWITCH_P = 0.1  # Per-step chance the recording policy draws a new random action
+SURROGATE_RIDGE = 1e-4  # Ridge penalty (per sample)
+SURROGATE_HIDDEN = 64  # MLP hidden units
+SURROGATE_EPOCHS = 100  # MLP training epochs
+SURROGATE_EVAL_HORIZONS = (1, 12, 60, EPISODE_LENGTH)  # Open-loop rollout lengths reported
+SURROGATE_PRETRAIN_ENVS = 256  # Batched surrogate economies per PPO rollout
+SURROGATE_PRETRAIN_N_STEPS = 128  # PPO n_steps per surrogate economy
+SURROGATE_PRETRAIN_BATCH = 2048  # PPO minibatch size during pre-training
+
+# Checkpoint Store (deduplicated training checkpoints, see utils/checkpoint_store.py)
+CHECKPOINT_STORE_DIR = "store"  # Under the models directory (models/ppo/store)
+CHECKPOINT_CHUNK_BYTES = 1 << 16  # Fixed chunk size for deduplication
+CHECKPOINT_COMPRESS_LEVEL = 6  # zlib level for new chunks
+CHECKPOINT_EVERY = 10_000  # Timesteps (summed over envs) between checkpoints
+CHECKPOINT_EVAL_EPISODES = 1  # Deterministic episodes scored per checkpoint (0 = no score)
+
+# Batch RPC (headless env pools for external clients, see utils/batch_rpc.py)
+BATCH_RPC_MAX_ENVS = 256  # Envs across all pools
+BATCH_RPC_MAX_SNAPSHOTS = 1024  # Snapshots kept per pool (oldest dropped first)
+BATCH_RPC_MAX_HOUSEHOLDS = 10_000  # Per env (n_households)
+BATCH_RPC_MAX_FIRMS = 1_000  # Per env (n_firms)
+BATCH_RPC_MAX_EPISODE_LENGTH = 10 * EPISODE_LENGTH  # Months
+BATCH_RPC_MAX_COHORT_POPULATION = 1_000_000_000  # Real households represented in cohort mode
+
+# Resumable Training (train_ppo --resume, see training/resume.py)
+RESUME_DIR = "resume"  # Under the models directory (models/ppo/resume/<model name>)
+RESUME_EVERY = 20_000  # Env steps between resume checkpoints (taken between rollouts)
+RESUME_KEEP = 2  # Complete checkpoints kept per run
+TRAIN_TIMESTEPS = 100_000  # train_ppo's total timestep budget
+
+# Multi-Agent Firms (shared learned price/wage policy, see envs/multi_agent_env.py and training/train_firms.py)
+FIRM_PRICE_STEP = PRICE_STICKINESS  # Max relative price change per month (action = +/-1)
+FIRM_WAGE_STEP = 0.10  # Max relative wage offer change per month
+FIRM_PROFIT_SCALE = 100.0  # Firm reward = monthly profit / (avg price * FIRM_PROFIT_SCALE)
+FIRM_BANKRUPTCY_PENALTY = 5.0  # Subtracted from a firm's reward in the month it goes bankrupt
+FIRM_GOVT_ACTION = (0.25, 0.25, 0.0)  # Government action when no government policy is given
+FIRM_ECONOMIES = 8  # Parallel economies per firm-policy rollout
+FIRM_PPO_N_STEPS = 128  # PPO n_steps (per firm)
+FIRM_PPO_BATCH = 1024  # PPO minibatch size
+
+# Macro History (rolling macro features over a ring buffer, see envs/components/macro_history.py)
+MACRO_WINDOW = 12  # Months kept per env (rolling means and stds cover this window)
+MACRO_GROWTH_CLIP = 10.0  # Month-on-month growth rates (gdp_growth, inflation, wage_growth) clipped to +/- this
+MACRO_FEATURES = ()  # Appended to the observation, e.g. ("inflation", "inflation_std", "gdp_growth_mean"); () keeps the 7-metric obs
+MACRO_REWARD_WEIGHTS = {}  # Feature -> weight added to the monthly reward, e.g. {"inflation_std": -5.0}
+MACRO_DASHBOARD_FEATURES = ("inflation", "inflation_mean", "inflation_std", "gdp_growth", "gdp_growth_mean", "unemployment_mean")
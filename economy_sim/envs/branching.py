@@ -0,0 +1,125 @@
+import sys
+import multiprocessing as mp
+import numpy as np
+from typing import List, Dict, Optional
+
+# Env being branched. Set just before forking so every child inherits it
+# copy-on-write: only the pages a branch actually mutates get copied.
+_PARENT_ENV = None
+
+def _make_policy(spec: Dict, env, index: int, models_dir: Optional[str]):
+    """
+    Build an action function from a policy spec:
+        {"policy": "manual", "action": [income_tax, corp_tax, ubi]}
+        {"policy": "random", "seed": 0}
+        {"policy": "model", "name": "economy_ppo_final"}   (checkpoint in models_dir or its store)
+    A model decides every decision_interval months it was trained with and holds its action in between.
+    """
+    kind = spec.get("policy", "random")
+    if kind == "manual":
+        action = np.array(spec["action"], dtype=np.float32)
+        return lambda obs: action
+    if kind == "random":
+        rng = np.random.default_rng(spec.get("seed", index))
+        return lambda obs: rng.random(env.action_space.shape).astype(np.float32)
+    if kind == "model":
+        from economy_sim.utils.checkpoint_store import check_model_name, load_policy_by_name, model_decision_interval
+        check_model_name(spec["name"]) # Before paying for the torch import
+        # Imported in the worker only: torch is heavy and not fork-friendly to share
+        import torch
+        torch.set_num_threads(1)
+        model = load_policy_by_name(models_dir, spec["name"], device="cpu")
+        interval = model_decision_interval(models_dir, spec["name"])
+        decision = {}
+        def act(obs):
+            if not 0 <= env.current_step - decision.get("step", -interval) < interval:
+                decision.update(step=env.current_step, action=model.predict(obs, deterministic=True)[0])
+            return decision["action"]
+        return act
+    raise ValueError(f"Unknown branch policy: {kind}")
+
+def _run_branch(env, spec: Dict, horizon: int, index: int, models_dir: Optional[str]):
+    policy = _make_policy(spec, env, index, models_dir)
+    obs = env._get_observation()
+    trajectory = {"policy": spec, "steps": [], "actions": [], "rewards": [], "stats": []}
+
+    for _ in range(horizon):
+        action = policy(obs)
+        obs, reward, terminated, truncated, info = env.step(action)
+        stats = env.agent_manager.get_market_stats()
+        trajectory["steps"].append(int(env.current_step))
+        trajectory["actions"].append([float(a) for a in action])
+        trajectory["rewards"].append(float(reward))
+        trajectory["stats"].append({k: float(v) for k, v in stats.items()})
+        if terminated or truncated:
+            break
+
+    trajectory["total_reward"] = float(sum(trajectory["rewards"]))
+    return trajectory
+
+def _branch_worker(conn, spec, horizon, index, models_dir, snapshot):
+    try:
+        if snapshot is None:
+            env = _PARENT_ENV # Forked: private copy-on-write view of the parent env
+            env.agent_manager.ledger.path = None # Branch flows must not land in the parent's ledger files
+        else:
+            # Same class and constructor arguments as the parent (decision interval, observation layout, ...)
+            env_class, env_kwargs, blob = snapshot
+            env = env_class(**env_kwargs)
+            env.restore(blob)
+        conn.send(_run_branch(env, spec, horizon, index, models_dir))
+    except Exception as e:
+        conn.send({"policy": spec, "error": str(e)})
+    finally:
+        conn.close()
+
+class BranchJob:
+    """
+    K counterfactual branches running in worker processes.
+
+    Processes are started in the constructor (so the branch point is the env's
+    state at that moment); result() blocks until all trajectories are back.
+    horizon counts env steps (policy decisions): with decision_interval k a
+    branch runs horizon * k months, as env.step would, in both worker modes.
+    Workers are forked while torch is not loaded. Once it is (e.g. the server
+    has loaded a model), forking risks deadlocks in its thread pools, so, as
+    on platforms without fork, the env is snapshotted once and restored in
+    forkserver/spawn workers instead.
+    """
+
+    def __init__(self, env, policies: List[Dict], horizon: int, models_dir: Optional[str] = None):
+        global _PARENT_ENV
+        self.start_step = int(env.current_step)
+        self.horizon = int(horizon)
+        self.policies = policies
+
+        methods = mp.get_all_start_methods()
+        use_fork = "fork" in methods and "torch" not in sys.modules
+        ctx = mp.get_context("fork" if use_fork else "forkserver" if "forkserver" in methods else "spawn")
+        snapshot = None if use_fork else (type(env), env.constructor_kwargs(), env.snapshot())
+
+        self._workers = []
+        _PARENT_ENV = env
+        try:
+            for index, spec in enumerate(policies):
+                recv_conn, send_conn = ctx.Pipe(duplex=False)
+                process = ctx.Process(
+                    target=_branch_worker,
+                    args=(send_conn, spec, self.horizon, index, models_dir, snapshot),
+                    daemon=True
+                )
+                process.start()
+                send_conn.close()
+                self._workers.append((process, recv_conn))
+        finally:
+            _PARENT_ENV = None
+
+    def result(self) -> Dict:
+        branches = []
+        for process, conn in self._workers:
+            try:
+                branches.append(conn.recv())
+            except EOFError:
+                branches.append({"error": "Branch worker exited without a result"})
+            process.join()
+        return {"start_step": self.start_step, "horizon": self.horizon, "branches": branches}
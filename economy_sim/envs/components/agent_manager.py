@@ -1,14 +1,63 @@
 import numpy as np
-import random
-from typing import List, Dict
-from economy_sim.config import N_HOUSEHOLDS, N_FIRMS
+from typing import List, Dict, Optional
+from economy_sim.config import N_HOUSEHOLDS, N_FIRMS, DISTRIBUTION_RANGES
 from economy_sim.envs.components.household import Household
 from economy_sim.envs.components.firm import Firm
+from economy_sim.envs.components.distributions import build_sketches
+from economy_sim.envs.components.labor_market import ContractWheel
+from economy_sim.envs.components.ledger import (
+    Ledger, firm_account, GOVT_ACCOUNT, TAX_ACCOUNT, EXPENSES_ACCOUNT, MINT_ACCOUNT, FIRM_ACCOUNT_BASE
+)
+
+# Column accessors for vectorized views over agent state.
+# Keys match the fields returned by Household.get_state() / Firm.get_state().
+HOUSEHOLD_COLUMNS = {
+    "id": (lambda h: h.id, np.int64),
+    "cash": (lambda h: h.cash, np.float64),
+    "skill": (lambda h: h.skill, np.float64),
+    "employed": (lambda h: h.is_employed, np.bool_),
+    "wage": (lambda h: h.wage, np.float64),
+    "reservation_wage": (lambda h: h.reservation_wage, np.float64),
+    "subsistence_failed": (lambda h: h.subsistence_failed, np.bool_),
+    "contract_remaining": (lambda h: h.contract_remaining, np.int64),
+    "inventory": (lambda h: h.inventory, np.float64),
+}
+
+FIRM_COLUMNS = {
+    "id": (lambda f: f.id, np.int64),
+    "cash": (lambda f: f.cash, np.float64),
+    "inventory": (lambda f: f.inventory, np.float64),
+    "price": (lambda f: f.price, np.float64),
+    "wage_offer": (lambda f: f.wage_offer, np.float64),
+    "employees_count": (lambda f: round(f.headcount()), np.int64),
+    "bankruptcies": (lambda f: f.bankruptcies, np.int64),
+    "last_profit": (lambda f: f.last_profit, np.float64),
+    "tier": (lambda f: f.tier, np.int64),
+    "max_employees": (lambda f: f.max_employees, np.int64),
+}
+
+# Independent random streams, one per phase of AgentManager.step
+RNG_STREAMS = ("hiring", "firms", "shoppers", "search")
+
+# Phases of AgentManager.step, in order (names passed to phase_hook)
+PHASES = ("production", "labor_market", "goods_market", "welfare", "internal_updates", "update_stats")
+
+# Fields rounded to float32 after every step with float32_probe=True (see _round_to_float32)
+HOUSEHOLD_STATE_FIELDS = ("cash", "skill", "wage", "inventory")
+FIRM_STATE_FIELDS = ("cash", "inventory", "price", "wage_offer")
 
 class AgentManager:
-    def __init__(self):
-        self.households: List[Household] = [Household(i) for i in range(N_HOUSEHOLDS)]
-        self.firms: List[Firm] = [Firm(i) for i in range(N_FIRMS)]
+    float32_probe = False # Class default for managers pickled before the flag existed
+
+    def __init__(self, seed: Optional[int] = None, float32_probe: bool = False,
+                 n_households: int = N_HOUSEHOLDS, n_firms: int = N_FIRMS):
+        self.float32_probe = bool(float32_probe)
+        self.n_households = n_households
+        self.n_firms = n_firms
+        # Contract expiries + unemployed pool (everyone starts unemployed)
+        self.labor = ContractWheel()
+        self.households: List[Household] = self._initial_households()
+        self.firms: List[Firm] = self._initial_firms()
         
         # Global Market Stats (for Observation)
         self.total_tax_revenue = 0.0
@@ -19,6 +68,46 @@ class AgentManager:
         self.gini = 0.0
         self.subsistence_failures = 0
         self.govt_cash = 100000.0 # Initial Reserves (Buffer)
+        self.population_scale = 1.0 # Real households per entry weight (see CohortAgentManager)
+
+        # Per-phase RNG streams spawned from one seed, so envs are reproducible
+        # and each phase can draw in bulk without disturbing the others
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng: Dict[str, np.random.Generator] = {
+            name: np.random.default_rng(child)
+            for name, child in zip(RNG_STREAMS, self.seed_sequence.spawn(len(RNG_STREAMS)))
+        }
+
+        # Bumped after every step so cached column views can be invalidated cheaply
+        self.version = 0
+        self._column_cache = {}
+
+        # Every money flow, one row each (see components/ledger.py)
+        self.ledger = Ledger()
+
+        # Optional callback(phase_name, manager) after each phase of step() (see utils/golden.py)
+        self.phase_hook = None
+
+        # Learned firms (envs/multi_agent_env.py): prices and wages come from firm_actions
+        # ((n_firms, 2) in [-1, 1], applied at the start of the next step) instead of Firm heuristics
+        self.learned_firms = False
+        self.firm_actions: Optional[np.ndarray] = None
+
+        # float32 probe: float32 copies of the rounded fields, refreshed after every step
+        self.household_state: Optional[np.ndarray] = None
+        self.firm_state: Optional[np.ndarray] = None
+        if self.float32_probe:
+            self._round_to_float32()
+
+    def _initial_households(self) -> List[Household]:
+        households = [Household(i) for i in range(self.n_households)]
+        for h in households:
+            h.labor_market = self.labor
+            self.labor.unemployed.add(h.id)
+        return households
+
+    def _initial_firms(self) -> List[Firm]:
+        return [Firm(i) for i in range(self.n_firms)]
 
     def step(self, tax_rates: Dict[str, float]):
         """
@@ -34,7 +123,42 @@ class AgentManager:
         corp_tax = tax_rates.get("corp_tax", 0.0)
         ubi = tax_rates.get("ubi", 0.0)
 
+        self.ledger.begin_step(self.version)
+        if self.firm_actions is not None:
+            # Set this month's prices and wages before anyone trades on them
+            for f, (price_change, wage_change) in zip(self.firms, self.firm_actions):
+                f.apply_action(price_change, wage_change)
+            self.firm_actions = None
+        self._production(income_tax)
+        self._after_phase("production")
+        self._labor_market()
+        self._after_phase("labor_market")
+        self._goods_market()
+        self._after_phase("goods_market")
+        self._welfare(ubi)
+        self._after_phase("welfare")
+        self._internal_updates()
+        self._after_phase("internal_updates")
+        self._update_stats()
+        self._after_phase("update_stats")
+        self.labor.advance()
+        self.ledger.end_step()
+
+        # Invalidate cached column views
+        self.version += 1
+        self._column_cache = {}
+        if self.float32_probe:
+            self._round_to_float32()
+
+    def _after_phase(self, phase: str):
+        if self.phase_hook is not None:
+            self.phase_hook(phase, self)
+
+    def _production(self, income_tax: float):
+        """Firms produce with their employees' skill and pay wages (income tax withheld)."""
         # --- 1. Production ---
+        # Wage payments, recorded in one block at the end
+        payers, payees, net_wages, taxes = [], [], [], []
         for firm in self.firms:
             # Calculate total skill of employees
             total_skill = sum([h.skill for h in self.households if h.employer_id == firm.id])
@@ -57,24 +181,31 @@ class AgentManager:
                     h.cash += net_wage
                     h.wage = wage_payment # Track gross wage for stats
                     wage_bill += wage_payment
+                    payers.append(firm.id)
+                    payees.append(h.id)
+                    net_wages.append(net_wage)
+                    taxes.append(tax)
             
             # If firm can't pay wages, it's technically bankrupt/in debt
             # (Handled in firm.step() bankruptcy check)
+        
+        payer_accounts = firm_account(np.array(payers, dtype=np.int64))
+        self.ledger.record_many("wage", payer_accounts, payees, net_wages)
+        self.ledger.record_many("income_tax", payer_accounts, TAX_ACCOUNT, taxes)
 
+    def _labor_market(self):
+        """Job seekers (unemployed or contract expired) take the first acceptable offer."""
         # --- 2. Labor Market ---
         # Firms try to hire
         # Only unemployed OR those with expired contracts look for work
         # Exception: Poaching (if wage offer is > 1.5x current wage)
         
-        job_seekers = []
-        for h in self.households:
-            if not h.is_employed:
-                job_seekers.append(h)
-            elif h.contract_remaining <= 0:
-                job_seekers.append(h) # Contract expired, free agent
-            # Note: Poaching logic could go here, but let's keep it simple for Phase 1
+        # Unemployed pool + contracts expiring this month (free agents), in id order
+        job_seekers = [self.households[i] for i in self.labor.unemployed] + self.labor.pop_due()
+        job_seekers.sort(key=lambda h: h.id)
+        # Note: Poaching logic could go here, but let's keep it simple for Phase 1
         
-        random.shuffle(job_seekers)
+        self.rng["hiring"].shuffle(job_seekers)
         
         # Firms post vacancies
         hiring_firms = [f for f in self.firms if f.cash > f.wage_offer * 3]
@@ -85,7 +216,7 @@ class AgentManager:
         committed_budget = {f.id: 0.0 for f in hiring_firms}
         
         # Shuffle hiring firms to prevent Firm 0 from grabbing all workers
-        random.shuffle(hiring_firms)
+        self.rng["firms"].shuffle(hiring_firms)
 
         for h in job_seekers:
             # If already employed (contract expired), they have a current job
@@ -100,7 +231,7 @@ class AgentManager:
             
             for f in hiring_firms:
                 # Check if firm is at capacity
-                if len(f.employees) >= f.max_employees:
+                if f.headcount() >= f.max_employees:
                     continue
 
                 # Check if firm still has budget for THIS hire
@@ -125,6 +256,7 @@ class AgentManager:
                         old_employer.employees.remove(h.id)
                 
                 h.is_employed = True
+                self.labor.unemployed.discard(h.id)
                 h.employer_id = best_firm.id
                 h.wage = best_offer
                 h.contract_remaining = 6 # 6 Month Contract
@@ -135,9 +267,10 @@ class AgentManager:
                 # Stay with old employer, renew contract
                 # CHECK CAPACITY: If old employer is now full (e.g. downgraded tier), fire them
                 old_employer = next((f for f in self.firms if f.id == h.employer_id), None)
-                if old_employer and len(old_employer.employees) >= old_employer.max_employees:
+                if old_employer and old_employer.headcount() >= old_employer.max_employees:
                     # Laid off due to downsizing
                     h.is_employed = False
+                    self.labor.unemployed.add(h.id)
                     h.employer_id = None
                     h.wage = 0.0
                     h.contract_remaining = 0
@@ -152,16 +285,25 @@ class AgentManager:
             if f.id not in firms_who_hired:
                 f.failed_to_hire = True
 
+    def _goods_market(self):
+        """Households buy goods from a small random sample of firms."""
         # --- 3. Goods Market ---
         # Households go shopping
         total_sales = 0
         total_revenue = 0.0
         
         # Shuffle households to ensure fair access to cheap goods
-        shoppers = self.households[:]
-        random.shuffle(shoppers)
+        shopper_order = self.rng["shoppers"].permutation(len(self.households))
+        
+        # Search draws for the whole month in one go: each shopper visits the
+        # in-stock firms with the smallest keys (= uniform sample without replacement)
+        search_keys = self.rng["search"].random((len(self.households), len(self.firms)))
         
-        for h in shoppers:
+        # Purchases, recorded in one block at the end
+        buyers, sellers, amounts = [], [], []
+        
+        for i in shopper_order:
+            h = self.households[i]
             # Determine budget (Subsistence + Discretionary)
             # Simple rule: Spend 50% of cash above subsistence, plus subsistence
             budget = min(h.cash, 100.0 + (h.cash - 100.0) * 0.5) 
@@ -171,12 +313,13 @@ class AgentManager:
             
             # Limited Search: Consumer checks 3 random firms and picks the cheapest
             # This prevents "Winner Takes All" where the absolute cheapest firm sells out instantly
-            available_firms = [f for f in self.firms if f.inventory > 0]
-            if not available_firms: continue
+            available = [j for j, f in enumerate(self.firms) if f.inventory > 0]
+            if not available: continue
             
             # Sample up to 3 firms
-            search_size = min(len(available_firms), 3)
-            considered_firms = random.sample(available_firms, search_size)
+            search_size = min(len(available), 3)
+            picks = np.argsort(search_keys[i, available])[:search_size]
+            considered_firms = [self.firms[available[j]] for j in picks]
             
             # Sort by price (Rational choice within the sample)
             considered_firms.sort(key=lambda x: x.price)
@@ -203,7 +346,15 @@ class AgentManager:
                     spent += cost
                     total_sales += units_to_buy
                     total_revenue += cost
-                    
+                    buyers.append(h.id)
+                    sellers.append(f.id)
+                    amounts.append(cost)
+        
+        self.ledger.record_many("purchase", buyers, firm_account(np.array(sellers, dtype=np.int64)), amounts)
+
+    def _welfare(self, ubi: float):
+        """Pay UBI out of government reserves (austerity if it cannot be afforded)."""
+        # --- 4. Taxes & Welfare ---
         # Distribute UBI (Subject to Budget)
         # Calculate total needed
         total_ubi_needed = ubi * len(self.households)
@@ -221,10 +372,16 @@ class AgentManager:
         for h in self.households:
             h.cash += payout_per_person
             self.govt_cash -= payout_per_person
+        if payout_per_person != 0:
+            self.ledger.record_many("ubi", GOVT_ACCOUNT, np.arange(len(self.households)), payout_per_person) # ids == positions
             
         # Ensure we don't go negative due to float errors
+        if self.govt_cash < 0:
+            self.ledger.record("govt_floor", MINT_ACCOUNT, GOVT_ACCOUNT, -self.govt_cash)
         self.govt_cash = max(0.0, self.govt_cash)
 
+    def _internal_updates(self):
+        """Household/firm monthly updates, bankruptcies and revival grants."""
         # --- 5. Internal Updates ---
         # Calculate Inflation Rate (Current Avg Price vs Last Avg Price)
         current_avg_price = np.mean([f.price for f in self.firms])
@@ -236,12 +393,7 @@ class AgentManager:
         for f in self.firms:
             # Handle Bankruptcy
             if f.cash < 0:
-                for emp_id in f.employees:
-                    emp = self.households[emp_id]
-                    emp.is_employed = False
-                    emp.employer_id = None
-                    emp.wage = 0.0
-                    emp.contract_remaining = 0 # Void contract
+                self._release_employees(f)
                 
                 # Restructure with Govt Bailout logic
                 # Calculate needed bailout
@@ -252,16 +404,20 @@ class AgentManager:
                 if self.govt_cash >= bailout_needed:
                     bailout_amount = bailout_needed
                     self.govt_cash -= bailout_needed
+                    self.ledger.record("bailout", GOVT_ACCOUNT, firm_account(f.id), bailout_amount)
                 else:
                     # Govt is broke: Emergency Fed Printing (Inflationary Bailout)
                     # We MUST give enough to survive, or they die instantly again.
                     # Grant 3 months of wages + small buffer
                     bailout_amount = max(20000.0, f.wage_offer * 3)
                     # Do not deduct from govt_cash (it goes negative/printed)
+                    self.ledger.record("printed_bailout", MINT_ACCOUNT, firm_account(f.id), bailout_amount)
                 
+                self.ledger.record("debt_write_off", MINT_ACCOUNT, firm_account(f.id), -f.cash)
                 f._restructure(bailout_amount)
             else:
-                f.step()
+                f.step(heuristic_pricing=not self.learned_firms)
+                self._record_firm_costs(f)
 
         # --- Bailout / Startup Logic ---
         active_firms = [f for f in self.firms if f.cash > 0]
@@ -272,14 +428,21 @@ class AgentManager:
                     grant = 20000.0
                     if self.govt_cash >= grant:
                         self.govt_cash -= grant
-                    # Else: Free grant (Emergency)
+                        self.ledger.record("grant", GOVT_ACCOUNT, firm_account(f.id), grant)
+                    else:
+                        # Free grant (Emergency)
+                        self.ledger.record("printed_grant", MINT_ACCOUNT, firm_account(f.id), grant)
                     
+                    if f.cash != 0:
+                        self.ledger.record("debt_write_off", MINT_ACCOUNT, firm_account(f.id), -f.cash)
                     f._restructure(grant)
                     if len([x for x in self.firms if x.cash > 0]) >= 2:
                         break
 
+    def _update_stats(self):
+        """Recompute the market statistics used for observations."""
         # --- Stats Update ---
-        self.unemployment_rate = len([h for h in self.households if not h.is_employed]) / N_HOUSEHOLDS
+        self.unemployment_rate = len(self.labor.unemployed) / self.n_households
         self.avg_price = np.mean([f.price for f in self.firms])
         self.avg_wage = np.mean([f.wage_offer for f in self.firms])
         
@@ -297,6 +460,16 @@ class AgentManager:
         # Subsistence Failures
         self.subsistence_failures = len([h for h in self.households if h.subsistence_failed])
 
+    def _release_employees(self, firm: Firm):
+        """Lay off everyone at a bankrupt firm."""
+        for emp_id in firm.employees:
+            emp = self.households[emp_id]
+            emp.is_employed = False
+            self.labor.unemployed.add(emp.id)
+            emp.employer_id = None
+            emp.wage = 0.0
+            emp.contract_remaining = 0 # Void contract
+
     def _calculate_gini(self, wealths):
         """Calculate Gini coefficient of a list of wealths."""
         if not wealths: return 0.0
@@ -307,6 +480,100 @@ class AgentManager:
         index = np.arange(1, n + 1)
         return ((2 * index - n - 1) * wealths).sum() / (n * total_wealth)
 
+    def _record_firm_costs(self, f: Firm):
+        """Overhead and upgrade paid by a firm in Firm.step() (both leave the economy)."""
+        if f.last_overhead:
+            self.ledger.record("overhead", firm_account(f.id), EXPENSES_ACCOUNT, f.last_overhead)
+        if f.last_upgrade_cost:
+            self.ledger.record("upgrade", firm_account(f.id), EXPENSES_ACCOUNT, f.last_upgrade_cost)
+
+    def money_supply(self) -> float:
+        """Cash held by households (weighted), firms and the government."""
+        weights = self.household_weights()
+        household_cash = self.household_column("cash")
+        if weights is not None:
+            household_cash = household_cash * weights
+        return float(household_cash.sum()) + sum(f.cash for f in self.firms) + self.govt_cash
+
+    def net_money_flow(self) -> float:
+        """Expected change of money_supply() over the last step, from the ledger."""
+        return self.ledger.net_money_flow()
+
+    def account_balances(self):
+        """(ledger accounts, balances) of every money holder (see ledger.conservation_errors)."""
+        accounts = np.concatenate([self.household_column("id"),
+                                   self.firm_column("id") + FIRM_ACCOUNT_BASE, [GOVT_ACCOUNT]])
+        balances = np.concatenate([self.household_column("cash").astype(np.float64),
+                                   self.firm_column("cash").astype(np.float64), [self.govt_cash]])
+        return accounts, balances
+
+    def _round_to_float32(self):
+        """
+        Precision-sensitivity probe: after every step the state fields are
+        rounded to float32 and written back, so the next step continues from
+        the rounded values and utils/precision_check.py can measure how far
+        the economy drifts. It is not a storage format: the agents keep their
+        Python floats, nothing shrinks and the extra pass makes a step slower.
+        The float32 arrays also back household_column()/firm_column() for
+        these fields.
+        """
+        self.household_state = np.array(
+            [[getattr(h, k) for k in HOUSEHOLD_STATE_FIELDS] for h in self.households], dtype=np.float32
+        ).reshape(len(self.households), len(HOUSEHOLD_STATE_FIELDS))
+        self.firm_state = np.array(
+            [[getattr(f, k) for k in FIRM_STATE_FIELDS] for f in self.firms], dtype=np.float32
+        ).reshape(len(self.firms), len(FIRM_STATE_FIELDS))
+
+        for agents, fields, state, kind in ((self.households, HOUSEHOLD_STATE_FIELDS, self.household_state, "households"),
+                                            (self.firms, FIRM_STATE_FIELDS, self.firm_state, "firms")):
+            for agent, row in zip(agents, state.tolist()):
+                for k, value in zip(fields, row):
+                    setattr(agent, k, value)
+            for i, k in enumerate(fields):
+                self._column_cache[(kind, k)] = state[:, i]
+
+    def get_rng_state(self):
+        """Bit generator state of every stream (for snapshots)."""
+        return {name: rng.bit_generator.state for name, rng in self.rng.items()}
+
+    def set_rng_state(self, state):
+        for name, rng_state in state.items():
+            self.rng[name].bit_generator.state = rng_state
+
+    def household_weights(self) -> Optional[np.ndarray]:
+        """Households represented by each entry of self.households (None: one each)."""
+        return None
+
+    def household_column(self, field: str) -> np.ndarray:
+        """Return one get_state() field for all households as an array (cached per step)."""
+        return self._column("households", HOUSEHOLD_COLUMNS, self.households, field)
+
+    def firm_column(self, field: str) -> np.ndarray:
+        """Return one get_state() field for all firms as an array (cached per step)."""
+        return self._column("firms", FIRM_COLUMNS, self.firms, field)
+
+    def distribution_sketches(self):
+        """Quantile sketches of household cash/skill/wage/reservation_wage/inventory (cached per step)."""
+        if "sketches" not in self._column_cache:
+            self._column_cache["sketches"] = build_sketches(
+                {field: self.household_column(field) for field in DISTRIBUTION_RANGES},
+                self.household_weights()
+            )
+        return self._column_cache["sketches"]
+
+    def get_distribution_summaries(self):
+        """Fixed-size histogram + quantile block per household field."""
+        return {field: sketch.summary() for field, sketch in self.distribution_sketches().items()}
+
+    def _column(self, kind, columns, agents, field):
+        key = (kind, field)
+        if key not in self._column_cache:
+            if field not in columns:
+                raise KeyError(f"Unknown {kind} field: {field}")
+            getter, dtype = columns[field]
+            self._column_cache[key] = np.fromiter((getter(a) for a in agents), dtype=dtype, count=len(agents))
+        return self._column_cache[key]
+
     def get_market_stats(self):
         return {
             "unemployment": self.unemployment_rate,
@@ -0,0 +1,91 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+from economy_sim.config import (
+    DISTRIBUTION_RANGES,
+    DISTRIBUTION_SKETCH_BINS,
+    DISTRIBUTION_HISTOGRAM_BINS,
+    DISTRIBUTION_QUANTILES
+)
+
+class QuantileSketch:
+    """
+    Fixed-bin streaming quantile sketch.
+
+    Values are counted into DISTRIBUTION_SKETCH_BINS bins spaced evenly in log1p
+    space over [0, max_value], so memory is constant no matter how many agents
+    are fed in (update() can be called once per chunk). Quantiles are read off the
+    cumulative counts with linear interpolation inside a bin; the coarse
+    dashboard histogram is the same counts merged into fewer bins.
+    """
+
+    def __init__(self, max_value: float, n_bins: int = DISTRIBUTION_SKETCH_BINS):
+        self.n_bins = n_bins
+        self._log_max = np.log1p(max_value)
+        self.edges = np.expm1(np.linspace(0.0, self._log_max, n_bins + 1))
+        self.reset()
+
+    def reset(self):
+        self.counts = np.zeros(self.n_bins, dtype=np.float64)
+        self.n = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray, weights: Optional[np.ndarray] = None):
+        """Add values (optionally weighted, e.g. cohort sizes)."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        if weights is None:
+            weights = np.ones_like(values)
+        # Bin index in log1p space; out of range values land in the edge bins
+        scaled = np.log1p(np.clip(values, 0.0, None)) * (self.n_bins / self._log_max)
+        idx = np.clip(scaled.astype(np.int64), 0, self.n_bins - 1)
+        self.counts += np.bincount(idx, weights=weights, minlength=self.n_bins)
+
+        self.n += float(weights.sum())
+        self.total += float((values * weights).sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        if self.n == 0:
+            return np.zeros(len(qs))
+        cum = np.cumsum(self.counts)
+        targets = np.asarray(qs, dtype=np.float64) * self.n
+        idx = np.clip(np.searchsorted(cum, targets, side="left"), 0, self.n_bins - 1)
+
+        # Interpolate inside the bin
+        below = np.where(idx > 0, cum[idx - 1], 0)
+        in_bin = np.where(self.counts[idx] > 0, self.counts[idx], 1.0)
+        frac = np.clip((targets - below) / in_bin, 0.0, 1.0)
+        values = self.edges[idx] + frac * (self.edges[idx + 1] - self.edges[idx])
+        return np.clip(values, self.min, self.max)
+
+    def histogram(self, n_bins: int = DISTRIBUTION_HISTOGRAM_BINS):
+        """Coarse histogram (merged sketch bins). n_bins must divide the sketch bin count."""
+        step = self.n_bins // n_bins
+        return self.edges[::step], self.counts.reshape(n_bins, step).sum(axis=1)
+
+    def summary(self, qs: Sequence[float] = DISTRIBUTION_QUANTILES) -> Dict:
+        edges, counts = self.histogram()
+        return {
+            "n": float(self.n),
+            "mean": float(self.total / self.n) if self.n else 0.0,
+            "min": float(self.min) if self.n else 0.0,
+            "max": float(self.max) if self.n else 0.0,
+            "quantiles": {f"p{int(round(q * 100))}": float(v) for q, v in zip(qs, self.quantiles(qs))},
+            "histogram": {
+                "edges": [float(e) for e in edges],
+                "counts": [float(c) for c in counts]
+            }
+        }
+
+def build_sketches(columns: Dict[str, np.ndarray], weights: Optional[np.ndarray] = None) -> Dict[str, QuantileSketch]:
+    """Build one sketch per field in DISTRIBUTION_RANGES from the given value arrays."""
+    sketches = {}
+    for field, max_value in DISTRIBUTION_RANGES.items():
+        sketch = QuantileSketch(max_value)
+        sketch.update(columns[field], weights)
+        sketches[field] = sketch
+    return sketches
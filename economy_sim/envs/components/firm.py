@@ -5,7 +5,9 @@ from economy_sim.config import (
     PRICE_STICKINESS,
     HIRING_BUFFER_MONTHS,
     INVENTORY_DEPRECIATION,
-    WAGE_FLOOR
+    WAGE_FLOOR,
+    FIRM_PRICE_STEP,
+    FIRM_WAGE_STEP
 )
 
 # Tier Definitions
@@ -18,6 +20,8 @@ TIER_CONFIG = {
 }
 
 class Firm:
+    total_upgrade_cost = 0.0 # Class default for firms pickled before the running total existed
+
     def __init__(self, agent_id: int):
         self.id = agent_id
         self.cash = INITIAL_CASH_FIRM
@@ -38,8 +42,11 @@ class Firm:
         self.last_sales = 0.0
         self.total_sales_revenue = 0.0
         self.starting_cash = self.cash # Track cash at start of step for profit calc
+        self.last_overhead = 0.0 # Paid out of the economy this step (money sink)
+        self.last_upgrade_cost = 0.0 # Likewise
+        self.total_upgrade_cost = 0.0 # Running total of last_upgrade_cost (see envs/multi_agent_env.py)
 
-    def step(self):
+    def step(self, heuristic_pricing: bool = True):
         """
         Monthly update loop.
         1. Pay Overhead (Tier Maintenance).
@@ -48,6 +55,8 @@ class Firm:
         4. Adjust Prices (Sticky).
         5. Adjust Wages (Hiring Budget).
         6. Check Bankruptcy.
+        With heuristic_pricing=False, steps 4 and 5 are skipped: price and wage
+        come from apply_action() instead (learned firm policy).
         """
         # 0. Pay Fixed Overhead (Infrastructure Cost)
         overhead = TIER_CONFIG[self.tier]["overhead"]
@@ -57,13 +66,27 @@ class Firm:
         price_ratio = max(1.0, self.price / 10.0)
         scaled_overhead = overhead * (price_ratio ** 0.5) 
         self.cash -= scaled_overhead
+        self.last_overhead = scaled_overhead
 
         # 1. Attempt Upgrade
+        self.last_upgrade_cost = 0.0
         self._attempt_upgrade()
 
         # 2. Depreciation (Rot)
         self.inventory *= (1.0 - INVENTORY_DEPRECIATION)
-        
+
+        if heuristic_pricing:
+            self._adjust_price_and_wage()
+        self.failed_to_hire = False 
+
+        # 5. Bankruptcy Check
+        # Return True if bankrupt, Manager handles the rest
+        if self.cash < 0:
+            return True
+        return False
+
+    def _adjust_price_and_wage(self):
+        """Heuristic price (sticky, inventory-driven) and wage (hiring budget) updates."""
         # 3. Pricing Logic (Supply/Demand)
         target_price = self.price
         safe_last_sales = max(self.last_sales, 0.1)
@@ -89,7 +112,7 @@ class Firm:
 
         # 4. Wage/Hiring Logic
         can_afford_hire = self.cash > (self.wage_offer * HIRING_BUFFER_MONTHS)
-        at_capacity = len(self.employees) >= self.max_employees
+        at_capacity = self.headcount() >= self.max_employees
         
         # Calculate Sustainable Wage (Revenue per worker)
         # Production ~ AVG_PRODUCTIVITY (diminishing returns ignored for simplicity of estimation)
@@ -111,13 +134,18 @@ class Firm:
         # Hard Cap to prevent death spirals
         self.wage_offer = min(self.wage_offer, sustainable_wage)
         self.wage_offer = max(WAGE_FLOOR, self.wage_offer)
-        self.failed_to_hire = False 
 
-        # 5. Bankruptcy Check
-        # Return True if bankrupt, Manager handles the rest
-        if self.cash < 0:
-            return True
-        return False
+    def apply_action(self, price_change: float, wage_change: float):
+        """
+        Learned pricing: actions in [-1, 1] move the price by up to FIRM_PRICE_STEP
+        and the wage offer by up to FIRM_WAGE_STEP (relative), same floors as the heuristics.
+        """
+        self.price = max(0.1, self.price * (1.0 + FIRM_PRICE_STEP * float(np.clip(price_change, -1.0, 1.0))))
+        self.wage_offer = max(WAGE_FLOOR, self.wage_offer * (1.0 + FIRM_WAGE_STEP * float(np.clip(wage_change, -1.0, 1.0))))
+
+    def headcount(self) -> float:
+        """Number of workers employed (one per entry in self.employees)."""
+        return len(self.employees)
 
     def _attempt_upgrade(self):
         """
@@ -135,6 +163,8 @@ class Firm:
         
         if self.cash > scaled_cost * 1.5:
             self.cash -= scaled_cost
+            self.last_upgrade_cost = scaled_cost
+            self.total_upgrade_cost += scaled_cost
             self.tier = next_tier
             self.max_employees = TIER_CONFIG[next_tier]["max_emp"]
             # print(f"Firm {self.id} upgraded to Tier {self.tier}!")
@@ -174,7 +204,7 @@ class Firm:
             "inventory": float(self.inventory),
             "price": float(self.price),
             "wage_offer": float(self.wage_offer),
-            "employees_count": int(len(self.employees)),
+            "employees_count": int(round(self.headcount())),
             "bankruptcies": int(self.bankruptcies),
             "last_profit": float(self.last_profit),
             "tier": int(self.tier), # Added
@@ -16,12 +16,31 @@ class Household:
         self.reservation_wage = WAGE_FLOOR
         self.is_employed = False
         self.months_unemployed = 0
-        self.contract_remaining = 0 # Months left on contract
+        # Months left on contract. Counted down in step() unless the household is
+        # attached to a ContractWheel (labor_market), which then tracks the expiry month.
+        self.labor_market = None
+        self.contract_expiry = 0
+        self._contract_remaining = 0
         
         # Metrics for dashboard
         self.last_consumption = 0.0
         self.subsistence_failed = False
 
+    @property
+    def contract_remaining(self) -> int:
+        if self.labor_market is None:
+            return self._contract_remaining
+        return max(0, self.contract_expiry - self.labor_market.month)
+
+    @contract_remaining.setter
+    def contract_remaining(self, months: int):
+        if self.labor_market is None:
+            self._contract_remaining = months
+            return
+        self.contract_expiry = self.labor_market.month + months
+        if months > 0:
+            self.labor_market.schedule(self)
+
     def step(self, inflation_rate: float = 0.0):
         """
         Daily/Monthly update loop.
@@ -36,8 +55,8 @@ class Household:
         if self.is_employed:
             self.skill *= 1.001  # +0.1% per month (~1.2% per year)
             self.months_unemployed = 0
-            if self.contract_remaining > 0:
-                self.contract_remaining -= 1
+            if self.labor_market is None and self._contract_remaining > 0:
+                self._contract_remaining -= 1
         else:
             self.months_unemployed += 1
             if self.months_unemployed > 12:
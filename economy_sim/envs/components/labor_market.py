@@ -0,0 +1,36 @@
+from typing import Dict, List, Set
+
+class ContractWheel:
+    """
+    Labor market bookkeeping that scales with turnover rather than population.
+
+    Contract expiries are kept in a bucket queue keyed by absolute month, so
+    each month only the households whose contracts end now are touched, and
+    the unemployed pool is a maintained set of household ids. Households read
+    their contract_remaining off the wheel's clock instead of counting down.
+    """
+
+    def __init__(self):
+        self.month = 0
+        self.unemployed: Set[int] = set()
+        self._buckets: Dict[int, List] = {}
+
+    def schedule(self, household):
+        """Queue a household for its (already set) contract_expiry month."""
+        self._buckets.setdefault(household.contract_expiry, []).append(household)
+
+    def pop_due(self) -> List:
+        """
+        Employed households whose contract expires this month.
+        Stale entries (renewed, laid off or rescheduled since) are dropped.
+        """
+        due = []
+        seen = set()
+        for h in self._buckets.pop(self.month, []):
+            if h.is_employed and h.contract_expiry == self.month and h.id not in seen:
+                seen.add(h.id)
+                due.append(h)
+        return due
+
+    def advance(self):
+        self.month += 1
@@ -0,0 +1,241 @@
+import os
+import json
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from economy_sim.config import LEDGER_CHUNK_ROWS, LEDGER_TOLERANCE
+
+# Flow kinds (stored as int8 codes = position in this tuple)
+LEDGER_KINDS = (
+    "wage",             # firm -> household, net of income tax
+    "income_tax",       # firm -> TAX (withheld at source)
+    "purchase",         # household -> firm
+    "ubi",              # govt -> household (austerity payouts included)
+    "overhead",         # firm -> EXPENSES (tier maintenance)
+    "upgrade",          # firm -> EXPENSES (tier upgrade cost)
+    "bailout",          # govt -> firm (bankruptcy restructuring out of reserves)
+    "grant",            # govt -> firm (revival grant out of reserves)
+    "printed_bailout",  # MINT -> firm (govt could not afford the bailout)
+    "printed_grant",    # MINT -> firm (govt could not afford the grant)
+    "debt_write_off",   # MINT -> firm (negative cash forgiven on restructuring)
+    "govt_floor",       # MINT -> govt (govt_cash clamped at 0)
+)
+KIND_CODES = {kind: code for code, kind in enumerate(LEDGER_KINDS)}
+
+# The explicit printing points: the only flows allowed to create money
+MONEY_SOURCES = ("printed_bailout", "printed_grant", "debt_write_off", "govt_floor")
+# Flows that leave the economy (households + firms + govt_cash)
+MONEY_SINKS = ("income_tax", "overhead", "upgrade")
+
+# Accounts: households by id, firms offset by FIRM_ACCOUNT_BASE, the rest negative
+FIRM_ACCOUNT_BASE = 1 << 32
+GOVT_ACCOUNT = -1
+TAX_ACCOUNT = -2        # Withheld income tax (not paid back into govt_cash by the model)
+EXPENSES_ACCOUNT = -3   # Overhead and upgrades paid outside the simulated economy
+MINT_ACCOUNT = -4       # Where printed money comes from
+HOUSEHOLD_POOL = -5     # All households at once (cohort mode, where cohort ids are transient)
+EXTERNAL_ACCOUNTS = (TAX_ACCOUNT, EXPENSES_ACCOUNT, MINT_ACCOUNT)
+
+COLUMNS = (("step", np.int64), ("kind", np.int8), ("source", np.int64), ("sink", np.int64), ("amount", np.float64))
+
+def firm_account(firm_id):
+    return FIRM_ACCOUNT_BASE + firm_id
+
+def describe_account(account: int) -> str:
+    names = {GOVT_ACCOUNT: "govt", TAX_ACCOUNT: "tax", EXPENSES_ACCOUNT: "expenses",
+             MINT_ACCOUNT: "mint", HOUSEHOLD_POOL: "households"}
+    if account in names:
+        return names[account]
+    if account >= FIRM_ACCOUNT_BASE:
+        return f"firm {account - FIRM_ACCOUNT_BASE}"
+    return f"household {account}"
+
+class Ledger:
+    """
+    Columnar record of every money flow: (step, kind, source, sink, amount) rows
+    in preallocated typed arrays.
+
+    Bulk flows (wages, purchases, UBI) are written a block at a time with
+    record_many(); rare ones (overhead, bailouts, ...) with record(). Per-kind
+    totals are kept for the current step. With a directory attached, rows and
+    per-step totals are appended to raw column files whenever a chunk fills up
+    (at step boundaries); without one, full chunks are dropped and only the
+    totals of the last step are kept, so the ledger can stay on indefinitely.
+    Chunks are flushed when the next step begins, so the rows of the last
+    finished step stay readable (step_rows()) until then.
+    """
+
+    def __init__(self, path: Optional[str] = None, chunk_rows: int = LEDGER_CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self._columns = {name: np.zeros(chunk_rows, dtype=dtype) for name, dtype in COLUMNS}
+        self._n = 0
+        self._step_start = 0
+        self.step = 0
+        self.totals = np.zeros(len(LEDGER_KINDS))  # Current (or last finished) step, per kind
+        self._pending_totals: List[np.ndarray] = []  # (step, *totals) rows not yet on disk
+        self.path = None
+        if path is not None:
+            self.open(path)
+
+    def open(self, path: str):
+        """Start appending chunks to raw column files in `path`."""
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"kinds": LEDGER_KINDS, "columns": [name for name, _ in COLUMNS],
+                       "firm_account_base": FIRM_ACCOUNT_BASE}, f)
+        self.path = path
+
+    # --- Recording ---
+
+    def begin_step(self, step: int):
+        if self._n >= self.chunk_rows:
+            self.flush()
+        self.step = step
+        self._step_start = self._n
+        self.totals = np.zeros(len(LEDGER_KINDS))
+
+    def record(self, kind: str, source: int, sink: int, amount: float):
+        if self._n == len(self._columns["amount"]):
+            self._grow(1)
+        n = self._n
+        code = KIND_CODES[kind]
+        cols = self._columns
+        cols["step"][n] = self.step
+        cols["kind"][n] = code
+        cols["source"][n] = source
+        cols["sink"][n] = sink
+        cols["amount"][n] = amount
+        self.totals[code] += amount
+        self._n = n + 1
+
+    def record_many(self, kind: str, sources, sinks, amounts):
+        """Record a block of flows of one kind; scalar arguments are broadcast."""
+        sizes = [len(v) for v in (sources, sinks, amounts) if hasattr(v, "__len__")]
+        count = sizes[0] if sizes else 1
+        if count == 0:
+            return
+        if self._n + count > len(self._columns["amount"]):
+            self._grow(count)
+        n, end = self._n, self._n + count
+        code = KIND_CODES[kind]
+        cols = self._columns
+        cols["step"][n:end] = self.step
+        cols["kind"][n:end] = code
+        cols["source"][n:end] = sources
+        cols["sink"][n:end] = sinks
+        cols["amount"][n:end] = amounts
+        self.totals[code] += cols["amount"][n:end].sum()
+        self._n = end
+
+    def end_step(self):
+        self._pending_totals.append(np.concatenate([[self.step], self.totals]))
+
+    def _grow(self, needed: int):
+        # Steps never straddle a flush, so a busy step grows the chunk instead
+        size = max(2 * len(self._columns["amount"]), self._n + needed)
+        for name, column in self._columns.items():
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:self._n] = column[:self._n]
+            self._columns[name] = grown
+
+    def flush(self):
+        """Write the recorded steps to disk (if a directory is attached) and free the chunk."""
+        if self.path is not None:
+            for name, _ in COLUMNS:
+                with open(os.path.join(self.path, f"{name}.bin"), "ab") as f:
+                    f.write(self._columns[name][:self._n].tobytes())
+            if self._pending_totals:
+                with open(os.path.join(self.path, "totals.f64"), "ab") as f:
+                    f.write(np.array(self._pending_totals, dtype=np.float64).tobytes())
+        self._pending_totals = []
+        if len(self._columns["amount"]) != self.chunk_rows:
+            self._columns = {name: np.zeros(self.chunk_rows, dtype=dtype) for name, dtype in COLUMNS}
+        self._n = 0
+        self._step_start = 0
+
+    def close(self):
+        self.flush()
+
+    def __getstate__(self):
+        # Snapshots carry only the recorded rows and never write to this ledger's files
+        state = self.__dict__.copy()
+        state["_columns"] = {name: column[:self._n].copy() for name, column in self._columns.items()}
+        state["path"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        size = max(self.chunk_rows, self._n)
+        for name, rows in list(self._columns.items()):
+            column = np.zeros(size, dtype=rows.dtype)
+            column[:self._n] = rows
+            self._columns[name] = column
+
+    # --- Reading ---
+
+    def step_rows(self) -> Dict[str, np.ndarray]:
+        """Rows of the current (or last finished) step, as column views."""
+        return {name: column[self._step_start:self._n] for name, column in self._columns.items()}
+
+    def step_totals(self) -> Dict[str, float]:
+        return dict(zip(LEDGER_KINDS, self.totals.tolist()))
+
+    def net_money_flow(self) -> float:
+        """Money created minus money destroyed in the current (or last finished) step."""
+        return float(sum(self.totals[KIND_CODES[k]] for k in MONEY_SOURCES)
+                     - sum(self.totals[KIND_CODES[k]] for k in MONEY_SINKS))
+
+def read_ledger(path: str) -> Dict[str, np.ndarray]:
+    """Memory-map the column files of a flushed ledger (plus 'totals': (steps, 1 + kinds))."""
+    data = {}
+    for name, dtype in COLUMNS:
+        file_path = os.path.join(path, f"{name}.bin")
+        size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        data[name] = np.memmap(file_path, dtype=dtype, mode="r") if size else np.zeros(0, dtype=dtype)
+    n_rows = min(len(column) for column in data.values())
+    data = {name: column[:n_rows] for name, column in data.items()}
+
+    totals_path = os.path.join(path, "totals.f64")
+    width = 1 + len(LEDGER_KINDS)
+    if os.path.exists(totals_path) and os.path.getsize(totals_path):
+        totals = np.memmap(totals_path, dtype=np.float64, mode="r")
+        data["totals"] = totals[:len(totals) // width * width].reshape(-1, width)
+    else:
+        data["totals"] = np.zeros((0, width))
+    return data
+
+def conservation_errors(rows: Dict[str, np.ndarray], before: Tuple[np.ndarray, np.ndarray],
+                        after: Tuple[np.ndarray, np.ndarray], tolerance: float = LEDGER_TOLERANCE) -> List[str]:
+    """
+    Check one step's rows against the account balances (accounts, balances)
+    taken before and after it. Every balance change must be explained by the
+    rows, and only the explicit printing points may draw on the mint (no flow
+    may come out of the tax or expenses accounts). Returns the problems found.
+    """
+    problems = []
+    kinds, sources = rows["kind"], rows["source"]
+    printing = np.isin(kinds, [KIND_CODES[k] for k in MONEY_SOURCES])
+    for i in np.flatnonzero((sources == MINT_ACCOUNT) != printing):
+        problems.append(f"{LEDGER_KINDS[kinds[i]]} flow from {describe_account(int(sources[i]))}")
+    for i in np.flatnonzero(np.isin(sources, (TAX_ACCOUNT, EXPENSES_ACCOUNT))):
+        problems.append(f"{LEDGER_KINDS[kinds[i]]} flow out of {describe_account(int(sources[i]))}")
+
+    # Net flow per internal account vs its balance change
+    accounts = np.union1d(before[0], after[0])
+    change = np.zeros(len(accounts))
+    np.add.at(change, np.searchsorted(accounts, after[0]), after[1])
+    np.subtract.at(change, np.searchsorted(accounts, before[0]), before[1])
+
+    flow = np.zeros(len(accounts))
+    for column, sign in (("sink", 1.0), ("source", -1.0)):
+        ends = rows[column]
+        internal = np.isin(ends, accounts)
+        np.add.at(flow, np.searchsorted(accounts, ends[internal]), sign * rows["amount"][internal])
+        for account in np.unique(ends[~internal]):
+            if account not in EXTERNAL_ACCOUNTS:
+                problems.append(f"flow to/from unknown account {describe_account(int(account))}")
+
+    scale = np.maximum(np.abs(np.concatenate([before[1], after[1]])).max(initial=0.0), 1.0)
+    for i in np.flatnonzero(np.abs(change - flow) > tolerance * scale):
+        problems.append(f"{describe_account(int(accounts[i]))}: balance changed by {change[i]:.6g}, "
+                        f"ledger explains {flow[i]:.6g}")
+    return problems
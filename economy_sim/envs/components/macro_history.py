@@ -0,0 +1,120 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from economy_sim.config import MACRO_WINDOW, MACRO_GROWTH_CLIP
+
+# Series kept per month. The first ones come straight from AgentManager.get_market_stats();
+# the growth series are derived on push from the previous month: GROWTH_SERIES name -> source stat
+STAT_SERIES = ("gdp", "avg_price", "avg_wage", "unemployment", "tax_revenue", "gini", "subsistence_failures")
+GROWTH_SERIES = {"gdp_growth": "gdp", "inflation": "avg_price", "wage_growth": "avg_wage"}
+MACRO_SERIES = STAT_SERIES + tuple(GROWTH_SERIES)
+
+# Feature names: "<series>" (latest month), "<series>_mean" and "<series>_std" (over the window)
+FEATURE_KINDS = ("latest", "mean", "std")
+
+def parse_features(names: Sequence[str]) -> List[Tuple[int, str]]:
+    """Feature names -> (series index, kind); raises ValueError on unknown names."""
+    parsed = []
+    for name in names:
+        series, kind = name, "latest"
+        for suffix in ("_mean", "_std"):
+            if name.endswith(suffix):
+                series, kind = name[:-len(suffix)], suffix[1:]
+        if series not in MACRO_SERIES:
+            raise ValueError(f"Unknown macro feature: {name} (series: {', '.join(MACRO_SERIES)})")
+        parsed.append((MACRO_SERIES.index(series), kind))
+    return parsed
+
+class MacroHistory:
+    """
+    Fixed-size ring buffer of the last `window` months of MACRO_SERIES for
+    n_envs envs, preallocated as one (n_envs, window, series) array. Envs in
+    the same process can share one instance (EconomyEnv(macro_history=(history, i))),
+    so features for all of them come from a single vectorized call.
+
+    push() is O(1): it overwrites the oldest month and updates running sums
+    and sums of squares, from which rolling means and variances are read
+    without touching the history. The sums are recomputed from the buffer
+    once per `window` pushes so rounding error cannot build up.
+    """
+
+    def __init__(self, n_envs: int = 1, window: int = MACRO_WINDOW):
+        if window < 2:
+            raise ValueError("MacroHistory needs a window of at least 2 months")
+        self.n_envs = n_envs
+        self.window = window
+        self.values = np.zeros((n_envs, window, len(MACRO_SERIES)))
+        self.sums = np.zeros((n_envs, len(MACRO_SERIES)))
+        self.sumsq = np.zeros((n_envs, len(MACRO_SERIES)))
+        self.pos = np.zeros(n_envs, dtype=np.int64) # Next slot to write
+        self.count = np.zeros(n_envs, dtype=np.int64) # Months held (<= window)
+        self._growth_source = [STAT_SERIES.index(source) for source in GROWTH_SERIES.values()]
+
+    def clear(self, env: int):
+        self.values[env] = 0.0
+        self.sums[env] = 0.0
+        self.sumsq[env] = 0.0
+        self.pos[env] = 0
+        self.count[env] = 0
+
+    def push(self, stats: Dict[str, float], env: int = 0):
+        """Record one month of get_market_stats() for env."""
+        row = self.values[env, self.pos[env]]
+        evicted = row.copy() if self.count[env] == self.window else None
+        n_stats = len(STAT_SERIES)
+        current = np.array([stats[name] for name in STAT_SERIES], dtype=np.float64)
+        if self.count[env] > 0:
+            previous = self.values[env, self.pos[env] - 1, self._growth_source] # pos - 1 wraps to the newest month
+            source = current[self._growth_source]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                growth = np.where(np.abs(previous) > 1e-9, source / previous - 1.0, 0.0)
+            row[n_stats:] = np.clip(growth, -MACRO_GROWTH_CLIP, MACRO_GROWTH_CLIP)
+        else:
+            row[n_stats:] = 0.0
+        row[:n_stats] = current
+
+        if evicted is not None:
+            self.sums[env] -= evicted
+            self.sumsq[env] -= evicted * evicted
+        self.sums[env] += row
+        self.sumsq[env] += row * row
+        self.count[env] = min(self.count[env] + 1, self.window)
+        self.pos[env] = (self.pos[env] + 1) % self.window
+        if self.pos[env] == 0:
+            # Once per window: exact sums again (amortized O(1) per push)
+            self.sums[env] = self.values[env].sum(axis=0)
+            self.sumsq[env] = (self.values[env] ** 2).sum(axis=0)
+
+    def latest(self, env=slice(None)) -> np.ndarray:
+        """Newest month of every series (zeros before the first push)."""
+        return self.values[np.arange(self.n_envs)[env], self.pos[env] - 1]
+
+    def mean(self, env=slice(None)) -> np.ndarray:
+        return self.sums[env] / np.maximum(self.count[env], 1)[..., None]
+
+    def var(self, env=slice(None)) -> np.ndarray:
+        mean = self.mean(env)
+        return np.maximum(self.sumsq[env] / np.maximum(self.count[env], 1)[..., None] - mean * mean, 0.0)
+
+    def features(self, parsed: List[Tuple[int, str]], env=slice(None)) -> np.ndarray:
+        """Values of parse_features() output; shape (len(parsed),) for one env, (n, len(parsed)) for a slice."""
+        kinds = {kind for _, kind in parsed}
+        sources = {
+            "latest": self.latest(env) if "latest" in kinds else None,
+            "mean": self.mean(env) if "mean" in kinds else None,
+            "std": np.sqrt(self.var(env)) if "std" in kinds else None
+        }
+        return np.stack([sources[kind][..., series] for series, kind in parsed], axis=-1)
+
+    def named(self, names: Sequence[str], env: int = 0) -> Dict[str, float]:
+        return dict(zip(names, self.features(parse_features(names), env).tolist()))
+
+    def get_state(self, env: int) -> Dict:
+        """One env's history (for EconomyEnv.snapshot)."""
+        return {"values": self.values[env].copy(), "pos": int(self.pos[env]), "count": int(self.count[env])}
+
+    def set_state(self, env: int, state: Dict):
+        self.values[env] = state["values"]
+        self.pos[env] = state["pos"]
+        self.count[env] = state["count"]
+        self.sums[env] = self.values[env].sum(axis=0) # Unfilled slots are zero
+        self.sumsq[env] = (self.values[env] ** 2).sum(axis=0)
@@ -1,21 +1,90 @@
 import gymnasium as gym
 import numpy as np
+import pickle
 from gymnasium import spaces
+from typing import Dict, Optional, Sequence, Tuple
 from economy_sim.envs.components.agent_manager import AgentManager
-from economy_sim.config import EPISODE_LENGTH
+from economy_sim.envs.components.macro_history import MacroHistory, parse_features
+from economy_sim.config import (
+    N_HOUSEHOLDS,
+    N_FIRMS,
+    EPISODE_LENGTH,
+    OBS_SCALE_INVARIANT,
+    DISTRIBUTION_RANGES,
+    OBS_DISTRIBUTION_QUANTILES,
+    DECISION_INTERVAL,
+    MACRO_FEATURES,
+    MACRO_REWARD_WEIGHTS
+)
+
+def action_to_tax_rates(action):
+    """Map a normalized [0, 1]^3 action to the tax_rates dict of AgentManager.step."""
+    income_tax = np.clip(action[0] * 0.8, 0.0, 0.8) # Scale 0-1 to 0-80%
+    corp_tax = np.clip(action[1] * 0.8, 0.0, 0.8)
+    ubi = action[2] * 200.0 # Scale 0-1 to 0-200 credits
+    
+    return {
+        "income_tax": income_tax,
+        "corp_tax": corp_tax,
+        "ubi": ubi
+    }
 
 class EconomyEnv(gym.Env):
     """
     The Gym Environment for the Economy Simulation.
     Action Space: Continuous [Income Tax, Corp Tax, UBI]
     Observation Space: [GDP, Inflation, Unemployment, Gini, Tax Revenue, Avg Wage, Avg Price]
+    With include_distributions=True, household quantiles (OBS_DISTRIBUTION_QUANTILES
+    of each field in DISTRIBUTION_RANGES) are appended to the observation.
+    With cohort_population set, households are simulated as weighted cohorts
+    representing that many households (see CohortAgentManager); observations
+    keep the same meaning.
+    float32_probe=True is a precision-sensitivity probe: agent state is rounded
+    to float32 after every step (see AgentManager._round_to_float32) so
+    utils/precision_check.py can report the drift against the normal run.
+    State is still stored as float64 and stepping is slower.
+    With scale_invariant_obs=True, GDP, tax revenue and subsistence failures are
+    observed per household, so a policy can move between population sizes
+    (see set_scale and training/curriculum.py).
+    With decision_interval=k, each action is held for k months (simulated
+    back-to-back inside one step): the reward is the sum of the monthly
+    rewards and info holds monthly averages plus the number of months run.
+    episode_length stays in months.
+    Every month's macro stats go into a ring buffer (MacroHistory, MACRO_WINDOW
+    months). macro_features (e.g. "inflation", "gdp_growth_mean",
+    "unemployment_std") are appended to the observation and
+    macro_reward_weights adds weight * feature to the monthly reward. Envs
+    in one process can share a stacked buffer: macro_history=(history, row).
     """
     
-    def __init__(self):
+    def __init__(self, include_distributions: bool = False, cohort_population: Optional[int] = None,
+                 float32_probe: bool = False, n_households: int = N_HOUSEHOLDS, n_firms: int = N_FIRMS,
+                 episode_length: int = EPISODE_LENGTH, scale_invariant_obs: bool = OBS_SCALE_INVARIANT,
+                 decision_interval: int = DECISION_INTERVAL, macro_features: Sequence[str] = MACRO_FEATURES,
+                 macro_reward_weights: Dict[str, float] = MACRO_REWARD_WEIGHTS,
+                 macro_history: Optional[Tuple[MacroHistory, int]] = None):
         super(EconomyEnv, self).__init__()
         
-        self.agent_manager = AgentManager()
+        self.include_distributions = include_distributions
+        self.cohort_population = cohort_population
+        self.float32_probe = float32_probe
+        self.n_households = n_households
+        self.n_firms = n_firms
+        self.episode_length = episode_length
+        self.scale_invariant_obs = scale_invariant_obs
+        self.decision_interval = max(1, int(decision_interval))
+        self._pending_scale = None
+        self.macro_features = tuple(macro_features)
+        self.macro_reward_weights = dict(macro_reward_weights)
+        self._macro_obs = parse_features(self.macro_features)
+        self._macro_reward = parse_features(self.macro_reward_weights)
+        self._macro_weights = np.array(list(self.macro_reward_weights.values()), dtype=np.float64)
+        self.macro_history, self.macro_index = macro_history or (MacroHistory(), 0)
+
+        self.agent_manager = self._make_agent_manager()
         self.current_step = 0
+        self.episode_return = 0.0 # Monitor-style episode stats, reported in info["episode"] at the end
+        self.episode_steps = 0
         
         # Action Space:
         # 0: Income Tax Rate (0.0 - 0.8)
@@ -26,66 +95,155 @@ class EconomyEnv(gym.Env):
         # Observation Space:
         # 7 Metrics normalized roughly to [-1, 1] or [0, 1]
         # [Unemployment, Avg Price, Avg Wage, Tax Revenue, GDP, Gini, Subsistence Failures]
-        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(7,), dtype=np.float32)
+        # (+ distribution quantiles if enabled, + macro_features)
+        obs_size = 7
+        if self.include_distributions:
+            obs_size += len(DISTRIBUTION_RANGES) * len(OBS_DISTRIBUTION_QUANTILES)
+        obs_size += len(self._macro_obs)
+        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(obs_size,), dtype=np.float32)
         
         # History for Reward Calculation
         self.last_gdp = 0.0
+        self._start_macro_history()
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        self.agent_manager = AgentManager() # Reset agents
+        if self._pending_scale is not None:
+            self.n_households, self.n_firms, self.episode_length = self._pending_scale
+            self._pending_scale = None
+        # Agents draw from their own streams, derived from the env's seeded np_random
+        self.agent_manager = self._make_agent_manager(seed=int(self.np_random.integers(2**63 - 1))) # Reset agents
         self.current_step = 0
-        self.last_gdp = 0.0
+        self.episode_return = 0.0
+        self.episode_steps = 0
+        self._start_macro_history()
         
         return self._get_observation(), {}
 
+    def set_scale(self, n_households: Optional[int] = None, n_firms: Optional[int] = None,
+                  episode_length: Optional[int] = None):
+        """Change the economy size / episode length, from the next reset on (episodes in progress are unaffected)."""
+        self._pending_scale = (
+            n_households or self.n_households,
+            n_firms or self.n_firms,
+            episode_length or self.episode_length
+        )
+
+    def _make_agent_manager(self, seed=None):
+        scale = {"n_households": self.n_households, "n_firms": self.n_firms}
+        if self.cohort_population is not None:
+            from economy_sim.envs.components.cohort import CohortAgentManager
+            return CohortAgentManager(population=self.cohort_population, seed=seed, float32_probe=self.float32_probe,
+                                      **scale)
+        return AgentManager(seed=seed, float32_probe=self.float32_probe, **scale)
+
+    def _start_macro_history(self):
+        """Start this env's history row over from the current state (month 0)."""
+        self.macro_history.clear(self.macro_index)
+        self._record_month(self.agent_manager.get_market_stats())
+
+    def _record_month(self, stats):
+        self.macro_history.push(stats, self.macro_index)
+        self.last_gdp = stats["gdp"]
+
+    def macro_values(self, names: Sequence[str]) -> Dict[str, float]:
+        """Named macro features (see MacroHistory) of the current month, e.g. for the dashboard."""
+        return self.macro_history.named(names, self.macro_index)
+
     def step(self, action):
         # 1. Parse Action
-        income_tax = np.clip(action[0] * 0.8, 0.0, 0.8) # Scale 0-1 to 0-80%
-        corp_tax = np.clip(action[1] * 0.8, 0.0, 0.8)
-        ubi = action[2] * 200.0 # Scale 0-1 to 0-200 credits
-        
-        tax_rates = {
-            "income_tax": income_tax,
-            "corp_tax": corp_tax,
-            "ubi": ubi
-        }
+        tax_rates = action_to_tax_rates(action)
         
-        # 2. Run Simulation Step
-        self.agent_manager.step(tax_rates)
-        self.current_step += 1
+        # 2. Run Simulation Steps (the action is held for decision_interval months, fewer if the episode ends first)
+        months = max(1, min(self.decision_interval, self.episode_length - self.current_step))
+        reward = 0.0
+        unemployment = tax_revenue = gdp = 0.0
+        for _ in range(months):
+            self.agent_manager.step(tax_rates)
+            self.current_step += 1
+            stats = self.agent_manager.get_market_stats()
+            self._record_month(stats)
+            
+            # 3. Calculate Reward
+            reward += self._calculate_reward(stats)
+            gdp += stats["gdp"]
+            unemployment += stats["unemployment"]
+            tax_revenue += stats["tax_revenue"]
         
-        # 3. Get Observation
+        # 4. Get Observation
         obs = self._get_observation()
         
-        # 4. Calculate Reward
-        reward = self._calculate_reward(obs)
-        
         # 5. Check Termination
         terminated = False
-        truncated = self.current_step >= EPISODE_LENGTH
-        
-        # Crash condition: If unemployment > 90% (Collapse)
-        # Relaxed: Only crash if it persists? For now, let's keep it strict but rely on Bailout.
-        # Actually, if Bailout happens in AgentManager.step(), unemployment might still be high 
-        # until the NEXT step when they hire.
-        # Let's allow 1 step of chaos.
-        stats = self.agent_manager.get_market_stats()
-        if stats["unemployment"] > 0.95 and self.current_step > 5:
-             # Only terminate if we are past warmup and it's total collapse
-             # But wait! Bailout spawns firms, but they need time to hire.
-             # Let's just penalize heavily but NOT terminate, to let RL learn to recover.
-             # terminated = True 
-             reward -= 50.0 # Heavy penalty
+        truncated = self.current_step >= self.episode_length
         
         info = {
-            "gdp": self.last_gdp,
-            "unemployment": stats["unemployment"],
-            "tax_revenue": stats["tax_revenue"]
+            "gdp": gdp / months,
+            "unemployment": unemployment / months,
+            "tax_revenue": tax_revenue / months,
+            "months": months
         }
+        self.episode_return += reward
+        self.episode_steps += 1
+        if terminated or truncated:
+            # Same keys as SB3's Monitor: fills model.ep_info_buffer, and survives snapshot/restore
+            info["episode"] = {"r": self.episode_return, "l": self.episode_steps}
         
         return obs, reward, terminated, truncated, info
 
+    def constructor_kwargs(self) -> Dict:
+        """Arguments that rebuild an env like this one (an own macro history buffer), e.g. to restore() a snapshot into."""
+        return {
+            "include_distributions": self.include_distributions,
+            "cohort_population": self.cohort_population,
+            "float32_probe": self.float32_probe,
+            "n_households": self.n_households,
+            "n_firms": self.n_firms,
+            "episode_length": self.episode_length,
+            "scale_invariant_obs": self.scale_invariant_obs,
+            "decision_interval": self.decision_interval,
+            "macro_features": self.macro_features,
+            "macro_reward_weights": self.macro_reward_weights
+        }
+
+    def snapshot(self) -> bytes:
+        """Serialize the simulation state (agents, RNG streams, step counter)."""
+        return pickle.dumps({
+            "agent_manager": self.agent_manager,
+            "current_step": self.current_step,
+            "last_gdp": self.last_gdp,
+            "macro_history": self.macro_history.get_state(self.macro_index),
+            "episode_stats": (self.episode_return, self.episode_steps),
+            "episode_length": self.episode_length,
+            "np_random_state": self.np_random.bit_generator.state
+        })
+
+    def restore(self, blob: bytes):
+        state = pickle.loads(blob)
+        self.agent_manager = state["agent_manager"]
+        self.current_step = state["current_step"]
+        self.last_gdp = state["last_gdp"]
+        self.episode_length = state["episode_length"]
+        self.n_households = self.agent_manager.n_households
+        self.n_firms = self.agent_manager.n_firms
+        self.np_random.bit_generator.state = state["np_random_state"]
+        self.episode_return, self.episode_steps = state.get("episode_stats", (0.0, 0))
+        if "macro_history" in state:
+            self.macro_history.set_state(self.macro_index, state["macro_history"])
+        else: # Older snapshot: history starts at the restored month
+            self._start_macro_history()
+        return self._get_observation()
+
+    def branch(self, policies, horizon: int, models_dir=None):
+        """
+        Fork the current state into one branch per policy spec and run each for
+        `horizon` steps (horizon * decision_interval months) in parallel worker
+        processes (see envs/branching.py).
+        This env is left untouched. Returns the trajectories of all branches.
+        """
+        from economy_sim.envs.branching import BranchJob
+        return BranchJob(self, policies, horizon, models_dir).result()
+
     def _get_observation(self):
         stats = self.agent_manager.get_market_stats()
         
@@ -100,15 +258,42 @@ class EconomyEnv(gym.Env):
             stats["subsistence_failures"]
         ], dtype=np.float32)
         
+        if self.scale_invariant_obs:
+            # Totals -> per household (model units, so cohort mode matches too)
+            obs[[3, 4, 6]] /= self.agent_manager.n_households
+        
+        if self.include_distributions:
+            sketches = self.agent_manager.distribution_sketches()
+            quantiles = [sketches[field].quantiles(OBS_DISTRIBUTION_QUANTILES) for field in DISTRIBUTION_RANGES]
+            obs = np.concatenate([obs, np.concatenate(quantiles).astype(np.float32)])
+        
+        if self._macro_obs:
+            obs = np.concatenate([obs, self.macro_history.features(self._macro_obs, self.macro_index).astype(np.float32)])
+        
         # Sanitize (Replace NaN/Inf with 0)
         return np.nan_to_num(obs, nan=0.0, posinf=1e6, neginf=-1e6)
 
-    def _calculate_reward(self, obs):
+    def _calculate_reward(self, stats):
         # R = GDP_Growth - Unemployment - Inflation_Instability
         # Simplified for first pass
-        unemployment = obs[0]
+        unemployment = np.float32(stats["unemployment"]) # As observed (obs[0])
         
         reward = 0.0
         reward -= (unemployment * 10.0) # Penalize unemployment heavily
         
+        # Crash condition: If unemployment > 90% (Collapse)
+        # Relaxed: Only crash if it persists? For now, let's keep it strict but rely on Bailout.
+        # Actually, if Bailout happens in AgentManager.step(), unemployment might still be high 
+        # until the NEXT step when they hire.
+        # Let's allow 1 step of chaos.
+        if unemployment > 0.95 and self.current_step > 5:
+             # Only terminate if we are past warmup and it's total collapse
+             # But wait! Bailout spawns firms, but they need time to hire.
+             # Let's just penalize heavily but NOT terminate, to let RL learn to recover.
+             reward -= 50.0 # Heavy penalty
+        
+        if self._macro_reward:
+            # Rolling macro terms (this month is already in the history)
+            reward += float(self._macro_weights @ self.macro_history.features(self._macro_reward, self.macro_index))
+        
         return reward
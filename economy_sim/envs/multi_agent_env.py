@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Dict
+from gymnasium import spaces
+from economy_sim.config import AVG_PRODUCTIVITY, FIRM_PROFIT_SCALE, FIRM_BANKRUPTCY_PENALTY
+from economy_sim.envs.economy_env import EconomyEnv
+
+# Per-firm observation, one row per firm (see firm_observations)
+FIRM_OBS_FIELDS = (
+    "log_relative_price",  # log(price / market avg price)
+    "log_relative_wage",   # log(wage offer / market avg wage)
+    "log_cash",            # sign(cash) * log1p(|cash|) / 10
+    "inventory_cover",     # months of last month's sales in inventory, capped at 10, / 10
+    "utilization",         # employees / tier capacity
+    "tier",                # tier / 4
+    "profit_margin",       # tanh(last month's profit / revenue capacity of the workforce)
+    "unemployment",        # economy-wide
+    "log_price_level"      # log(avg price / initial price)
+)
+FIRM_ACTIONS = ("price_change", "wage_change") # [-1, 1], see Firm.apply_action
+
+def firm_totals(manager) -> Dict[str, np.ndarray]:
+    """
+    Per-firm running totals that monthly figures are differenced from.
+    Firm.last_sales accumulates over the episode and Firm.last_profit is never
+    updated, so sales and profit (cash change, upgrades counted as investment)
+    over one or more months come from the difference between two of these.
+    """
+    return {
+        "cash": manager.firm_column("cash").copy(),
+        "upgrades": np.fromiter((f.total_upgrade_cost for f in manager.firms), dtype=np.float64, count=len(manager.firms)),
+        "sales": np.fromiter((f.last_sales for f in manager.firms), dtype=np.float64, count=len(manager.firms)),
+        "bankruptcies": manager.firm_column("bankruptcies").copy()
+    }
+
+def _monthly_profit(before: Dict[str, np.ndarray], after: Dict[str, np.ndarray]) -> np.ndarray:
+    return after["cash"] - before["cash"] + (after["upgrades"] - before["upgrades"])
+
+def firm_observations(manager, before: Dict[str, np.ndarray], after: Dict[str, np.ndarray]) -> np.ndarray:
+    """(n_firms, len(FIRM_OBS_FIELDS)) float32 for the month between two firm_totals(), built in one pass."""
+    price = np.maximum(manager.firm_column("price"), 0.1)
+    employees = manager.firm_column("employees_count")
+    sales = after["sales"] - before["sales"]
+    avg_price = max(manager.avg_price, 0.1)
+    obs = np.stack([
+        np.log(price / avg_price),
+        np.log(np.maximum(manager.firm_column("wage_offer"), 1.0) / max(manager.avg_wage, 1.0)),
+        np.sign(after["cash"]) * np.log1p(np.abs(after["cash"])) / 10.0,
+        np.minimum(manager.firm_column("inventory") / np.maximum(sales, 0.1), 10.0) / 10.0,
+        employees / manager.firm_column("max_employees"),
+        manager.firm_column("tier") / 4.0,
+        np.tanh(_monthly_profit(before, after) / (price * AVG_PRODUCTIVITY * np.maximum(employees, 1))),
+        np.full(len(price), manager.unemployment_rate),
+        np.full(len(price), np.log(avg_price / 10.0))
+    ], axis=1).astype(np.float32)
+    return np.nan_to_num(obs, nan=0.0, posinf=1e6, neginf=-1e6)
+
+def firm_rewards(manager, before: Dict[str, np.ndarray], after: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Each firm's profit over the month in units of the price level; firms that
+    went bankrupt (cash reset by a bailout) get -FIRM_BANKRUPTCY_PENALTY instead.
+    """
+    profit = _monthly_profit(before, after) / (max(manager.avg_price, 0.1) * FIRM_PROFIT_SCALE)
+    bankrupt = after["bankruptcies"] > before["bankruptcies"]
+    return np.where(bankrupt, -FIRM_BANKRUPTCY_PENALTY, profit).astype(np.float32)
+
+class MultiAgentEconomyEnv(EconomyEnv):
+    """
+    EconomyEnv whose firms are agents: instead of Firm's sticky price and
+    hiring-budget wage heuristics, every firm's price and wage offer follow
+    its action (FIRM_ACTIONS), applied at the start of the next month. All
+    firms share one policy; firm_observations() returns their observations as
+    one (n_firms, len(FIRM_OBS_FIELDS)) array so a single forward pass serves
+    them all (training/train_firms.py batches this across economies too).
+
+    step_agents() takes the government action (as EconomyEnv.step) plus the
+    firm actions. Plain step() holds every firm's price and wage. With
+    decision_interval > 1, firm actions apply to the first month of the step
+    and firm rewards and sales cover all of its months.
+    """
+
+    def __init__(self, **kwargs):
+        super(MultiAgentEconomyEnv, self).__init__(**kwargs)
+        self._reset_firm_totals() # firm_observations() works before the first reset too
+        self.firm_action_space = spaces.Box(low=-1.0, high=1.0, shape=(len(FIRM_ACTIONS),), dtype=np.float32)
+        self.firm_observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(len(FIRM_OBS_FIELDS),), dtype=np.float32)
+
+    def _make_agent_manager(self, seed=None):
+        manager = super()._make_agent_manager(seed)
+        manager.learned_firms = True
+        return manager
+
+    def _reset_firm_totals(self):
+        totals = firm_totals(self.agent_manager)
+        self._firm_totals = (totals, totals) # No month yet: zero sales and profit
+
+    def reset(self, seed=None, options=None):
+        result = super().reset(seed=seed, options=options)
+        self._reset_firm_totals()
+        return result
+
+    def restore(self, blob: bytes):
+        obs = super().restore(blob)
+        self._reset_firm_totals()
+        return obs
+
+    def step(self, action):
+        before = firm_totals(self.agent_manager)
+        result = super().step(action)
+        self._firm_totals = (before, firm_totals(self.agent_manager))
+        return result
+
+    def firm_observations(self) -> np.ndarray:
+        return firm_observations(self.agent_manager, *self._firm_totals)
+
+    def step_agents(self, government_action, firm_actions):
+        """Returns (obs, reward, firm_obs, firm_rewards, terminated, truncated, info)."""
+        manager = self.agent_manager
+        manager.firm_actions = np.asarray(firm_actions, dtype=np.float32).reshape(manager.n_firms, len(FIRM_ACTIONS))
+        obs, reward, terminated, truncated, info = self.step(government_action)
+        return (obs, reward, self.firm_observations(), firm_rewards(manager, *self._firm_totals),
+                terminated, truncated, info)
@@ -0,0 +1,217 @@
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from typing import Dict, Optional
+from economy_sim.config import EPISODE_LENGTH, SURROGATE_RIDGE, SURROGATE_HIDDEN, SURROGATE_EPOCHS
+
+# Observation layout of EconomyEnv (without distributions)
+OBS_FIELDS = ("unemployment", "avg_price", "avg_wage", "tax_revenue", "gdp", "gini", "subsistence_failures")
+N_ACTIONS = 3
+
+def surrogate_reward(obs: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """EconomyEnv's reward for a batch of observations reached at `steps` (step counts after the step)."""
+    unemployment = obs[:, 0]
+    reward = -(unemployment * 10.0)
+    return np.where((unemployment > 0.95) & (steps > 5), reward - 50.0, reward)
+
+def _quadratic_features(xt: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """[1, x, x_i * x_j (i <= j)] for feature-major inputs (n_inputs, n) -> (n_features, n)."""
+    d = len(xt)
+    shape = (1 + d + d * (d + 1) // 2, xt.shape[1])
+    features = out if out is not None and out.shape == shape else np.empty(shape, dtype=xt.dtype)
+    features[0] = 1.0
+    features[1:1 + d] = xt
+    row = 1 + d
+    for i in range(d):
+        # x_i times x_i..x_d, written in place (no gathered temporaries)
+        np.multiply(xt[i:], xt[i], out=features[row:row + d - i])
+        row += d - i
+    return features
+
+class SurrogateModel:
+    """
+    Learned macro transition (observation, action) -> next observation.
+
+    Inputs are standardized observations plus the raw [0, 1] action; the model
+    predicts the standardized change of the observation. kind="ridge" fits a
+    closed-form ridge regression on quadratic features, kind="mlp" a
+    one-hidden-layer tanh network (numpy, Adam). Fitting runs in float64,
+    prediction in float32 on feature-major arrays (several times faster for
+    large batches). Predictions are clipped to the range seen in the training
+    data so open-loop rollouts stay bounded.
+    `initial_obs` holds the reset observations episodes are started from.
+    """
+
+    def __init__(self, kind: str = "ridge"):
+        if kind not in ("ridge", "mlp"):
+            raise ValueError(f"Unknown surrogate kind: {kind}")
+        self.kind = kind
+        self.params: Dict[str, np.ndarray] = {}
+        self._features = None # Reused feature buffer: allocating ~1 MB per call costs more than the math
+
+    def _inputs(self, obs, actions):
+        """Feature-major model inputs (7 + 3, n)."""
+        return np.concatenate([((obs - self.params["obs_mean"]) / self.params["obs_scale"]).T, actions.T])
+
+    def fit(self, obs: np.ndarray, actions: np.ndarray, next_obs: np.ndarray, initial_obs: np.ndarray,
+            seed: int = 0, ridge: float = SURROGATE_RIDGE, hidden: int = SURROGATE_HIDDEN,
+            epochs: int = SURROGATE_EPOCHS):
+        obs, actions, next_obs = (np.asarray(a, dtype=np.float64) for a in (obs, actions, next_obs))
+        delta = next_obs - obs
+        self.params = {
+            "obs_mean": obs.mean(axis=0),
+            "obs_scale": obs.std(axis=0) + 1e-8,
+            "delta_scale": delta.std(axis=0) + 1e-8,
+            "obs_low": np.minimum(obs.min(axis=0), next_obs.min(axis=0)),
+            "obs_high": np.maximum(obs.max(axis=0), next_obs.max(axis=0)),
+            "initial_obs": np.asarray(initial_obs, dtype=np.float64)
+        }
+        xt = self._inputs(obs, actions)
+        y = delta / self.params["delta_scale"]
+
+        if self.kind == "ridge":
+            features = _quadratic_features(xt)
+            penalty = ridge * features.shape[1] * np.eye(len(features))
+            penalty[0, 0] = 0.0 # Don't shrink the intercept
+            self.params["weights"] = np.linalg.solve(features @ features.T + penalty, features @ y)
+        else:
+            self._fit_mlp(xt.T, y, np.random.default_rng(seed), hidden, epochs)
+        self.params = {k: v.astype(np.float32) for k, v in self.params.items()}
+        return self
+
+    def _fit_mlp(self, x, y, rng, hidden, epochs, batch_size=256, lr=1e-3):
+        weights = {
+            "w1": rng.normal(0.0, 1.0 / np.sqrt(x.shape[1]), (x.shape[1], hidden)),
+            "b1": np.zeros(hidden),
+            "w2": rng.normal(0.0, 1.0 / np.sqrt(hidden), (hidden, y.shape[1])),
+            "b2": np.zeros(y.shape[1])
+        }
+        moments = {k: (np.zeros_like(v), np.zeros_like(v)) for k, v in weights.items()}
+        t = 0
+        for epoch in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                xb, yb = x[batch], y[batch]
+                h = np.tanh(xb @ weights["w1"] + weights["b1"])
+                err = (h @ weights["w2"] + weights["b2"] - yb) * (2.0 / yb.size) # d(MSE)/d(output)
+                dh = (err @ weights["w2"].T) * (1.0 - h * h)
+                grads = {"w1": xb.T @ dh, "b1": dh.sum(axis=0), "w2": h.T @ err, "b2": err.sum(axis=0)}
+                t += 1
+                for k, g in grads.items():
+                    m, v = moments[k]
+                    m[:] = 0.9 * m + 0.1 * g
+                    v[:] = 0.999 * v + 0.001 * g * g
+                    weights[k] -= lr * (m / (1 - 0.9**t)) / (np.sqrt(v / (1 - 0.999**t)) + 1e-8)
+        self.params.update(weights)
+
+    def predict(self, obs: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        """Next observations for a batch (n, obs) of observations and (n, 3) actions."""
+        obs = np.asarray(obs, dtype=np.float32)
+        xt = self._inputs(obs, np.asarray(actions, dtype=np.float32))
+        p = self.params
+        if self.kind == "ridge":
+            self._features = _quadratic_features(xt, self._features)
+            yt = p["weights"].T @ self._features
+        else:
+            yt = p["w2"].T @ np.tanh(p["w1"].T @ xt + p["b1"][:, None]) + p["b2"][:, None]
+        return np.clip(obs + yt.T * p["delta_scale"], p["obs_low"], p["obs_high"])
+
+    @property
+    def initial_obs(self) -> np.ndarray:
+        return self.params["initial_obs"]
+
+    def save(self, path: str):
+        np.savez(path, kind=self.kind, **self.params)
+
+    @classmethod
+    def load(cls, path: str) -> "SurrogateModel":
+        data = np.load(path)
+        model = cls(str(data["kind"]))
+        model.params = {k: data[k] for k in data.files if k != "kind"}
+        return model
+
+class BatchedSurrogateEconomy:
+    """
+    n_envs surrogate economies stepped together with one model call.
+    Finished episodes restart right away from a random initial observation;
+    step() returns the observation they ended on separately.
+    """
+
+    def __init__(self, model: SurrogateModel, n_envs: int, episode_length: int = EPISODE_LENGTH,
+                 seed: Optional[int] = None):
+        self.model = model
+        self.n_envs = n_envs
+        self.episode_length = episode_length
+        self.rng = np.random.default_rng(seed)
+        self.obs = np.zeros((n_envs, model.initial_obs.shape[1]), dtype=np.float32)
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+
+    def _initial(self, n: int) -> np.ndarray:
+        return self.model.initial_obs[self.rng.integers(len(self.model.initial_obs), size=n)]
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.obs = self._initial(self.n_envs)
+        self.steps[:] = 0
+        return self.obs.copy()
+
+    def step(self, actions: np.ndarray):
+        """Returns (obs, rewards, dones, terminal_obs); terminal_obs is the pre-reset obs of done envs."""
+        actions = np.clip(np.asarray(actions, dtype=np.float32).reshape(self.n_envs, N_ACTIONS), 0.0, 1.0)
+        self.obs = self.model.predict(self.obs, actions)
+        self.steps += 1
+        rewards = surrogate_reward(self.obs, self.steps)
+        dones = self.steps >= self.episode_length
+        terminal_obs = self.obs[dones]
+        if dones.any():
+            self.obs[dones] = self._initial(int(dones.sum()))
+            self.steps[dones] = 0
+        return self.obs.copy(), rewards, dones, terminal_obs
+
+class SurrogateEnv(gym.Env):
+    """
+    Drop-in replacement for EconomyEnv (default observations) driven by a
+    SurrogateModel instead of the agent simulation. Same spaces, reward and
+    info keys; see training/surrogate.py for fitting and pre-training.
+    """
+
+    def __init__(self, model: SurrogateModel, episode_length: int = EPISODE_LENGTH):
+        super(SurrogateEnv, self).__init__()
+        self.model = model
+        self.episode_length = episode_length
+        self.action_space = spaces.Box(low=0.0, high=1.0, shape=(N_ACTIONS,), dtype=np.float32)
+        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(len(OBS_FIELDS),), dtype=np.float32)
+        self.obs = None
+        self.current_step = 0
+        self.episode_return = 0.0 # As EconomyEnv, reported in info["episode"] at the end
+        self.episode_steps = 0
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        initial = self.model.initial_obs
+        self.obs = initial[self.np_random.integers(len(initial))][None, :]
+        self.current_step = 0
+        self.episode_return = 0.0
+        self.episode_steps = 0
+        return self.obs[0].copy(), {}
+
+    def step(self, action):
+        action = np.clip(np.asarray(action, dtype=np.float32).reshape(1, N_ACTIONS), 0.0, 1.0)
+        self.obs = self.model.predict(self.obs, action)
+        self.current_step += 1
+        reward = float(surrogate_reward(self.obs, np.array([self.current_step]))[0])
+        truncated = self.current_step >= self.episode_length
+        obs = self.obs[0].copy()
+        info = {
+            "gdp": float(obs[4]),
+            "unemployment": float(obs[0]),
+            "tax_revenue": float(obs[3]),
+            "months": 1 # The model predicts one month ahead
+        }
+        self.episode_return += reward
+        self.episode_steps += 1
+        if truncated:
+            info["episode"] = {"r": self.episode_return, "l": self.episode_steps}
+        return obs, reward, False, truncated, info
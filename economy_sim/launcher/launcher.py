@@ -10,6 +10,7 @@ def main():
     parser.add_argument("--train", action="store_true", help="Train the RL Agent")
     parser.add_argument("--sim", action="store_true", help="Run the Simulation with Dashboard")
     parser.add_argument("--test", action="store_true", help="Run a quick smoke test")
+    parser.add_argument("--startup-check", action="store_true", help="Report slowest imports and check startup time budgets")
     
     args = parser.parse_args()
     
@@ -67,8 +68,12 @@ def main():
         import subprocess
         subprocess.run(["python", "test_simulation.py"])
         
+    elif args.startup_check:
+        from economy_sim.utils.startup_profile import run_startup_check
+        raise SystemExit(0 if run_startup_check() else 1)
+        
     else:
-        print("Please specify an action: --train, --sim, or --test")
+        print("Please specify an action: --train, --sim, --test, or --startup-check")
 
 if __name__ == "__main__":
     main()
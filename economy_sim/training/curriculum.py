@@ -0,0 +1,48 @@
+from typing import Dict, List, Sequence, Tuple
+from stable_baselines3.common.callbacks import BaseCallback
+from economy_sim.config import CURRICULUM, EPISODE_LENGTH, RANDOM_SEED, DECISION_INTERVAL
+from economy_sim.training.evaluation import evaluate_policy
+
+def stage_at(timesteps: int, schedule: Sequence[Tuple[int, int, int, int]] = CURRICULUM) -> Tuple[int, int, int, int]:
+    """Last stage of the schedule whose start timestep has been reached."""
+    current = schedule[0]
+    for stage in schedule:
+        if timesteps >= stage[0]:
+            current = stage
+    return current
+
+class CurriculumCallback(BaseCallback):
+    """
+    Grows the training economies along a (from timestep, households, firms,
+    episode length) schedule. New sizes are pushed to every env with
+    set_scale() and take effect as each env starts its next episode.
+    The envs should use scale_invariant_obs=True.
+    """
+
+    def __init__(self, schedule: Sequence[Tuple[int, int, int, int]] = CURRICULUM, verbose: int = 1):
+        super().__init__(verbose)
+        self.schedule = schedule
+        self.stage = None
+
+    def _on_rollout_start(self):
+        stage = stage_at(self.num_timesteps, self.schedule)
+        if stage != self.stage:
+            self.stage = stage
+            _, n_households, n_firms, episode_length = stage
+            self.training_env.env_method("set_scale", n_households, n_firms, episode_length)
+            if self.verbose:
+                print(f"Curriculum: {n_households} households, {n_firms} firms, "
+                      f"{episode_length}-step episodes from timestep {self.num_timesteps}")
+
+    def _on_step(self) -> bool:
+        return True
+
+def evaluate_at_scales(model, scales: Sequence[Tuple[int, int]], episodes: int = 1,
+                       episode_length: int = EPISODE_LENGTH, seed: int = RANDOM_SEED,
+                       decision_interval: int = DECISION_INTERVAL) -> List[Dict]:
+    """Deterministic return and final unemployment of the policy on economies of each (households, firms) size."""
+    return [{"n_households": n_households, "n_firms": n_firms,
+             **evaluate_policy(model, episodes, seed, n_households=n_households, n_firms=n_firms,
+                               episode_length=episode_length, scale_invariant_obs=True,
+                               decision_interval=decision_interval)}
+            for n_households, n_firms in scales]
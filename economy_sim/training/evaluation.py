@@ -0,0 +1,24 @@
+import numpy as np
+from typing import Dict
+from economy_sim.config import RANDOM_SEED
+from economy_sim.envs.economy_env import EconomyEnv
+
+def evaluate_policy(model, episodes: int = 1, seed: int = RANDOM_SEED, **env_kwargs) -> Dict[str, float]:
+    """
+    Deterministic policy over `episodes` full episodes of EconomyEnv(**env_kwargs),
+    seeded seed, seed + 1, ... so scores are comparable across models. Returns the
+    mean return and mean final-month unemployment.
+    """
+    env = EconomyEnv(**env_kwargs)
+    returns, unemployment = [], []
+    for episode in range(episodes):
+        obs, _ = env.reset(seed=seed + episode)
+        total, done, info = 0.0, False, {}
+        while not done:
+            action, _ = model.predict(obs, deterministic=True)
+            obs, reward, terminated, truncated, info = env.step(action)
+            total += reward
+            done = terminated or truncated
+        returns.append(total)
+        unemployment.append(info.get("unemployment", 0.0))
+    return {"return": float(np.mean(returns)), "unemployment": float(np.mean(unemployment))}
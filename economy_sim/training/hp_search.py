@@ -0,0 +1,245 @@
+import os
+import json
+import math
+import time
+import sqlite3
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Tuple
+from economy_sim.config import (
+    RANDOM_SEED,
+    PPO_HYPERPARAMS,
+    HP_SEARCH_SPACE,
+    HP_STUDY_PATH,
+    HP_TRIAL_TIMESTEPS,
+    HP_TRIAL_ENVS,
+    HP_EVAL_EVERY,
+    HP_EVAL_EPISODES,
+    HP_PRUNE_STARTUP_TRIALS,
+    HP_PRUNE_WARMUP_EVALS
+)
+
+# Trial states. "running" trials left over from an interrupted search are re-run on resume.
+RUNNING, COMPLETE, PRUNED, FAILED = "running", "complete", "pruned", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY,
+    params TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    value REAL,
+    error TEXT,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS reports (
+    trial_id INTEGER NOT NULL,
+    step INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (trial_id, step)
+);
+"""
+
+def sample_params(space: Dict, rng: np.random.Generator) -> Dict:
+    params = {}
+    for name, (kind, *spec) in space.items():
+        if kind == "log":
+            params[name] = float(math.exp(rng.uniform(math.log(spec[0]), math.log(spec[1]))))
+        elif kind == "uniform":
+            params[name] = float(rng.uniform(spec[0], spec[1]))
+        elif kind == "int":
+            params[name] = int(rng.integers(spec[0], spec[1] + 1))
+        elif kind == "choice":
+            params[name] = spec[0][int(rng.integers(len(spec[0])))]
+        else:
+            raise ValueError(f"Unknown search space kind for {name}: {kind}")
+    return params
+
+class Study:
+    """
+    Trials and their intermediate evaluations in one SQLite file.
+
+    Every process (the driver and each trial worker) opens its own
+    connection, so concurrent trials see each other's reports when deciding
+    whether to prune.
+    """
+
+    def __init__(self, path: str = HP_STUDY_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=60.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    # --- Driver side ---
+
+    def add_trial(self, params: Dict, seed: int) -> int:
+        cursor = self.db.execute(
+            "INSERT INTO trials (params, seed, state, started) VALUES (?, ?, ?, ?)",
+            (json.dumps(params), seed, RUNNING, time.time())
+        )
+        self.db.commit()
+        return cursor.lastrowid
+
+    def interrupted_trials(self) -> List[Tuple[int, Dict, int]]:
+        """Trials still marked running (the previous search stopped mid-trial). Their reports are dropped."""
+        rows = self.db.execute("SELECT id, params, seed FROM trials WHERE state = ?", (RUNNING,)).fetchall()
+        for trial_id, _, _ in rows:
+            self.db.execute("DELETE FROM reports WHERE trial_id = ?", (trial_id,))
+        self.db.commit()
+        return [(trial_id, json.loads(params), seed) for trial_id, params, seed in rows]
+
+    def count(self, states=(COMPLETE, PRUNED, FAILED)) -> int:
+        marks = ",".join("?" * len(states))
+        return self.db.execute(f"SELECT COUNT(*) FROM trials WHERE state IN ({marks})", states).fetchone()[0]
+
+    def best(self, n: int = 1) -> List[Dict]:
+        rows = self.db.execute(
+            "SELECT id, params, value FROM trials WHERE state = ? ORDER BY value DESC LIMIT ?", (COMPLETE, n)
+        ).fetchall()
+        return [{"trial": trial_id, "value": value, "params": json.loads(params)} for trial_id, params, value in rows]
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM trials GROUP BY state").fetchall())
+
+    # --- Trial side ---
+
+    def report(self, trial_id: int, step: int, value: float):
+        self.db.execute("INSERT OR REPLACE INTO reports (trial_id, step, value) VALUES (?, ?, ?)",
+                        (trial_id, step, value))
+        self.db.commit()
+
+    def should_prune(self, trial_id: int, step: int, n_reports: int) -> bool:
+        """Median rule: prune if this trial's value at `step` is below the median of the other trials there."""
+        if n_reports <= HP_PRUNE_WARMUP_EVALS:
+            return False
+        value = self.db.execute("SELECT value FROM reports WHERE trial_id = ? AND step = ?",
+                                (trial_id, step)).fetchone()
+        others = [v for (v,) in self.db.execute(
+            "SELECT value FROM reports WHERE step = ? AND trial_id != ?", (step, trial_id))]
+        if value is None or len(others) < HP_PRUNE_STARTUP_TRIALS:
+            return False
+        return value[0] < float(np.median(others))
+
+    def finish(self, trial_id: int, state: str, value: Optional[float] = None, error: Optional[str] = None):
+        self.db.execute("UPDATE trials SET state = ?, value = ?, error = ?, finished = ? WHERE id = ?",
+                        (state, value, error, time.time(), trial_id))
+        self.db.commit()
+
+def run_trial(study_path: str, trial_id: int, params: Dict, seed: int, timesteps: int, n_envs: int) -> Tuple[int, str]:
+    """Worker process: train one PPO trial, evaluating every HP_EVAL_EVERY timesteps and pruning if it lags."""
+    import torch
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.vec_env import DummyVecEnv
+    from stable_baselines3.common.callbacks import BaseCallback
+    from economy_sim.training.train_ppo import make_env
+    from economy_sim.training.evaluation import evaluate_policy
+
+    torch.set_num_threads(1) # One core per trial; the pool provides the parallelism
+    study = Study(study_path)
+
+    class PruningCallback(BaseCallback):
+        def __init__(self):
+            super().__init__()
+            self.next_eval = HP_EVAL_EVERY
+            self.n_reports = 0
+            self.pruned = False
+
+        def _on_step(self) -> bool:
+            if self.num_timesteps < self.next_eval:
+                return True
+            self.next_eval += HP_EVAL_EVERY
+            self.n_reports += 1
+            study.report(trial_id, self.num_timesteps, evaluate_policy(self.model, HP_EVAL_EPISODES)["return"])
+            self.pruned = study.should_prune(trial_id, self.num_timesteps, self.n_reports)
+            return not self.pruned
+
+    try:
+        env = DummyVecEnv([make_env(i, seed) for i in range(n_envs)])
+        ppo_params = dict(params)
+        # Minibatches can't be larger than a rollout
+        ppo_params["batch_size"] = min(ppo_params["batch_size"], ppo_params["n_steps"] * n_envs)
+        model = PPO("MlpPolicy", env, verbose=0, seed=seed, device="cpu", **ppo_params)
+        callback = PruningCallback()
+        model.learn(total_timesteps=timesteps, callback=callback)
+
+        if callback.pruned:
+            study.finish(trial_id, PRUNED)
+            return trial_id, PRUNED
+        value = evaluate_policy(model, HP_EVAL_EPISODES)["return"]
+        study.report(trial_id, model.num_timesteps, value)
+        study.finish(trial_id, COMPLETE, value)
+        return trial_id, COMPLETE
+    except Exception as e:
+        study.finish(trial_id, FAILED, error=repr(e))
+        return trial_id, FAILED
+    finally:
+        study.close()
+
+def search(n_trials: int, study_path: str = HP_STUDY_PATH, workers: Optional[int] = None,
+           timesteps: int = HP_TRIAL_TIMESTEPS, n_envs: int = HP_TRIAL_ENVS, seed: int = RANDOM_SEED) -> List[Dict]:
+    """
+    Run trials in parallel until the study holds `n_trials` finished ones.
+    Re-running with the same study file resumes: finished trials count toward
+    the total and interrupted ones are run again with their original parameters.
+    """
+    workers = workers or os.cpu_count() or 1
+    study = Study(study_path)
+    # Sampling continues where the previous search stopped
+    rng = np.random.default_rng([seed, study.db.execute("SELECT COUNT(*) FROM trials").fetchone()[0]])
+    queue = study.interrupted_trials()
+    remaining = n_trials - study.count()
+    if study.count() == 0 and not queue and remaining > 0:
+        # The current defaults are always trial 1
+        queue.append((study.add_trial(dict(PPO_HYPERPARAMS), seed), dict(PPO_HYPERPARAMS), seed))
+
+    print(f"Study {study_path}: {study.count()} finished trials, {len(queue)} to resume, "
+          f"{max(0, remaining)} to run on {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        while remaining > 0 or running:
+            while remaining > len(running) and len(running) < workers:
+                if queue:
+                    trial_id, params, trial_seed = queue.pop(0)
+                else:
+                    trial_seed = int(rng.integers(2**31 - 1))
+                    params = sample_params(HP_SEARCH_SPACE, rng)
+                    trial_id = study.add_trial(params, trial_seed)
+                running.add(pool.submit(run_trial, study_path, trial_id, params, trial_seed, timesteps, n_envs))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial_id, state = future.result()
+                remaining -= 1
+                print(f"Trial {trial_id}: {state} ({study.summary()})")
+
+    best = study.best(5)
+    study.close()
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel PPO hyperparameter search with median pruning")
+    parser.add_argument("--trials", type=int, default=50, help="Finished trials the study should hold")
+    parser.add_argument("--study", default=HP_STUDY_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent trials (default: CPU cores)")
+    parser.add_argument("--timesteps", type=int, default=HP_TRIAL_TIMESTEPS)
+    parser.add_argument("--envs", type=int, default=HP_TRIAL_ENVS)
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    parser.add_argument("--best", action="store_true", help="Only print the best trials of the study")
+    args = parser.parse_args()
+
+    if args.best:
+        study = Study(args.study)
+        best = study.best(5)
+        study.close()
+    else:
+        best = search(args.trials, args.study, args.workers, args.timesteps, args.envs, args.seed)
+
+    for rank, trial in enumerate(best, 1):
+        print(f"#{rank} trial {trial['trial']}: return {trial['value']:.2f}")
+        print(f"    {json.dumps(trial['params'])}")
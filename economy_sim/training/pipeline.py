@@ -0,0 +1,203 @@
+import time
+import numpy as np
+import torch as th
+from typing import Callable, Dict, List, Optional
+from gymnasium import spaces
+from stable_baselines3 import PPO
+from stable_baselines3.common.buffers import RolloutBuffer
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.utils import obs_as_tensor
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnv
+
+class PipelinedVecEnv(VecEnv):
+    """
+    Envs split into two SubprocVecEnv groups that can be stepped independently
+    (see PipelinedPPO). Used as a plain VecEnv it steps both groups together;
+    env indices 0..split-1 live in group A, the rest in group B.
+    """
+
+    def __init__(self, env_fns: List[Callable], start_method: Optional[str] = None):
+        if len(env_fns) < 2:
+            raise ValueError("PipelinedVecEnv needs at least 2 envs (one per group)")
+        self.split = len(env_fns) // 2
+        self.groups = (SubprocVecEnv(env_fns[:self.split], start_method),
+                       SubprocVecEnv(env_fns[self.split:], start_method))
+        super().__init__(len(env_fns), self.groups[0].observation_space, self.groups[0].action_space)
+
+    def _route(self, indices):
+        """Global env indices -> (group A indices, group B indices)."""
+        indices = list(self._get_indices(indices))
+        return [i for i in indices if i < self.split], [i - self.split for i in indices if i >= self.split]
+
+    def seed(self, seed: Optional[int] = None):
+        second = None if seed is None else seed + self.split
+        return self.groups[0].seed(seed) + self.groups[1].seed(second)
+
+    def set_options(self, options=None):
+        for group in self.groups:
+            group.set_options(options)
+
+    def reset(self):
+        obs = np.concatenate([group.reset() for group in self.groups])
+        self.reset_infos = self.groups[0].reset_infos + self.groups[1].reset_infos
+        return obs
+
+    def step_async(self, actions: np.ndarray):
+        self.groups[0].step_async(actions[:self.split])
+        self.groups[1].step_async(actions[self.split:])
+
+    def step_wait(self):
+        (obs_a, rew_a, done_a, infos_a), (obs_b, rew_b, done_b, infos_b) = (g.step_wait() for g in self.groups)
+        return (np.concatenate([obs_a, obs_b]), np.concatenate([rew_a, rew_b]),
+                np.concatenate([done_a, done_b]), infos_a + infos_b)
+
+    def close(self):
+        for group in self.groups:
+            group.close()
+
+    def get_attr(self, attr_name, indices=None):
+        a, b = self._route(indices)
+        return self.groups[0].get_attr(attr_name, a) + self.groups[1].get_attr(attr_name, b)
+
+    def set_attr(self, attr_name, value, indices=None):
+        a, b = self._route(indices)
+        self.groups[0].set_attr(attr_name, value, a)
+        self.groups[1].set_attr(attr_name, value, b)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        a, b = self._route(indices)
+        return (self.groups[0].env_method(method_name, *method_args, indices=a, **method_kwargs) +
+                self.groups[1].env_method(method_name, *method_args, indices=b, **method_kwargs))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        a, b = self._route(indices)
+        return self.groups[0].env_is_wrapped(wrapper_class, a) + self.groups[1].env_is_wrapped(wrapper_class, b)
+
+class PipelinedPPO(PPO):
+    """
+    PPO with a double-buffered rollout collector for a PipelinedVecEnv.
+
+    Policy inference for one group runs while the other group's workers step:
+    A's actions are sent, B's actions are computed (A stepping), A's results
+    are received and its next actions sent, then B's results are received
+    (B stepped while A's policy ran). Transitions enter the rollout buffer in
+    the same order as with the standard collector; the only difference is
+    that group A's next actions are already in flight when callbacks see a step.
+
+    Overlap is logged every rollout under pipeline/* and kept in
+    pipeline_stats: the share of env stepping latency the main process spent
+    on inference instead of waiting for workers.
+    Other env types (and gSDE) use the standard collector.
+    """
+
+    pipeline_stats: Dict[str, float] = {}
+
+    def _send(self, group: SubprocVecEnv, obs: np.ndarray, timer: Dict[str, float]):
+        """Policy forward pass for one group, then hand its actions to the group's workers."""
+        start = time.perf_counter()
+        with th.no_grad():
+            actions, values, log_probs = self.policy(obs_as_tensor(obs, self.device))
+        actions = actions.cpu().numpy()
+        if self.policy.squash_output:
+            clipped_actions = self.policy.unscale_action(actions)
+        else:
+            clipped_actions = np.clip(actions, self.action_space.low, self.action_space.high)
+        sent = time.perf_counter()
+        group.step_async(clipped_actions)
+        timer["inference"] += sent - start
+        return actions, values, log_probs, sent
+
+    def _receive(self, group: SubprocVecEnv, sent: float, timer: Dict[str, float]):
+        start = time.perf_counter()
+        result = group.step_wait()
+        done = time.perf_counter()
+        timer["wait"] += done - start
+        timer["latency"] += done - sent
+        return result
+
+    def collect_rollouts(self, env: VecEnv, callback: BaseCallback, rollout_buffer: RolloutBuffer,
+                         n_rollout_steps: int) -> bool:
+        if not isinstance(env, PipelinedVecEnv) or self.use_sde or not isinstance(self.action_space, spaces.Box):
+            return super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps)
+
+        assert self._last_obs is not None, "No previous observation was provided"
+        self.policy.set_training_mode(False)
+        n_steps = 0
+        rollout_buffer.reset()
+        callback.on_rollout_start()
+
+        group_a, group_b = env.groups
+        split = env.split
+        timer = {"inference": 0.0, "wait": 0.0, "latency": 0.0}
+        rollout_start = time.perf_counter()
+
+        pending_a = self._send(group_a, self._last_obs[:split], timer)
+        while n_steps < n_rollout_steps:
+            # B's inference overlaps A's step, A's next inference overlaps B's step
+            pending_b = self._send(group_b, self._last_obs[split:], timer)
+            obs_a, rewards_a, dones_a, infos_a = self._receive(group_a, pending_a[3], timer)
+            last_step = n_steps + 1 >= n_rollout_steps
+            next_a = None if last_step else self._send(group_a, obs_a, timer)
+            obs_b, rewards_b, dones_b, infos_b = self._receive(group_b, pending_b[3], timer)
+
+            actions = np.concatenate([pending_a[0], pending_b[0]])
+            values = th.cat([pending_a[1], pending_b[1]])
+            log_probs = th.cat([pending_a[2], pending_b[2]])
+            new_obs = np.concatenate([obs_a, obs_b])
+            rewards = np.concatenate([rewards_a, rewards_b])
+            dones = np.concatenate([dones_a, dones_b])
+            infos = infos_a + infos_b
+            pending_a = next_a
+
+            self.num_timesteps += env.num_envs
+
+            # Give access to local variables
+            callback.update_locals(locals())
+            if not callback.on_step():
+                if next_a is not None:
+                    # A already took its next step: keep the env state consistent, drop that transition
+                    obs_a, _, dones_a, _ = self._receive(group_a, next_a[3], timer)
+                    self._last_obs = np.concatenate([obs_a, obs_b])
+                    self._last_episode_starts = np.concatenate([dones_a, dones_b])
+                return False
+
+            self._update_info_buffer(infos, dones)
+            n_steps += 1
+
+            # Handle timeout by bootstraping with value function
+            for idx, done in enumerate(dones):
+                if (
+                    done
+                    and infos[idx].get("terminal_observation") is not None
+                    and infos[idx].get("TimeLimit.truncated", False)
+                ):
+                    terminal_obs = self.policy.obs_to_tensor(infos[idx]["terminal_observation"])[0]
+                    with th.no_grad():
+                        terminal_value = self.policy.predict_values(terminal_obs)[0]
+                    rewards[idx] += self.gamma * terminal_value
+
+            rollout_buffer.add(self._last_obs, actions, rewards, self._last_episode_starts, values, log_probs)
+            self._last_obs = new_obs
+            self._last_episode_starts = dones
+
+        with th.no_grad():
+            # Compute value for the last timestep
+            values = self.policy.predict_values(obs_as_tensor(new_obs, self.device))
+
+        rollout_buffer.compute_returns_and_advantage(last_values=values, dones=dones)
+
+        self.pipeline_stats = {
+            "rollout_s": time.perf_counter() - rollout_start,
+            "inference_s": timer["inference"],
+            "env_wait_s": timer["wait"],
+            "env_latency_s": timer["latency"],
+            "overlap": 1.0 - timer["wait"] / timer["latency"] if timer["latency"] > 0 else 0.0
+        }
+        for key, value in self.pipeline_stats.items():
+            self.logger.record(f"pipeline/{key}", value)
+
+        callback.update_locals(locals())
+
+        callback.on_rollout_end()
+
+        return True
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import pickle
+import random
+import shutil
+import hashlib
+import numpy as np
+import torch as th
+from typing import Dict, Optional, Tuple
+from stable_baselines3.common.callbacks import BaseCallback
+from economy_sim.config import RESUME_EVERY, RESUME_KEEP
+
+# A resume checkpoint is a directory step_<num_timesteps>/ holding
+#   model.zip       policy, optimizer, num_timesteps, _last_obs, _last_episode_starts, ep_info_buffer
+#   envs.pkl        EconomyEnv.snapshot() of every env (agents, RNG streams, step counter)
+#   rng.pkl         python / numpy / torch (CPU and CUDA) global RNG states
+#   progress.json   timestep budget, training arguments, telemetry run name
+#   manifest.json   sha256 of the files above, written last
+# It is built as step_<n>.tmp/ and renamed into place, so a crash mid-save
+# leaves either no checkpoint or a complete one; manifest hashes catch anything
+# the filesystem lost after the rename.
+CHECKPOINT_FILES = ("model.zip", "envs.pkl", "rng.pkl", "progress.json")
+MANIFEST_FILE = "manifest.json"
+
+def capture_rng() -> Dict:
+    state = {"python": random.getstate(), "numpy": np.random.get_state(), "torch": th.get_rng_state()}
+    if th.cuda.is_available():
+        state["cuda"] = th.cuda.get_rng_state_all()
+    return state
+
+def restore_rng(state: Dict):
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    th.set_rng_state(state["torch"])
+    if "cuda" in state and th.cuda.is_available():
+        th.cuda.set_rng_state_all(state["cuda"])
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def save_checkpoint(model, directory: str, progress: Dict) -> str:
+    """
+    Persist everything needed to continue model.learn exactly from here.
+    Call between rollouts (the rollout buffer is not saved). Returns the checkpoint path.
+    """
+    path = os.path.join(directory, f"step_{model.num_timesteps}")
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    model.save(os.path.join(tmp, "model.zip"))
+    _write(os.path.join(tmp, "envs.pkl"), pickle.dumps(model.get_env().env_method("snapshot")))
+    _write(os.path.join(tmp, "rng.pkl"), pickle.dumps(capture_rng()))
+    progress = dict(progress, num_timesteps=model.num_timesteps, timestamp=time.time())
+    _write(os.path.join(tmp, "progress.json"), json.dumps(progress, indent=1).encode())
+    manifest = {name: _sha256(os.path.join(tmp, name)) for name in CHECKPOINT_FILES}
+    _write(os.path.join(tmp, MANIFEST_FILE), json.dumps(manifest, indent=1).encode())
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return path
+
+def _checkpoint_steps(directory: str):
+    """(step, path) of every finished checkpoint directory, newest first."""
+    found = []
+    for name in os.listdir(directory) if os.path.isdir(directory) else []:
+        if name.startswith("step_") and name[len("step_"):].isdigit():
+            found.append((int(name[len("step_"):]), os.path.join(directory, name)))
+    return sorted(found, reverse=True)
+
+def is_consistent(path: str) -> bool:
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        return all(manifest.get(name) == _sha256(os.path.join(path, name)) for name in CHECKPOINT_FILES)
+    except (OSError, ValueError):
+        return False
+
+def latest_checkpoint(directory: str) -> Optional[str]:
+    """Newest checkpoint whose files all match its manifest (None if there is none)."""
+    for step, path in _checkpoint_steps(directory):
+        if is_consistent(path):
+            return path
+        print(f"Skipping inconsistent resume checkpoint {path}")
+    return None
+
+def prune(directory: str, keep: int = RESUME_KEEP):
+    """Drop interrupted saves and all but the newest `keep` consistent checkpoints."""
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith(".tmp"):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    kept = 0
+    for step, path in _checkpoint_steps(directory):
+        if kept < keep and is_consistent(path):
+            kept += 1
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+def load_checkpoint(path: str, model_class, env, device: str = "auto", **kwargs) -> Tuple[object, Dict]:
+    """
+    Rebuild the model on `env` (same number of envs as when saved) with its
+    optimizer, progress and envs restored, ready for
+    model.learn(progress["total_timesteps"] - model.num_timesteps, reset_num_timesteps=False).
+    Returns (model, progress).
+    """
+    with open(os.path.join(path, "progress.json")) as f:
+        progress = json.load(f)
+    with open(os.path.join(path, "envs.pkl"), "rb") as f:
+        snapshots = pickle.load(f)
+    if len(snapshots) != env.num_envs:
+        raise ValueError(f"Checkpoint {path} has {len(snapshots)} envs, the training env has {env.num_envs}")
+
+    # force_reset=False keeps the saved _last_obs, so learn() continues the current episodes
+    model = model_class.load(os.path.join(path, "model.zip"), env=env, device=device, force_reset=False, **kwargs)
+    restored = np.stack([env.env_method("restore", snapshot, indices=[i])[0] for i, snapshot in enumerate(snapshots)])
+    if not np.array_equal(restored, model._last_obs):
+        raise ValueError(f"Checkpoint {path}: restored envs do not match the saved observations")
+
+    # Last, so nothing above (model construction, env restore) consumes random numbers
+    with open(os.path.join(path, "rng.pkl"), "rb") as f:
+        restore_rng(pickle.load(f))
+    return model, progress
+
+class ResumeCallback(BaseCallback):
+    """
+    Saves a resume checkpoint (see save_checkpoint) at the start of a rollout
+    once `every` env steps have passed since the last one, and prunes older ones.
+    `progress` is stored with each checkpoint (budget and training arguments).
+    """
+
+    def __init__(self, directory: str, progress: Dict, every: int = RESUME_EVERY, keep: int = RESUME_KEEP,
+                 verbose: int = 1):
+        super().__init__(verbose)
+        self.directory = directory
+        self.progress = progress
+        self.every = every
+        self.keep = keep
+        self.last_saved = 0
+
+    def _on_training_start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.last_saved = self.num_timesteps # Resumed runs don't save the checkpoint they started from again
+
+    def _on_rollout_start(self):
+        # Between rollouts: the previous update is done and no transition of the next one is collected yet
+        if self.num_timesteps - self.last_saved >= self.every:
+            path = save_checkpoint(self.model, self.directory, self.progress)
+            prune(self.directory, self.keep)
+            self.last_saved = self.num_timesteps
+            if self.verbose:
+                print(f"Resume checkpoint: {path}")
+
+    def _on_step(self) -> bool:
+        return True
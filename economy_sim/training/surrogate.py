@@ -0,0 +1,211 @@
+import os
+import time
+import argparse
+import numpy as np
+from typing import Dict, Optional
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv, VecEnv
+from economy_sim.config import (
+    RANDOM_SEED,
+    EPISODE_LENGTH,
+    PPO_HYPERPARAMS,
+    SURROGATE_PATH,
+    SURROGATE_KIND,
+    SURROGATE_EPISODES,
+    SURROGATE_EVAL_EPISODES,
+    SURROGATE_ACTION_SWITCH_P,
+    SURROGATE_EVAL_HORIZONS,
+    SURROGATE_PRETRAIN_ENVS,
+    SURROGATE_PRETRAIN_N_STEPS,
+    SURROGATE_PRETRAIN_BATCH
+)
+from economy_sim.envs.economy_env import EconomyEnv
+from economy_sim.envs.surrogate_env import OBS_FIELDS, SurrogateModel, SurrogateEnv, BatchedSurrogateEconomy, surrogate_reward
+from economy_sim.training.telemetry import TelemetryCallback
+from economy_sim.training.train_ppo import make_env
+
+def collect(episodes: int, seed: int = RANDOM_SEED, episode_length: int = EPISODE_LENGTH) -> Dict[str, np.ndarray]:
+    """
+    Record real EconomyEnv episodes under a random piecewise-constant policy
+    (a new uniform action with probability SURROGATE_ACTION_SWITCH_P per step),
+    so the data covers sustained policies as well as policy changes.
+    Returns obs (episodes, T + 1, 7), actions (episodes, T, 3), rewards (episodes, T).
+    """
+    rng = np.random.default_rng(seed)
+    obs = np.zeros((episodes, episode_length + 1, len(OBS_FIELDS)))
+    actions = np.zeros((episodes, episode_length, 3))
+    rewards = np.zeros((episodes, episode_length))
+    env = EconomyEnv(episode_length=episode_length)
+    for e in range(episodes):
+        obs[e, 0], _ = env.reset(seed=seed + e)
+        action = rng.random(3)
+        for t in range(episode_length):
+            if rng.random() < SURROGATE_ACTION_SWITCH_P:
+                action = rng.random(3)
+            actions[e, t] = action
+            obs[e, t + 1], rewards[e, t], _, _, _ = env.step(action.astype(np.float32))
+    return {"obs": obs, "actions": actions, "rewards": rewards}
+
+def fit(data: Dict[str, np.ndarray], kind: str = SURROGATE_KIND, seed: int = RANDOM_SEED) -> SurrogateModel:
+    obs, actions = data["obs"], data["actions"]
+    n_obs = obs.shape[-1]
+    return SurrogateModel(kind).fit(
+        obs[:, :-1].reshape(-1, n_obs), actions.reshape(-1, actions.shape[-1]), obs[:, 1:].reshape(-1, n_obs),
+        initial_obs=obs[:, 0], seed=seed
+    )
+
+def evaluate(model: SurrogateModel, data: Dict[str, np.ndarray], horizons=SURROGATE_EVAL_HORIZONS) -> Dict:
+    """
+    Surrogate error against (held-out) real episodes, in units of each
+    field's standard deviation in the training data:
+    one-step error (fed the real observation every step), open-loop error
+    after each horizon (fed its own predictions, same actions), and the gap
+    between surrogate and real episode returns.
+    """
+    obs, actions, rewards = data["obs"], data["actions"], data["rewards"]
+    episodes, length, n_obs = actions.shape[0], actions.shape[1], obs.shape[-1]
+    scale = model.params["obs_scale"]
+
+    one_step = model.predict(obs[:, :-1].reshape(-1, n_obs), actions.reshape(-1, 3)).reshape(episodes, length, n_obs)
+    one_step_rmse = np.sqrt(((one_step - obs[:, 1:]) ** 2).mean(axis=(0, 1))) / scale
+
+    state = obs[:, 0]
+    open_loop = np.zeros((episodes, length, n_obs))
+    surrogate_rewards = np.zeros((episodes, length))
+    for t in range(length):
+        state = model.predict(state, actions[:, t])
+        open_loop[:, t] = state
+        surrogate_rewards[:, t] = surrogate_reward(state, np.full(episodes, t + 1))
+    open_loop_error = {
+        h: dict(zip(OBS_FIELDS, (np.abs(open_loop[:, h - 1] - obs[:, h]).mean(axis=0) / scale).tolist()))
+        for h in horizons if h <= length
+    }
+
+    real_return, surrogate_return = rewards.sum(axis=1), surrogate_rewards.sum(axis=1)
+    return {
+        "episodes": episodes,
+        "one_step_rmse": dict(zip(OBS_FIELDS, one_step_rmse.tolist())),
+        "open_loop_error": open_loop_error,
+        "real_return": float(real_return.mean()),
+        "surrogate_return": float(surrogate_return.mean()),
+        "return_rel_error": float(np.mean(np.abs(surrogate_return - real_return) / np.maximum(np.abs(real_return), 1e-9)))
+    }
+
+def print_report(report: Dict):
+    print(f"Surrogate error on {report['episodes']} held-out episodes (in training std units)")
+    print(f"  {'':<14}" + "".join(f"{field[:12]:>13}" for field in OBS_FIELDS))
+    print(f"  {'one step':<14}" + "".join(f"{report['one_step_rmse'][field]:>13.3f}" for field in OBS_FIELDS))
+    for h, errors in report["open_loop_error"].items():
+        print(f"  {f'open loop {h}':<14}" + "".join(f"{errors[field]:>13.3f}" for field in OBS_FIELDS))
+    print(f"  Episode return: real {report['real_return']:.1f}, surrogate {report['surrogate_return']:.1f} "
+          f"({report['return_rel_error']:.1%} mean relative error)")
+
+class SurrogateVecEnv(VecEnv):
+    """SB3 VecEnv over a BatchedSurrogateEconomy: every env advances in one vectorized model call."""
+
+    def __init__(self, model: SurrogateModel, n_envs: int = SURROGATE_PRETRAIN_ENVS,
+                 episode_length: int = EPISODE_LENGTH, seed: Optional[int] = None):
+        spaces_env = SurrogateEnv(model, episode_length)
+        super().__init__(n_envs, spaces_env.observation_space, spaces_env.action_space)
+        self.economy = BatchedSurrogateEconomy(model, n_envs, episode_length, seed)
+        self._actions = None
+        self._returns = np.zeros(n_envs, dtype=np.float64) # Per-env episode return so far, for info["episode"]
+
+    def reset(self):
+        self._returns[:] = 0.0
+        return self.economy.reset()
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        obs, rewards, dones, terminal_obs = self.economy.step(self._actions)
+        self._returns += rewards
+        infos = [{"gdp": float(o[4]), "unemployment": float(o[0]), "tax_revenue": float(o[3]), "months": 1} for o in obs]
+        for i, terminal in zip(np.flatnonzero(dones), terminal_obs):
+            infos[i] = {"gdp": float(terminal[4]), "unemployment": float(terminal[0]),
+                        "tax_revenue": float(terminal[3]), "months": 1, "terminal_observation": terminal,
+                        "TimeLimit.truncated": True,
+                        "episode": {"r": float(self._returns[i]), "l": self.economy.episode_length}}
+        self._returns[dones] = 0.0
+        return obs, rewards, dones, infos
+
+    def seed(self, seed: Optional[int] = None):
+        self.economy.rng = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.economy, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self.economy, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Calls the shared BatchedSurrogateEconomy's method once (like get_attr) and returns its result per env."""
+        method = getattr(self.economy, method_name, None)
+        if not callable(method):
+            raise AttributeError(f"SurrogateVecEnv cannot call {method_name!r}: BatchedSurrogateEconomy has no such "
+                                 f"method (EconomyEnv-only callbacks such as CurriculumCallback need the real simulator)")
+        return [method(*method_args, **method_kwargs)] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+def pretrain(surrogate_path: str = SURROGATE_PATH, timesteps: int = 5_000_000, finetune_timesteps: int = 100_000,
+             seed: int = RANDOM_SEED, models_dir: str = "models/ppo"):
+    """Train PPO on batched surrogate economies, then fine-tune the same policy on the real simulator."""
+    os.makedirs(models_dir, exist_ok=True)
+    surrogate = SurrogateModel.load(surrogate_path)
+    run = time.strftime("%Y%m%d-%H%M%S")
+
+    env = SurrogateVecEnv(surrogate, seed=seed)
+    params = dict(PPO_HYPERPARAMS, n_steps=SURROGATE_PRETRAIN_N_STEPS, batch_size=SURROGATE_PRETRAIN_BATCH)
+    model = PPO("MlpPolicy", env, verbose=1, seed=seed, device="cpu", **params)
+    print(f"Pre-training on {env.num_envs} surrogate economies ({surrogate.kind})...")
+    model.learn(total_timesteps=timesteps, callback=TelemetryCallback(run_name=f"surrogate-{run}"))
+    pretrained_path = f"{models_dir}/economy_ppo_surrogate_pretrained"
+    model.save(pretrained_path)
+
+    # Same policy weights, real simulator and the usual rollout settings
+    real_env = DummyVecEnv([make_env(0, seed)])
+    model = PPO.load(pretrained_path, env=real_env, n_steps=PPO_HYPERPARAMS["n_steps"],
+                     batch_size=PPO_HYPERPARAMS["batch_size"])
+    print("Fine-tuning on the real simulator...")
+    model.learn(total_timesteps=finetune_timesteps, callback=TelemetryCallback(run_name=f"finetune-{run}"))
+    model.save(f"{models_dir}/economy_ppo_surrogate_finetuned")
+    print("Training Complete. Model saved.")
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learned surrogate dynamics for cheap policy pre-training")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit_parser = commands.add_parser("fit", help="Record real episodes, fit the surrogate and report its error")
+    fit_parser.add_argument("--episodes", type=int, default=SURROGATE_EPISODES)
+    fit_parser.add_argument("--eval-episodes", type=int, default=SURROGATE_EVAL_EPISODES)
+    fit_parser.add_argument("--episode-length", type=int, default=EPISODE_LENGTH)
+    fit_parser.add_argument("--kind", choices=("ridge", "mlp"), default=SURROGATE_KIND)
+    fit_parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    fit_parser.add_argument("--out", default=SURROGATE_PATH)
+    pretrain_parser = commands.add_parser("pretrain", help="PPO on the surrogate, then fine-tune on the simulator")
+    pretrain_parser.add_argument("--surrogate", default=SURROGATE_PATH)
+    pretrain_parser.add_argument("--timesteps", type=int, default=5_000_000)
+    pretrain_parser.add_argument("--finetune", type=int, default=100_000)
+    pretrain_parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        start = time.perf_counter()
+        train_data = collect(args.episodes, args.seed, args.episode_length)
+        # Held-out episodes use seeds the training episodes never saw
+        eval_data = collect(args.eval_episodes, args.seed + args.episodes, args.episode_length)
+        print(f"Recorded {args.episodes} + {args.eval_episodes} episodes in {time.perf_counter() - start:.1f}s")
+        model = fit(train_data, args.kind, args.seed)
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        model.save(args.out)
+        print(f"Saved {args.kind} surrogate to {args.out}")
+        print_report(evaluate(model, eval_data))
+    else:
+        pretrain(args.surrogate, args.timesteps, args.finetune, args.seed)
@@ -0,0 +1,140 @@
+import json
+import time
+import socket
+import threading
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from economy_sim.config import TELEMETRY_HOST, TELEMETRY_PORT, TELEMETRY_QUEUE_SIZE, TELEMETRY_POLL_S
+
+# info keys averaged over each rollout (see EconomyEnv.step)
+MACRO_INFO_KEYS = ("gdp", "unemployment", "tax_revenue")
+
+class TelemetryPublisher:
+    """
+    Fire-and-forget JSON datagrams to the API server (see api_server.TelemetryRelay).
+
+    publish() only appends to a bounded deque (the oldest message is dropped
+    when full); a daemon thread drains it onto a UDP socket. Nothing on the
+    publishing side takes a lock or waits on the network, and datagrams to a
+    port nobody listens on are simply lost.
+    """
+
+    def __init__(self, host: str = TELEMETRY_HOST, port: int = TELEMETRY_PORT, maxlen: int = TELEMETRY_QUEUE_SIZE):
+        self.address = (host, port)
+        self.queue = deque(maxlen=maxlen)
+        self.published = 0
+        self.sent = 0
+        self._stop = False
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._thread = threading.Thread(target=self._run, name="telemetry-sender", daemon=True)
+        self._thread.start()
+
+    def publish(self, message: Dict):
+        self.queue.append(message)
+        self.published += 1
+
+    def _run(self):
+        while not self._stop or self.queue:
+            try:
+                message = self.queue.popleft()
+            except IndexError:
+                time.sleep(TELEMETRY_POLL_S)
+                continue
+            try:
+                self._socket.sendto(json.dumps(message).encode(), self.address)
+                self.sent += 1
+            except OSError:
+                pass # No listener / buffer full: telemetry is best effort
+
+    def close(self, timeout: float = 1.0):
+        """Send what is still queued (up to `timeout`) and stop the sender thread."""
+        self._stop = True
+        self._thread.join(timeout)
+        self._socket.close()
+
+class TelemetryCallback(BaseCallback):
+    """
+    Publishes one message per PPO iteration (rollout + update): fps, rollout
+    and update durations, episode returns, rollout means of the macro metrics
+    in `info`, and the latest train/* values from the SB3 logger.
+
+    A rollout's message is sent when the next rollout starts (or training
+    ends), once the update that followed it has been timed.
+    """
+
+    def __init__(self, run_name: Optional[str] = None, publisher: Optional[TelemetryPublisher] = None, verbose: int = 0):
+        super().__init__(verbose)
+        self.run_name = run_name or time.strftime("ppo-%Y%m%d-%H%M%S")
+        self.publisher = publisher
+        self.iteration = 0
+        self._rollout = None
+        self._rollout_end = None
+
+    def _on_training_start(self):
+        if self.publisher is None:
+            self.publisher = TelemetryPublisher()
+        self._returns = np.zeros(self.training_env.num_envs)
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        self._publish_iteration(now)
+        self._rollout = {
+            "start": now,
+            "start_timesteps": self.num_timesteps,
+            "episode_returns": [],
+            "macro_sums": dict.fromkeys(MACRO_INFO_KEYS, 0.0),
+            "macro_count": 0
+        }
+
+    def _on_step(self) -> bool:
+        rollout = self._rollout
+        self._returns += self.locals["rewards"]
+        for i, done in enumerate(self.locals["dones"]):
+            if done:
+                # Prefer the env's own total: it includes months before a resume, this sum does not
+                episode = self.locals["infos"][i].get("episode")
+                rollout["episode_returns"].append(float(episode["r"] if episode else self._returns[i]))
+                self._returns[i] = 0.0
+        for info in self.locals["infos"]:
+            for key in MACRO_INFO_KEYS:
+                rollout["macro_sums"][key] += float(info.get(key, 0.0))
+            rollout["macro_count"] += 1
+        return True
+
+    def _on_rollout_end(self):
+        self._rollout_end = time.perf_counter()
+        self._rollout["end_timesteps"] = self.num_timesteps
+
+    def _on_training_end(self):
+        self._publish_iteration(time.perf_counter())
+        self.publisher.close()
+
+    def _publish_iteration(self, now: float):
+        rollout = self._rollout
+        if rollout is None or self._rollout_end is None:
+            return
+        self._rollout = None
+        rollout_s = self._rollout_end - rollout["start"]
+        steps = rollout["end_timesteps"] - rollout["start_timesteps"]
+        returns = rollout["episode_returns"]
+        count = max(rollout["macro_count"], 1)
+
+        self.iteration += 1
+        self.publisher.publish({
+            "type": "training",
+            "run": self.run_name,
+            "iteration": self.iteration,
+            "timesteps": int(rollout["end_timesteps"]),
+            "fps": steps / rollout_s if rollout_s > 0 else 0.0,
+            "rollout_seconds": rollout_s,
+            "update_seconds": now - self._rollout_end,
+            "episodes": len(returns),
+            "episode_return_mean": float(np.mean(returns)) if returns else None,
+            "macro": {key: value / count for key, value in rollout["macro_sums"].items()},
+            "train": {key: float(value) for key, value in self.logger.name_to_value.items()
+                      if key.startswith("train/")},
+            "time": time.time()
+        })
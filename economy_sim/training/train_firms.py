@@ -0,0 +1,167 @@
+import os
+import time
+import argparse
+import numpy as np
+from typing import Dict, List, Optional
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import VecEnv
+from economy_sim.config import (
+    RANDOM_SEED,
+    EPISODE_LENGTH,
+    PPO_HYPERPARAMS,
+    FIRM_GOVT_ACTION,
+    FIRM_ECONOMIES,
+    FIRM_PPO_N_STEPS,
+    FIRM_PPO_BATCH
+)
+from economy_sim.envs.economy_env import EconomyEnv
+from economy_sim.envs.multi_agent_env import MultiAgentEconomyEnv, firm_totals, firm_rewards
+from economy_sim.training.telemetry import TelemetryCallback
+from economy_sim.utils.checkpoint_store import load_policy_by_name
+
+def government_actions(government, obs: np.ndarray) -> np.ndarray:
+    """Actions for a batch of government observations: one predict() call, or FIRM_GOVT_ACTION for every economy."""
+    if government is None:
+        return np.tile(np.asarray(FIRM_GOVT_ACTION, dtype=np.float32), (len(obs), 1))
+    actions, _ = government.predict(obs, deterministic=True)
+    return actions
+
+class FirmVecEnv(VecEnv):
+    """
+    Every firm of n_economies MultiAgentEconomyEnvs as one SB3 VecEnv, so PPO
+    trains a single shared firm policy and each rollout step is one forward
+    pass over all n_economies * n_firms firms. Env index e * n_firms + i is
+    firm i of economy e. The government acts through a fixed policy
+    (`government`, anything with predict(), batched over the economies) or
+    FIRM_GOVT_ACTION. Finished economies restart right away.
+    """
+
+    def __init__(self, n_economies: int = FIRM_ECONOMIES, seed: int = RANDOM_SEED, government=None, **env_kwargs):
+        self.economies = [MultiAgentEconomyEnv(**env_kwargs) for _ in range(n_economies)]
+        self.n_firms = self.economies[0].n_firms
+        first = self.economies[0]
+        super().__init__(n_economies * self.n_firms, first.firm_observation_space, first.firm_action_space)
+        self.government = government
+        self.base_seed = seed
+        self.government_obs = None
+        self._actions = None
+
+    def reset(self):
+        reset = [economy.reset(seed=self.base_seed + e)[0] for e, economy in enumerate(self.economies)]
+        self.government_obs = np.stack(reset)
+        return np.concatenate([economy.firm_observations() for economy in self.economies])
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        firm_actions = np.asarray(self._actions, dtype=np.float32).reshape(len(self.economies), self.n_firms, -1)
+        policy_actions = government_actions(self.government, self.government_obs)
+        obs, rewards, dones, infos = [], [], [], []
+        for e, economy in enumerate(self.economies):
+            government_obs, _, firm_obs, firm_reward, terminated, truncated, info = economy.step_agents(
+                policy_actions[e], firm_actions[e])
+            done = terminated or truncated
+            if done:
+                infos += [dict(info, terminal_observation=firm_obs[i], **{"TimeLimit.truncated": not terminated})
+                          for i in range(self.n_firms)]
+                government_obs, _ = economy.reset()
+                firm_obs = economy.firm_observations()
+            else:
+                infos += [info] * self.n_firms
+            self.government_obs[e] = government_obs
+            obs.append(firm_obs)
+            rewards.append(firm_reward)
+            dones.append(np.full(self.n_firms, done))
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(dones), infos
+
+    def seed(self, seed: Optional[int] = None):
+        if seed is not None:
+            self.base_seed = seed
+        return [self.base_seed + i // self.n_firms for i in range(self.num_envs)]
+
+    def close(self):
+        pass
+
+    def _economy_indices(self, indices) -> List[int]:
+        return [i // self.n_firms for i in self._get_indices(indices)]
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.economies[e], attr_name) for e in self._economy_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        for e in set(self._economy_indices(indices)):
+            setattr(self.economies[e], attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(self.economies[e], method_name)(*method_args, **method_kwargs)
+                for e in self._economy_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+def evaluate(firm_policy=None, government=None, episodes: int = 1, seed: int = RANDOM_SEED,
+             episode_length: int = EPISODE_LENGTH) -> Dict:
+    """
+    Mean firm reward per month, bankruptcies, final unemployment and price
+    level over `episodes` economies. firm_policy=None runs the heuristic firms
+    (plain EconomyEnv) on the same seeds for comparison.
+    """
+    rewards, bankruptcies, unemployment, price_level = [], [], [], []
+    for episode in range(episodes):
+        env = MultiAgentEconomyEnv(episode_length=episode_length) if firm_policy is not None else EconomyEnv(episode_length=episode_length)
+        obs, _ = env.reset(seed=seed + episode)
+        manager = env.agent_manager
+        done, info = False, {}
+        while not done:
+            action = government_actions(government, obs[None, :])[0]
+            if firm_policy is not None:
+                firm_actions, _ = firm_policy.predict(env.firm_observations(), deterministic=True)
+                obs, _, _, reward, terminated, truncated, info = env.step_agents(action, firm_actions)
+            else:
+                before = firm_totals(manager)
+                obs, _, terminated, truncated, info = env.step(action)
+                reward = firm_rewards(manager, before, firm_totals(manager))
+            rewards.append(float(reward.mean()))
+            done = terminated or truncated
+        bankruptcies.append(int(manager.firm_column("bankruptcies").sum()))
+        unemployment.append(info.get("unemployment", 0.0))
+        price_level.append(manager.avg_price)
+    return {
+        "firm_reward": float(np.mean(rewards)),
+        "bankruptcies": float(np.mean(bankruptcies)),
+        "unemployment": float(np.mean(unemployment)),
+        "avg_price": float(np.mean(price_level))
+    }
+
+def train(timesteps: int = 2_000_000, n_economies: int = FIRM_ECONOMIES, government_name: Optional[str] = None,
+          seed: int = RANDOM_SEED, eval_episodes: int = 1, models_dir: str = "models/firms"):
+    """Train the shared firm policy with PPO on FirmVecEnv, then compare it with the heuristic firms."""
+    os.makedirs(models_dir, exist_ok=True)
+    government = load_policy_by_name("models/ppo", government_name) if government_name else None
+    env = FirmVecEnv(n_economies, seed, government)
+    params = dict(PPO_HYPERPARAMS, n_steps=FIRM_PPO_N_STEPS, batch_size=FIRM_PPO_BATCH)
+    model = PPO("MlpPolicy", env, verbose=1, seed=seed, device="cuda", **params)
+
+    print(f"Training the firm policy on {env.num_envs} firms ({n_economies} economies x {env.n_firms})...")
+    model.learn(total_timesteps=timesteps, callback=TelemetryCallback(run_name=time.strftime("firms-%Y%m%d-%H%M%S")))
+    model.save(f"{models_dir}/firm_policy_final")
+    print("Training Complete. Model saved.")
+
+    if eval_episodes:
+        for label, policy in (("heuristic firms", None), ("learned firms", model)):
+            result = evaluate(policy, government, eval_episodes, seed + 10_000)
+            print(f"{label:<16} firm reward/month {result['firm_reward']:8.3f}, bankruptcies {result['bankruptcies']:.1f}, "
+                  f"final unemployment {result['unemployment']:.1%}, avg price {result['avg_price']:.2f}")
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a shared price/wage policy for all firms")
+    parser.add_argument("--timesteps", type=int, default=2_000_000, help="Firm-steps (economies x firms x months)")
+    parser.add_argument("--economies", type=int, default=FIRM_ECONOMIES)
+    parser.add_argument("--government", default=None,
+                        help="Government model in models/ppo (default: fixed FIRM_GOVT_ACTION)")
+    parser.add_argument("--eval-episodes", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    args = parser.parse_args()
+    train(args.timesteps, args.economies, args.government, args.seed, args.eval_episodes)
@@ -1,22 +1,77 @@
 import os
+import time
+import shutil
 import gymnasium as gym
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
-from stable_baselines3.common.callbacks import CheckpointCallback
+from stable_baselines3.common.callbacks import BaseCallback, CallbackList
 from economy_sim.envs.economy_env import EconomyEnv
-from economy_sim.config import RANDOM_SEED
+from economy_sim.config import (
+    RANDOM_SEED,
+    PPO_HYPERPARAMS,
+    CURRICULUM,
+    CURRICULUM_EVAL_SCALES,
+    DECISION_INTERVAL,
+    PIPELINE_ENVS,
+    CHECKPOINT_EVERY,
+    CHECKPOINT_EVAL_EPISODES,
+    RESUME_DIR,
+    TRAIN_TIMESTEPS
+)
+from economy_sim.training.telemetry import TelemetryCallback
+from economy_sim.training.curriculum import CurriculumCallback, evaluate_at_scales
+from economy_sim.training.pipeline import PipelinedPPO, PipelinedVecEnv
+from economy_sim.training.evaluation import evaluate_policy
+from economy_sim.training.resume import ResumeCallback, latest_checkpoint, load_checkpoint
+from economy_sim.utils.checkpoint_store import CheckpointStore, store_for
 
-def make_env(rank: int, seed: int = 0):
+def make_env(rank: int, seed: int = 0, **env_kwargs):
     """
     Utility function for multiprocessed env.
     """
     def _init():
-        env = EconomyEnv()
+        env = EconomyEnv(**env_kwargs)
         env.reset(seed=seed + rank)
         return env
     return _init
 
-def train():
+class StoreCheckpointCallback(BaseCallback):
+    """
+    Each time num_timesteps passes a multiple of save_freq, adds the model to
+    the deduplicated checkpoint store (utils/checkpoint_store.py) as
+    <name_prefix>_<timesteps>_steps, with the mean deterministic return over
+    eval_episodes as its score and the envs' decision_interval recorded with
+    it (the dashboard holds the policy's actions that long). Keyed off
+    num_timesteps (not n_calls), so a resumed run keeps the cadence of the
+    run it continues.
+    """
+
+    def __init__(self, store: CheckpointStore, save_freq: int = CHECKPOINT_EVERY, name_prefix: str = "economy_ppo",
+                 eval_episodes: int = CHECKPOINT_EVAL_EPISODES, env_kwargs=None, verbose: int = 1):
+        super().__init__(verbose)
+        self.store = store
+        self.save_freq = save_freq
+        self.name_prefix = name_prefix
+        self.eval_episodes = eval_episodes
+        self.env_kwargs = env_kwargs or {}
+        self.next_save = save_freq
+
+    def _on_training_start(self):
+        self.next_save = (self.num_timesteps // self.save_freq + 1) * self.save_freq
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps >= self.next_save:
+            self.next_save = (self.num_timesteps // self.save_freq + 1) * self.save_freq
+            name = f"{self.name_prefix}_{self.num_timesteps}_steps"
+            score = evaluate_policy(self.model, self.eval_episodes, **self.env_kwargs)["return"] if self.eval_episodes else None
+            entry = self.store.put_model(self.model, name, self.num_timesteps, score,
+                                         self.env_kwargs.get("decision_interval", 1))
+            if self.verbose:
+                print(f"Checkpoint {name}: {entry['bytes'] / 1e6:.2f} MB, {entry['new_bytes'] / 1e6:.2f} MB new in store")
+        return True
+
+def train(curriculum: bool = False, decision_interval: int = DECISION_INTERVAL, collector: str = "sync",
+          resume: bool = False, total_timesteps: int = TRAIN_TIMESTEPS):
     # Create directories
     models_dir = "models/ppo"
     logs_dir = "logs"
@@ -28,45 +83,96 @@ def train():
     # num_cpu = 4  # Adjust based on your i9
     # env = SubprocVecEnv([make_env(i, RANDOM_SEED) for i in range(num_cpu)])
     
-    # For debugging/initial run, use DummyVecEnv (Single Process)
-    env = DummyVecEnv([make_env(0, RANDOM_SEED)])
+    env_kwargs = {"decision_interval": decision_interval}
+    if curriculum:
+        # Start on the smallest economy; observations must not depend on its size
+        _, n_households, n_firms, episode_length = CURRICULUM[0]
+        env_kwargs.update(n_households=n_households, n_firms=n_firms, episode_length=episode_length,
+                          scale_invariant_obs=True)
+    if collector == "pipelined":
+        # Two worker groups: one steps while the policy runs on the other (see training/pipeline.py)
+        env = PipelinedVecEnv([make_env(i, RANDOM_SEED, **env_kwargs) for i in range(PIPELINE_ENVS)])
+    else:
+        # For debugging/initial run, use DummyVecEnv (Single Process)
+        env = DummyVecEnv([make_env(0, RANDOM_SEED, **env_kwargs)])
+
+    # One step spans decision_interval months: discount per step so the horizon in months is unchanged
+    ppo_params = dict(PPO_HYPERPARAMS, gamma=PPO_HYPERPARAMS["gamma"] ** decision_interval)
 
-    # Initialize PPO Agent
-    model = PPO(
-        "MlpPolicy",
-        env,
-        verbose=1,
-        tensorboard_log=logs_dir,
-        learning_rate=0.0003,
-        n_steps=2048,
-        batch_size=64,
-        n_epochs=10,
-        gamma=0.99,
-        gae_lambda=0.95,
-        clip_range=0.2,
-        device="cuda" # Use RTX 4070
-    )
+    # Curriculum models expect scale-invariant observations (OBS_SCALE_INVARIANT)
+    model_name = "economy_ppo_curriculum_final" if curriculum else "economy_ppo_final"
+    if decision_interval > 1:
+        model_name += f"_every{decision_interval}" # Expects to be stepped every decision_interval months
 
-    # Save a checkpoint every 10,000 steps
-    checkpoint_callback = CheckpointCallback(
-        save_freq=10000,
-        save_path=models_dir,
-        name_prefix="economy_ppo"
-    )
+    # With --resume, continue from the newest complete resume checkpoint of this configuration
+    resume_dir = os.path.join(models_dir, RESUME_DIR, model_name)
+    checkpoint = latest_checkpoint(resume_dir) if resume else None
+    model_class = PipelinedPPO if collector == "pipelined" else PPO
+    if checkpoint:
+        model, progress = load_checkpoint(checkpoint, model_class, env, device="cuda")
+        print(f"Resuming from {checkpoint} at timestep {model.num_timesteps} of {progress['total_timesteps']}")
+    else:
+        # Initialize PPO Agent
+        model = model_class(
+            "MlpPolicy",
+            env,
+            verbose=1,
+            tensorboard_log=logs_dir,
+            **ppo_params, # See config.py (tuned with training/hp_search.py)
+            device="cuda" # Use RTX 4070
+        )
+        progress = {"total_timesteps": total_timesteps, "run_name": time.strftime("ppo-%Y%m%d-%H%M%S"),
+                    "curriculum": curriculum, "decision_interval": decision_interval, "collector": collector}
+
+    # Save a checkpoint every 10,000 steps (deduplicated into models/ppo/store)
+    store = store_for(models_dir)
+    checkpoint_callback = StoreCheckpointCallback(store, env_kwargs=env_kwargs)
+    
+    # Live per-rollout stats for the dashboard (dropped if the API server isn't running)
+    telemetry_callback = TelemetryCallback(run_name=progress["run_name"])
+    callbacks = [checkpoint_callback, telemetry_callback]
+    if curriculum:
+        callbacks.append(CurriculumCallback())
+    if resume:
+        callbacks.append(ResumeCallback(resume_dir, progress))
 
     print("Starting PPO Training...")
     print(f"Device: {model.device}")
     
-    # Train for 100,000 steps (approx 300 episodes)
-    model.learn(total_timesteps=100000, callback=checkpoint_callback)
+    # Train for 100,000 steps (approx 300 episodes); a resumed run only does what is left of its budget
+    # and keeps counting timesteps (tensorboard, LR schedule) from where it stopped
+    model.learn(total_timesteps=progress["total_timesteps"] - model.num_timesteps, callback=CallbackList(callbacks),
+                reset_num_timesteps=checkpoint is None)
     
     # Save final model
-    model.save(f"{models_dir}/economy_ppo_final")
+    model.save(f"{models_dir}/{model_name}")
+    store.put_model(model, model_name, model.num_timesteps, decision_interval=decision_interval)
+    if resume:
+        shutil.rmtree(resume_dir, ignore_errors=True) # Run finished: the next --resume starts a new one
     print("Training Complete. Model saved.")
     
+    if curriculum:
+        # Trained small: check it holds up on full-size and larger economies
+        for result in evaluate_at_scales(model, CURRICULUM_EVAL_SCALES, decision_interval=decision_interval):
+            print(f"Eval {result['n_households']} households / {result['n_firms']} firms: "
+                  f"return {result['return']:.1f}, final unemployment {result['unemployment']:.1%}")
+    
     # Append to log file
     with open("training_summary_log.txt", "a") as f:
-        f.write(f"\n\nTraining Run Completed.\nTotal Timesteps: 100,000\nDevice: {model.device}\n")
+        f.write(f"\n\nTraining Run Completed.\nTotal Timesteps: {progress['total_timesteps']:,}\nDevice: {model.device}\n")
 
 if __name__ == "__main__":
-    train()
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the PPO policy agent")
+    parser.add_argument("--curriculum", action="store_true",
+                        help="Grow the economy along config.CURRICULUM (scale-invariant observations)")
+    parser.add_argument("--decision-interval", type=int, default=DECISION_INTERVAL,
+                        help="Months each action is held for (3 = quarterly, 12 = yearly)")
+    parser.add_argument("--collector", choices=("sync", "pipelined"), default="sync",
+                        help="pipelined: overlap policy inference with env stepping over PIPELINE_ENVS worker envs")
+    parser.add_argument("--resume", action="store_true",
+                        help="Save resume checkpoints and continue from the newest one after a crash")
+    parser.add_argument("--timesteps", type=int, default=TRAIN_TIMESTEPS)
+    args = parser.parse_args()
+    train(curriculum=args.curriculum, decision_interval=args.decision_interval, collector=args.collector,
+          resume=args.resume, total_timesteps=args.timesteps)
@@ -0,0 +1,128 @@
+import numpy as np
+from typing import Optional
+from economy_sim.envs.components.agent_manager import HOUSEHOLD_COLUMNS, FIRM_COLUMNS
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+class AgentQuery:
+    """
+    Sorted, filtered windows over the households / firms of an AgentManager.
+
+    Columns come from AgentManager.household_column()/firm_column() (built lazily,
+    once per step). Sort orders are cached per (table, field) until the manager
+    steps again, so paging through a table only serializes the visible rows.
+    """
+
+    def __init__(self, agent_manager):
+        self.agent_manager = agent_manager
+        self._orders = {}
+        self._version = None
+
+    def households(self, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE, sort_by: str = "id",
+                   descending: bool = False, employed: Optional[bool] = None,
+                   subsistence_failed: Optional[bool] = None,
+                   min_cash: Optional[float] = None, max_cash: Optional[float] = None):
+        manager = self.agent_manager
+        mask = self._cash_mask(manager.household_column, min_cash, max_cash)
+        if employed is not None:
+            mask &= manager.household_column("employed") == employed
+        if subsistence_failed is not None:
+            mask &= manager.household_column("subsistence_failed") == subsistence_failed
+
+        return self._window("households", HOUSEHOLD_COLUMNS, manager.households, manager.household_column,
+                            mask, offset, limit, sort_by, descending)
+
+    def firms(self, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE, sort_by: str = "id",
+              descending: bool = False, tier: Optional[int] = None,
+              min_cash: Optional[float] = None, max_cash: Optional[float] = None):
+        manager = self.agent_manager
+        mask = self._cash_mask(manager.firm_column, min_cash, max_cash)
+        if tier is not None:
+            mask &= manager.firm_column("tier") == tier
+
+        return self._window("firms", FIRM_COLUMNS, manager.firms, manager.firm_column,
+                            mask, offset, limit, sort_by, descending)
+
+    def query(self, table: str, **params):
+        """Dispatch a query by table name (used by the WebSocket subscriptions)."""
+        if table == "households":
+            return self.households(**params)
+        if table == "firms":
+            return self.firms(**params)
+        raise ValueError(f"Unknown table: {table}")
+
+    def household_summary(self):
+        """Population-wide aggregates for the households view (independent of the window)."""
+        manager = self.agent_manager
+        total = len(manager.households)
+        if total == 0:
+            return {"total": 0, "employed": 0, "avg_skill": 0.0, "avg_reservation_wage": 0.0,
+                    "avg_contract_remaining": 0.0, "poverty_rate": 0.0, "avg_cash": 0.0, "avg_wage": 0.0}
+
+        # Cohorts carry weights; individual households count once
+        weights = manager.household_weights()
+        if weights is None:
+            weights = np.ones(total)
+        employed = manager.household_column("employed")
+        employed_weight = weights[employed].sum()
+
+        def mean(field):
+            return float(np.average(manager.household_column(field), weights=weights))
+
+        def employed_mean(field):
+            return float((manager.household_column(field) * weights)[employed].sum() / max(employed_weight, 1e-9))
+
+        return {
+            "total": int(round(weights.sum() * manager.population_scale)),
+            "employed": int(round(employed_weight * manager.population_scale)),
+            "avg_skill": mean("skill"),
+            "avg_reservation_wage": mean("reservation_wage"),
+            "avg_contract_remaining": employed_mean("contract_remaining"),
+            "poverty_rate": mean("subsistence_failed"),
+            "avg_cash": mean("cash"),
+            "avg_wage": employed_mean("wage"),
+        }
+
+    def _cash_mask(self, column, min_cash, max_cash):
+        cash = column("cash")
+        mask = np.ones(len(cash), dtype=bool)
+        if min_cash is not None:
+            mask &= cash >= min_cash
+        if max_cash is not None:
+            mask &= cash <= max_cash
+        return mask
+
+    def _sort_order(self, table, column, field):
+        # Drop cached orders once the manager has stepped
+        if self._version != self.agent_manager.version:
+            self._orders = {}
+            self._version = self.agent_manager.version
+
+        key = (table, field)
+        if key not in self._orders:
+            self._orders[key] = np.argsort(column(field), kind="stable")
+        return self._orders[key]
+
+    def _window(self, table, columns, agents, column, mask, offset, limit, sort_by, descending):
+        if sort_by not in columns:
+            raise ValueError(f"Cannot sort {table} by '{sort_by}'")
+        offset = max(0, int(offset))
+        limit = min(max(0, int(limit)), MAX_PAGE_SIZE)
+
+        order = self._sort_order(table, column, sort_by)
+        if descending:
+            order = order[::-1]
+        matched = order[mask[order]]
+        window = matched[offset:offset + limit]
+
+        return {
+            "table": table,
+            "total": len(agents),
+            "matched": int(len(matched)),
+            "offset": offset,
+            "limit": limit,
+            "sort_by": sort_by,
+            "descending": descending,
+            "rows": [agents[i].get_state() for i in window],
+        }
@@ -1,12 +1,29 @@
 import asyncio
 import json
+import time
 import numpy as np
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from stable_baselines3 import PPO
 from economy_sim.envs.economy_env import EconomyEnv
+from economy_sim.envs.branching import BranchJob
+from economy_sim.config import (
+    FAST_FORWARD_REPORT_EVERY, ARCHIVE_ENABLED, ARCHIVE_DIR, ARCHIVE_KEEP_RUNS, ARCHIVE_OPEN_READERS,
+    TELEMETRY_HOST, TELEMETRY_PORT, TELEMETRY_HISTORY, MACRO_DASHBOARD_FEATURES
+)
+from economy_sim.utils.agent_query import AgentQuery, DEFAULT_PAGE_SIZE
+from economy_sim.utils.episode_archive import (
+    EpisodeWriter, EpisodeArchive, list_runs, prune_runs, rows_to_states, HOUSEHOLD_FIELDS, FIRM_FIELDS
+)
+from economy_sim.envs.components.agent_manager import HOUSEHOLD_COLUMNS, FIRM_COLUMNS
+from economy_sim.envs.components.macro_history import MacroHistory, STAT_SERIES
+from economy_sim.utils.checkpoint_store import store_for, load_policy_by_name, model_decision_interval
+from economy_sim.utils import batch_rpc
 
 app = FastAPI()
+# Headless env pools for external clients (/rpc/*, independent of the dashboard's env)
+app.include_router(batch_rpc.router)
 
 # Allow CORS for frontend
 app.add_middleware(
@@ -19,26 +36,50 @@ app.add_middleware(
 
 import os
 import glob
+from typing import Optional
 from pydantic import BaseModel
 
 # Global Simulation State
-env = EconomyEnv()
-obs, _ = env.reset() # Initialize obs
+# env/obs/model are built in the background after the server starts listening (see initialize)
+env = None
+obs = None
 model = None
+model_interval = 1 # Months the loaded model's actions are held for (its training decision_interval)
+model_decision = None # (step, action) of the model's last decision
 is_running = False # Start Paused
 simulation_speed = 1.0 # Steps per second (approx)
 manual_override = False
 manual_action = [0.0, 0.0, 0.0] # [Income Tax, Corp Tax, UBI]
+agent_query = None # AgentQuery over env.agent_manager (see get_query)
+fast_forward_target = None # Step the fast forward worker is running to (None = stop after the current chunk)
+fast_forward_task = None
+fast_forward_active = False # True until the fast forward task has finished: the worker owns env meanwhile
+branch_start = None # Task building a BranchJob in a worker thread: it reads env, so no steps/resets until done
+archive_writer = None # EpisodeWriter for the current episode
+archive_executor = ThreadPoolExecutor(max_workers=1) # Archive writes and pruning, in order, off the event loop
+open_archives = OrderedDict() # run_id -> EpisodeArchive (memory-mapped readers), least recently used first
+training_history = deque(maxlen=TELEMETRY_HISTORY) # Latest training telemetry messages
+
+# Startup progress, reported by /ready (model_ready: the default model was found and loaded)
+init_state = {"env_ready": False, "model_ready": False, "ready": False, "error": None, "seconds": None}
+env_ready = None # asyncio.Event, set once env/obs exist (or startup failed, see init_state["error"])
+
+# Rolling macro features each frame needs: the dashboard's, plus inflation for inflation_rate
+FRAME_MACRO_FEATURES = tuple(dict.fromkeys(MACRO_DASHBOARD_FEATURES + ("inflation",)))
 
 # Model Management
 MODELS_DIR = os.path.join(os.path.dirname(__file__), "../../models/ppo")
+ARCHIVE_ROOT = os.path.join(os.path.dirname(__file__), "../..", ARCHIVE_DIR)
 
 def load_model_by_name(model_name: str):
-    global model
+    global model, model_interval, model_decision
     try:
-        path = os.path.join(MODELS_DIR, model_name)
-        model = PPO.load(path)
-        print(f"Loaded model: {model_name}")
+        # Store checkpoints load inference-only; importing stable_baselines3 (deferred) pulls in torch
+        model = load_policy_by_name(MODELS_DIR, model_name)
+        # The env stays monthly; a model trained with decision_interval k decides every k months
+        model_interval = model_decision_interval(MODELS_DIR, model_name)
+        model_decision = None
+        print(f"Loaded model: {model_name}" + (f" (acts every {model_interval} months)" if model_interval > 1 else ""))
         return True
     except Exception as e:
         print(f"Failed to load model {model_name}: {e}")
@@ -46,38 +87,278 @@ def load_model_by_name(model_name: str):
 
 # Initial Load
 initial_model_path = os.path.join(MODELS_DIR, "economy_ppo_final")
-if os.path.exists(initial_model_path + ".zip"):
-    model = PPO.load(initial_model_path)
+
+def build_env():
+    global env
+    env = EconomyEnv()
+    reset_env() # Initialize obs
+
+def reset_env():
+    """Reset the env and start a new archive run for the new episode."""
+    global obs, archive_writer
+    env.agent_manager.ledger.close() # Flush the finished episode's flows
+    obs, _ = env.reset()
+    if ARCHIVE_ENABLED:
+        if archive_writer is not None:
+            archive_writer.close()
+        archive_writer = EpisodeWriter(ARCHIVE_ROOT, executor=archive_executor)
+        archive_writer.append(env.current_step, env.agent_manager)
+        archive_executor.submit(prune_runs, ARCHIVE_ROOT, ARCHIVE_KEEP_RUNS)
+        # The run's money flows go next to its archive
+        env.agent_manager.ledger.open(os.path.join(archive_writer.path, "ledger"))
+
+def step_env(action) -> bool:
+    """Step the env, archive the new state, and return True if the episode ended."""
+    global obs
+    obs, reward, terminated, truncated, info = env.step(action)
+    if archive_writer is not None:
+        archive_writer.append(env.current_step, env.agent_manager)
+    return terminated or truncated
+
+def load_initial_model() -> bool:
+    if os.path.exists(initial_model_path + ".zip") or "economy_ppo_final" in store_for(MODELS_DIR):
+        return load_model_by_name("economy_ppo_final")
+    return False
+
+async def initialize():
+    """Build the env, then load the default model, in worker threads (server is already listening)."""
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        await loop.run_in_executor(None, build_env)
+        init_state["env_ready"] = True
+        env_ready.set()
+
+        init_state["model_ready"] = await loop.run_in_executor(None, load_initial_model)
+        init_state["ready"] = True # Without a model the simulation runs on random actions
+    except Exception as e:
+        init_state["error"] = str(e)
+        env_ready.set() # Wake waiting WebSockets so they can report the error
+    init_state["seconds"] = time.perf_counter() - start
+    if init_state["error"] is None:
+        print(f"Simulation ready in {init_state['seconds']:.2f}s")
+    else:
+        print(f"Initialization failed after {init_state['seconds']:.2f}s: {init_state['error']}")
+
+@app.get("/ready")
+async def ready():
+    """Startup progress: env_ready once frames can be served, ready once the default model load was tried (model_ready: it loaded)."""
+    return init_state
+
+def not_ready_response():
+    return {"status": "error", "message": "Simulation is still starting"}
+
+def busy_response():
+    return {"status": "error", "message": "Simulation is fast forwarding"}
 
 class LoadModelRequest(BaseModel):
     model_name: str
 
 @app.get("/models")
 async def list_models():
-    """List all available .zip models in the models directory."""
+    """List the checkpoint store's models (from its index, oldest step first), then any other .zip models."""
+    checkpoints = store_for(MODELS_DIR).checkpoints()
+    model_names = [c["name"] for c in checkpoints]
     files = glob.glob(os.path.join(MODELS_DIR, "*.zip"))
-    model_names = [os.path.basename(f).replace(".zip", "") for f in files]
-    return {"models": model_names}
+    model_names += [name for name in (os.path.basename(f).replace(".zip", "") for f in files) if name not in model_names]
+    return {"models": model_names, "checkpoints": checkpoints}
 
 @app.post("/load_model")
 async def load_model_endpoint(request: LoadModelRequest):
     """Load a specific model by name."""
+    if fast_forward_active:
+        # The fast forward worker thread calls select_action: don't swap the model under it
+        return busy_response()
     success = load_model_by_name(request.model_name)
     if success:
-        return {"status": "success", "message": f"Loaded {request.model_name}"}
+        return {"status": "success", "message": f"Loaded {request.model_name}", "decision_interval": model_interval}
     else:
         return {"status": "error", "message": "Model not found or invalid"}
 
+def get_query() -> AgentQuery:
+    """Query helper bound to the current AgentManager (replaced on every env.reset())."""
+    global agent_query
+    if agent_query is None or agent_query.agent_manager is not env.agent_manager:
+        agent_query = AgentQuery(env.agent_manager)
+    return agent_query
+
+@app.get("/households")
+async def query_households(offset: int = 0, limit: int = DEFAULT_PAGE_SIZE, sort_by: str = "id",
+                           descending: bool = False, employed: Optional[bool] = None,
+                           subsistence_failed: Optional[bool] = None,
+                           min_cash: Optional[float] = None, max_cash: Optional[float] = None):
+    """Return a sorted/filtered window of households."""
+    if env is None:
+        return not_ready_response()
+    if fast_forward_active:
+        return busy_response()
+    try:
+        return get_query().households(offset=offset, limit=limit, sort_by=sort_by, descending=descending,
+                                      employed=employed, subsistence_failed=subsistence_failed,
+                                      min_cash=min_cash, max_cash=max_cash)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+@app.get("/firms")
+async def query_firms(offset: int = 0, limit: int = DEFAULT_PAGE_SIZE, sort_by: str = "id",
+                      descending: bool = False, tier: Optional[int] = None,
+                      min_cash: Optional[float] = None, max_cash: Optional[float] = None):
+    """Return a sorted/filtered window of firms."""
+    if env is None:
+        return not_ready_response()
+    if fast_forward_active:
+        return busy_response()
+    try:
+        return get_query().firms(offset=offset, limit=limit, sort_by=sort_by, descending=descending,
+                                 tier=tier, min_cash=min_cash, max_cash=max_cash)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+def get_archive(run_id: str) -> EpisodeArchive:
+    path = os.path.join(ARCHIVE_ROOT, os.path.basename(run_id))
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        open_archives.pop(run_id, None) # Pruned
+        raise KeyError(f"Unknown run: {run_id}")
+    if run_id not in open_archives:
+        open_archives[run_id] = EpisodeArchive(path)
+        while len(open_archives) > ARCHIVE_OPEN_READERS:
+            open_archives.popitem(last=False)
+    open_archives.move_to_end(run_id)
+    return open_archives[run_id]
+
+def archived_macro_features(archive: EpisodeArchive, step: int) -> dict:
+    """FRAME_MACRO_FEATURES at an archived step, replayed from the months before it (as the live env's MacroHistory)."""
+    row = archive.row_of(step)
+    series = [archive.macro_series(name) for name in STAT_SERIES]
+    history = MacroHistory()
+    # One month more than the window, so the oldest month's growth rates are defined
+    for r in range(max(0, row - history.window), row + 1):
+        history.push({name: column[r] for name, column in zip(STAT_SERIES, series)})
+    return history.named(FRAME_MACRO_FEATURES)
+
+def archived_frame(run_id: str, step: int, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """A dashboard frame rebuilt from the archive (households as an id-ordered window)."""
+    archive = get_archive(run_id)
+    record = archive.frame(step)
+    macro = record["macro"]
+    price_index = max(0.1, macro["avg_price"]) / 10.0
+    households = record["households"]
+    features = archived_macro_features(archive, step)
+    return {
+        "step": step,
+        "gdp": macro["gdp"],
+        "real_gdp": macro["gdp"] / price_index,
+        "unemployment": macro["unemployment"],
+        "avg_price": macro["avg_price"],
+        "avg_wage": macro["avg_wage"],
+        "inflation_rate": float(features["inflation"]),
+        "tax_revenue": macro["tax_revenue"],
+        "govt_cash": macro["govt_cash"],
+        "subsistence_failures": int(macro["subsistence_failures"]),
+        "gini": macro["gini"],
+        "action": {"income_tax": 0, "corp_tax": 0, "ubi": 0},
+        "firms": rows_to_states(record["firms"], FIRM_FIELDS, FIRM_COLUMNS),
+        "households": rows_to_states(households[offset:offset + limit], HOUSEHOLD_FIELDS, HOUSEHOLD_COLUMNS),
+        "macro": {name: float(features[name]) for name in MACRO_DASHBOARD_FEATURES},
+        "archive": {"run_id": run_id, "n_households": len(households)}
+    }
+
+@app.get("/archive")
+async def archive_runs():
+    """List archived runs (finished and ongoing episodes)."""
+    return {"runs": list_runs(ARCHIVE_ROOT)}
+
+@app.get("/archive/{run_id}/{step}")
+async def archive_step(run_id: str, step: int, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE):
+    """Read one archived month straight from the memory-mapped files."""
+    try:
+        return archived_frame(run_id, step, offset, limit)
+    except KeyError as e:
+        return {"status": "error", "message": str(e)}
+
+# Table fields a WebSocket client may subscribe with (see SUBSCRIBE_TABLE)
+TABLE_QUERY_PARAMS = {
+    "households": ("offset", "limit", "sort_by", "descending", "employed", "subsistence_failed", "min_cash", "max_cash"),
+    "firms": ("offset", "limit", "sort_by", "descending", "tier", "min_cash", "max_cash"),
+}
+
+def build_frame(step: int, action=None, real_gdp: Optional[float] = None) -> dict:
+    """Macro stats for one dashboard frame. Agent tables are added per connection."""
+    stats = env.agent_manager.get_market_stats()
+    macro = env.macro_values(FRAME_MACRO_FEATURES)
+    if action is None:
+        action = [0, 0, 0]
+    return {
+        "step": step,
+        "gdp": float(stats["gdp"]),
+        "real_gdp": float(stats["gdp"] if real_gdp is None else real_gdp), # Initial Real GDP = Nominal
+        "unemployment": float(stats["unemployment"]),
+        "avg_price": float(stats["avg_price"]),
+        "avg_wage": float(stats["avg_wage"]),
+        "inflation_rate": float(macro["inflation"]),
+        "tax_revenue": float(stats["tax_revenue"]),
+        "govt_cash": float(env.agent_manager.govt_cash),
+        "subsistence_failures": int(stats["subsistence_failures"]),
+        "gini": float(stats["gini"]),
+        "action": {
+            "income_tax": float(action[0]),
+            "corp_tax": float(action[1]),
+            "ubi": float(action[2])
+        },
+        "households_summary": get_query().household_summary(),
+        "distributions": env.agent_manager.get_distribution_summaries(),
+        "macro": {name: float(macro[name]) for name in MACRO_DASHBOARD_FEATURES}
+    }
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        # Per-connection table windows: websocket -> {"households": {...}, "firms": {...}}
+        self.subscriptions: dict = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.subscriptions[websocket] = {"households": {}, "firms": {}}
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        self.subscriptions.pop(websocket, None)
+
+    def subscribe(self, websocket: WebSocket, table: str, params: dict):
+        if table not in TABLE_QUERY_PARAMS:
+            raise ValueError(f"Unknown table: {table}")
+        allowed = TABLE_QUERY_PARAMS[table]
+        params = {k: v for k, v in params.items() if k in allowed}
+        try:
+            # Reject bad values now instead of silently falling back to the defaults every frame
+            get_query().query(table, **params)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid {table} subscription: {e}") from e
+        self.subscriptions[websocket][table] = params
+
+    def render(self, websocket: WebSocket, frame: dict) -> str:
+        """Attach this connection's household/firm windows to a frame."""
+        query = get_query()
+        message = dict(frame)
+        for table, params in self.subscriptions.get(websocket, {}).items():
+            try:
+                window = query.query(table, **params)
+            except (ValueError, TypeError):
+                window = query.query(table)
+            message[table] = window["rows"]
+            message[f"{table}_window"] = {k: v for k, v in window.items() if k != "rows"}
+        return json.dumps(message)
+
+    async def send_frame(self, websocket: WebSocket, frame: dict):
+        await websocket.send_text(self.render(websocket, frame))
+
+    async def broadcast_frame(self, frame: dict):
+        for connection in self.active_connections:
+            try:
+                await self.send_frame(connection, frame)
+            except:
+                pass
 
     async def broadcast(self, message: str):
         for connection in self.active_connections:
@@ -93,24 +374,14 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     global is_running, obs, env, simulation_speed, manual_override, manual_action
     
-    # Send initial state immediately
-    stats = env.agent_manager.get_market_stats()
-    await websocket.send_text(json.dumps({
-        "step": env.current_step,
-        "gdp": float(stats["gdp"]),
-        "real_gdp": float(stats["gdp"]), # Initial Real GDP = Nominal
-        "unemployment": float(stats["unemployment"]),
-        "avg_price": float(stats["avg_price"]),
-        "avg_wage": float(stats["avg_wage"]),
-        "inflation_rate": 0.0,
-        "tax_revenue": float(stats["tax_revenue"]),
-        "govt_cash": float(env.agent_manager.govt_cash),
-        "subsistence_failures": int(stats["subsistence_failures"]),
-        "gini": float(stats["gini"]),
-        "action": {"income_tax": 0, "corp_tax": 0, "ubi": 0},
-        "firms": [f.get_state() for f in env.agent_manager.firms],
-        "households": [h.get_state() for h in env.agent_manager.households]
-    }))
+    # Send initial state as soon as the env exists
+    await env_ready.wait()
+    if env is None:
+        await websocket.send_text(json.dumps({"type": "error", "message": f"Initialization failed: {init_state['error']}"}))
+        manager.disconnect(websocket)
+        await websocket.close()
+        return
+    await manager.send_frame(websocket, build_frame(env.current_step))
     
     try:
         while True:
@@ -123,29 +394,16 @@ async def websocket_endpoint(websocket: WebSocket):
                 print("Simulation Resumed")
             elif command["type"] == "STOP":
                 is_running = False
+                await stop_fast_forward()
                 print("Simulation Paused")
             elif command["type"] == "RESET":
                 is_running = False
-                obs, _ = env.reset()
+                await stop_fast_forward()
+                await wait_for_branch_start()
+                reset_env()
                 print("Simulation Reset")
                 # Broadcast initial state immediately
-                stats = env.agent_manager.get_market_stats()
-                await manager.broadcast(json.dumps({
-                    "step": 0,
-                    "gdp": float(stats["gdp"]),
-                    "real_gdp": float(stats["gdp"]), # Initial Real GDP = Nominal
-                    "unemployment": float(stats["unemployment"]),
-                    "avg_price": float(stats["avg_price"]),
-                    "avg_wage": float(stats["avg_wage"]),
-                    "inflation_rate": 0.0,
-                    "tax_revenue": float(stats["tax_revenue"]),
-                    "govt_cash": float(env.agent_manager.govt_cash),
-                    "subsistence_failures": int(stats["subsistence_failures"]),
-                    "gini": float(stats["gini"]),
-                    "action": {"income_tax": 0, "corp_tax": 0, "ubi": 0},
-                    "firms": [f.get_state() for f in env.agent_manager.firms],
-                    "households": [h.get_state() for h in env.agent_manager.households]
-                }))
+                await manager.broadcast_frame(build_frame(0))
             elif command["type"] == "SET_SPEED":
                 simulation_speed = float(command["value"])
                 print(f"Speed set to {simulation_speed} FPS")
@@ -158,61 +416,227 @@ async def websocket_endpoint(websocket: WebSocket):
                     float(command["corp_tax"]),
                     float(command["ubi"])
                 ]
+            elif command["type"] in ("FAST_FORWARD", "RUN_UNTIL"):
+                # FAST_FORWARD: {"steps": n}, RUN_UNTIL: {"step": target}
+                # Optional: "report_every" (steps per summary frame), "resume" (paced streaming afterwards)
+                if command["type"] == "FAST_FORWARD":
+                    target_step = env.current_step + int(command.get("steps", FAST_FORWARD_REPORT_EVERY))
+                else:
+                    target_step = int(command["step"])
+                await start_fast_forward(
+                    target_step,
+                    command.get("report_every", FAST_FORWARD_REPORT_EVERY),
+                    bool(command.get("resume", True))
+                )
+            elif command["type"] == "BRANCH":
+                # Counterfactuals from the current step, e.g.
+                # {"type": "BRANCH", "horizon": 24, "policies": [{"policy": "manual", "action": [0.2, 0.2, 0.0]},
+                #                                               {"policy": "model", "name": "economy_ppo_final"}]}
+                if fast_forward_active:
+                    await websocket.send_text(json.dumps({"type": "error", "message": "Cannot branch while fast forwarding"}))
+                elif branch_start is not None:
+                    await websocket.send_text(json.dumps({"type": "error", "message": "Another branch is starting"}))
+                else:
+                    start_branch(websocket, command.get("policies", []), int(command.get("horizon", 12)))
+            elif command["type"] == "SEEK":
+                # Show an archived month: {"type": "SEEK", "run_id": "...", "step": 120}
+                try:
+                    frame = archived_frame(command.get("run_id") or archive_writer.run_id, int(command["step"]))
+                    frame["type"] = "archived_frame" # Not a live frame: keep it out of the live history
+                    await websocket.send_text(json.dumps(frame))
+                except (KeyError, AttributeError, ValueError, TypeError) as e:
+                    await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+            elif command["type"] == "SUBSCRIBE_TABLE":
+                # Change which window of households/firms this client receives each frame
+                # e.g. {"type": "SUBSCRIBE_TABLE", "table": "households", "sort_by": "cash", "descending": true}
+                table = command.get("table", "households")
+                params = {k: v for k, v in command.items() if k not in ("type", "table")}
+                try:
+                    if fast_forward_active:
+                        raise ValueError("Cannot change table subscriptions while fast forwarding")
+                    manager.subscribe(websocket, table, params)
+                    await manager.send_frame(websocket, build_frame(env.current_step))
+                except ValueError as e:
+                    await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
+def select_action(current_obs):
+    """Pick the next action: manual override, loaded model (held for model_interval months), or random."""
+    global model_decision
+    if manual_override:
+        model_decision = None
+        return np.array(manual_action, dtype=np.float32)
+    elif model:
+        step = env.current_step
+        if model_decision is None or not 0 <= step - model_decision[0] < model_interval:
+            action, _ = model.predict(current_obs, deterministic=True)
+            model_decision = (step, action)
+        return model_decision[1]
+    return env.action_space.sample()
+
+def compute_real_gdp() -> float:
+    # Real GDP = Nominal GDP / (Price Index / Base Price)
+    # Base Price is 10.0
+    stats = env.agent_manager.get_market_stats()
+    price_index = max(0.1, stats["avg_price"]) / 10.0
+    return stats["gdp"] / price_index
+
+def run_steps(n_steps: int):
+    """
+    Step the env back-to-back without pacing or broadcasting (runs in a worker thread).
+    Stops early at the end of an episode. Returns (last_action, episode_ended).
+    """
+    action = None
+    for _ in range(n_steps):
+        action = select_action(obs)
+        if step_env(action):
+            return action, True
+    return action, False
+
+async def fast_forward(target_step: int, report_every: int, resume: bool):
+    """
+    Run to target_step as fast as the CPU allows, emitting one summary frame every
+    report_every steps, then hand back to the paced simulation_loop.
+    """
+    global obs, is_running, fast_forward_target, fast_forward_active
+    loop = asyncio.get_running_loop()
+    start_step = env.current_step
+    start_time = time.perf_counter()
+    episode_ended = False
+    cancelled = False
+
+    try:
+        while env.current_step < target_step and not episode_ended:
+            if fast_forward_target is None:
+                cancelled = True # STOP / RESET / new fast forward
+                break
+            n_steps = min(report_every, target_step - env.current_step)
+            action, episode_ended = await loop.run_in_executor(None, run_steps, n_steps)
+
+            elapsed = time.perf_counter() - start_time
+            frame = build_frame(env.current_step, action, real_gdp=compute_real_gdp())
+            frame["fast_forward"] = {
+                "target_step": target_step,
+                "steps_per_second": (env.current_step - start_step) / max(elapsed, 1e-9),
+                "done": False
+            }
+            await manager.broadcast_frame(frame)
+
+        if episode_ended:
+            reset_env()
+        print(f"Fast forward finished at step {env.current_step}")
+
+        # Final summary frame, then back to paced per-frame streaming
+        frame = build_frame(env.current_step, real_gdp=compute_real_gdp())
+        frame["fast_forward"] = {"target_step": target_step, "steps_per_second": 0.0, "done": True}
+        await manager.broadcast_frame(frame)
+        if not cancelled:
+            is_running = resume
+    finally:
+        # Only now is no worker thread touching env
+        fast_forward_target = None
+        fast_forward_active = False
+
+async def start_fast_forward(target_step: int, report_every: int, resume: bool):
+    global fast_forward_target, fast_forward_task, fast_forward_active
+    await stop_fast_forward()
+    await wait_for_branch_start()
+    target_step = min(int(target_step), env.episode_length)
+    if target_step <= env.current_step:
+        return
+    fast_forward_target = target_step
+    fast_forward_active = True
+    print(f"Fast forwarding to step {target_step}")
+    fast_forward_task = asyncio.create_task(fast_forward(target_step, max(1, int(report_every)), resume))
+
+async def stop_fast_forward():
+    """
+    Cancel a running fast forward after its current chunk and wait for it to
+    finish. fast_forward_target only signals the cancel; fast_forward_active
+    stays set until the task (and its worker thread) is done with env.
+    """
+    global fast_forward_target, fast_forward_task
+    fast_forward_target = None
+    if fast_forward_task is not None:
+        await fast_forward_task
+        fast_forward_task = None
+
+def start_branch(websocket: WebSocket, policies, horizon: int):
+    """
+    Snapshot/fork the env and start the branch processes in a worker thread,
+    then broadcast the result. The env is read meanwhile, so the paced loop,
+    RESET and fast forwards wait for branch_start (see wait_for_branch_start).
+    """
+    global branch_start
+    loop = asyncio.get_running_loop()
+    branch_start = loop.run_in_executor(None, BranchJob, env, policies, horizon, MODELS_DIR)
+    asyncio.create_task(broadcast_branch_result(websocket, branch_start))
+
+async def wait_for_branch_start():
+    if branch_start is not None:
+        await asyncio.wait([branch_start])
+
+async def broadcast_branch_result(websocket: WebSocket, starting):
+    global branch_start
+    loop = asyncio.get_running_loop()
+    try:
+        job = await starting
+    except Exception as e:
+        await websocket.send_text(json.dumps({"type": "error", "message": f"Branch failed: {e}"}))
+        return
+    finally:
+        branch_start = None
+    result = await loop.run_in_executor(None, job.result)
+    await manager.broadcast(json.dumps({"type": "branch_result", **result}))
+
+class TelemetryRelay(asyncio.DatagramProtocol):
+    """Receives training telemetry datagrams (training/telemetry.py) and relays them to every dashboard."""
+
+    def datagram_received(self, data, addr):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if not isinstance(message, dict) or message.get("type") != "training":
+            return
+        training_history.append(message)
+        asyncio.create_task(manager.broadcast(json.dumps(message)))
+
+async def start_telemetry_relay():
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.create_datagram_endpoint(TelemetryRelay, local_addr=(TELEMETRY_HOST, TELEMETRY_PORT))
+    except OSError as e:
+        print(f"Training telemetry relay disabled: {e}")
+
+@app.get("/training")
+async def training_telemetry(limit: int = 50):
+    """Most recent training telemetry messages (oldest first)."""
+    messages = list(training_history)
+    return {"messages": messages[max(0, len(messages) - limit):]}
+
 async def simulation_loop():
     global obs, is_running, simulation_speed, manual_override, manual_action
     while True:
         # print(f"Loop running. is_running={is_running}") # Debug
-        if is_running:
+        # The fast forward worker owns the env while it runs; a branch being started reads it
+        if is_running and init_state["ready"] and not fast_forward_active and branch_start is None:
             # 1. Determine Action
-            if manual_override:
-                action = np.array(manual_action, dtype=np.float32)
-            elif model:
-                action, _ = model.predict(obs, deterministic=True)
-            else:
-                action = env.action_space.sample()
+            action = select_action(obs)
             
             # 2. Step Environment
-            obs, reward, terminated, truncated, info = env.step(action)
+            episode_ended = step_env(action)
             
-            # 3. Get Detailed Stats
-            stats = env.agent_manager.get_market_stats()
-            
-            # 4. Prepare Data Packet
-            # Real GDP = Nominal GDP / (Price Index / Base Price)
-            # Base Price is 10.0
-            price_index = max(0.1, stats["avg_price"]) / 10.0
-            real_gdp = stats["gdp"] / price_index
-
-            data = {
-                "step": env.current_step,
-                "gdp": float(stats["gdp"]),
-                "real_gdp": float(real_gdp), # Added
-                "unemployment": float(stats["unemployment"]),
-                "avg_price": float(stats["avg_price"]),
-                "avg_wage": float(stats["avg_wage"]),
-                "inflation_rate": 0.0, 
-                "tax_revenue": float(stats["tax_revenue"]),
-                "govt_cash": float(env.agent_manager.govt_cash), # Added
-                "subsistence_failures": int(stats["subsistence_failures"]),
-                "gini": float(stats["gini"]),
-                "action": {
-                    "income_tax": float(action[0]),
-                    "corp_tax": float(action[1]),
-                    "ubi": float(action[2])
-                },
-                "firms": [f.get_state() for f in env.agent_manager.firms],
-                "households": [h.get_state() for h in env.agent_manager.households] # Added
-            }
+            # 3. Prepare Data Packet
+            data = build_frame(env.current_step, action, real_gdp=compute_real_gdp())
             
-            # 5. Broadcast
-            await manager.broadcast(json.dumps(data))
+            # 4. Broadcast (each client gets only its subscribed household/firm window)
+            await manager.broadcast_frame(data)
             
-            if terminated or truncated:
-                obs, _ = env.reset()
+            if episode_ended:
+                reset_env()
                 
         # Dynamic Sleep based on Speed
         # If speed is 1.0, sleep 1.0s. If speed is 60.0, sleep 0.016s.
@@ -221,13 +645,21 @@ async def simulation_loop():
 
 @app.on_event("startup")
 async def startup_event():
+    global env_ready
+    env_ready = asyncio.Event()
+    # Heavy setup (env, torch, model) happens after the server is accepting connections
+    asyncio.create_task(initialize())
     # Don't auto-start simulation loop logic, wait for START command
     # But we need the loop running to check 'is_running' flag
     asyncio.create_task(simulation_loop())
+    await start_telemetry_relay()
 
-def run_server():
+def run_server(port: int = 8000):
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=port)
 
 if __name__ == "__main__":
-    run_server()
+    import argparse
+    parser = argparse.ArgumentParser(description="Economy Simulation API Server")
+    parser.add_argument("--port", type=int, default=8000)
+    run_server(parser.parse_args().port)
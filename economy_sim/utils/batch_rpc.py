@@ -0,0 +1,447 @@
+import sys
+import json
+import time
+import uuid
+import base64
+import struct
+import asyncio
+import argparse
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+from economy_sim.envs.economy_env import EconomyEnv
+from economy_sim.envs.components.macro_history import MacroHistory
+from economy_sim.config import (
+    RANDOM_SEED,
+    BATCH_RPC_MAX_ENVS,
+    BATCH_RPC_MAX_SNAPSHOTS,
+    BATCH_RPC_MAX_HOUSEHOLDS,
+    BATCH_RPC_MAX_FIRMS,
+    BATCH_RPC_MAX_EPISODE_LENGTH,
+    BATCH_RPC_MAX_COHORT_POPULATION
+)
+
+# EconomyEnv arguments a client may set when creating a pool
+POOL_CONFIG_KEYS = ("n_households", "n_firms", "episode_length", "float32_probe", "scale_invariant_obs",
+                    "decision_interval", "include_distributions", "cohort_population", "macro_features",
+                    "macro_reward_weights")
+# Inclusive bounds of the integer keys (the env size a client may ask for)
+POOL_CONFIG_BOUNDS = {
+    "n_households": (1, BATCH_RPC_MAX_HOUSEHOLDS),
+    "n_firms": (1, BATCH_RPC_MAX_FIRMS),
+    "episode_length": (1, BATCH_RPC_MAX_EPISODE_LENGTH),
+    "decision_interval": (1, BATCH_RPC_MAX_EPISODE_LENGTH),
+    "cohort_population": (1, BATCH_RPC_MAX_COHORT_POPULATION)
+}
+
+def check_config(config: Dict):
+    """Raise ValueError for unknown keys, integer keys outside POOL_CONFIG_BOUNDS or malformed macro settings."""
+    unknown = sorted(set(config) - set(POOL_CONFIG_KEYS))
+    if unknown:
+        raise ValueError(f"Unknown env config keys: {unknown}")
+    features = config.get("macro_features")
+    if features is not None and (not isinstance(features, list) or not all(isinstance(f, str) for f in features)):
+        raise ValueError(f"macro_features must be a list of feature names, got {features!r}")
+    weights = config.get("macro_reward_weights")
+    if weights is not None and (not isinstance(weights, dict) or not all(
+            isinstance(w, (int, float)) and not isinstance(w, bool) for w in weights.values())):
+        raise ValueError(f"macro_reward_weights must map feature names to numbers, got {weights!r}")
+    for key, (low, high) in POOL_CONFIG_BOUNDS.items():
+        value = config.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+            raise ValueError(f"{key} must be an integer in [{low}, {high}], got {value!r}")
+
+# Binary WebSocket frames (little-endian)
+#   request:  opcode (uint8) + payload
+#             OP_STEP:  float32 actions (n_envs * action_dim)
+#             OP_RESET: optional int64 seed
+#   response: HEADER (opcode, n_envs, obs_dim), then float32 obs (n_envs * obs_dim),
+#             float32 rewards (n_envs), uint8 dones (n_envs) and float32 terminal
+#             observations of the done envs, in env order (n_done * obs_dim)
+# Errors come back as text frames: {"type": "error", "message": ...}
+OP_STEP = 1
+OP_RESET = 2
+HEADER = struct.Struct("<BII")
+
+def pack_batch(op: int, obs: np.ndarray, rewards: np.ndarray, dones: np.ndarray, terminal_obs: np.ndarray) -> bytes:
+    obs = np.ascontiguousarray(obs, dtype="<f4")
+    return b"".join((
+        HEADER.pack(op, obs.shape[0], obs.shape[1]),
+        obs.tobytes(),
+        np.ascontiguousarray(rewards, dtype="<f4").tobytes(),
+        np.ascontiguousarray(dones, dtype=np.uint8).tobytes(),
+        np.ascontiguousarray(terminal_obs, dtype="<f4").tobytes()
+    ))
+
+def unpack_batch(frame: bytes) -> Dict:
+    """Inverse of pack_batch; arrays are read-only views into the frame."""
+    op, n, obs_dim = HEADER.unpack_from(frame)
+    offset = HEADER.size
+    obs = np.frombuffer(frame, dtype="<f4", count=n * obs_dim, offset=offset).reshape(n, obs_dim)
+    offset += obs.nbytes
+    rewards = np.frombuffer(frame, dtype="<f4", count=n, offset=offset)
+    offset += rewards.nbytes
+    dones = np.frombuffer(frame, dtype=np.uint8, count=n, offset=offset).astype(bool)
+    offset += n
+    terminal_obs = np.frombuffer(frame, dtype="<f4", offset=offset).reshape(-1, obs_dim)
+    return {"op": op, "obs": obs, "rewards": rewards, "dones": dones, "terminal_obs": terminal_obs}
+
+def pack_array(array: np.ndarray) -> Dict:
+    """JSON form of an array for the HTTP endpoints: little-endian bytes, base64-encoded."""
+    array = np.asarray(array)
+    dtype = "uint8" if array.dtype == bool else "float32"
+    data = np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+    return {"dtype": dtype, "shape": list(array.shape), "data": base64.b64encode(data).decode("ascii")}
+
+def unpack_array(packed) -> np.ndarray:
+    """Accepts pack_array's form or plain nested lists."""
+    if isinstance(packed, dict):
+        dtype = np.dtype(packed.get("dtype", "float32")).newbyteorder("<")
+        return np.frombuffer(base64.b64decode(packed["data"]), dtype=dtype).reshape(packed["shape"])
+    return np.asarray(packed, dtype=np.float32)
+
+class EnvPool:
+    """
+    n_envs EconomyEnvs with the same config, stepped as a batch.
+    Env i is seeded with seed + i. Finished episodes are reset right away
+    (like an SB3 VecEnv); step() returns the observations they ended on
+    separately. The envs share one stacked MacroHistory (row i is env i).
+    Snapshots stay on the server and are referenced by id, so
+    clients never send pickles. Calls must hold `lock` (requests for the same
+    pool can arrive concurrently); once `closed` (deleted), none may run.
+    """
+
+    def __init__(self, n_envs: int, seed: int = RANDOM_SEED, config: Optional[Dict] = None):
+        config = dict(config or {})
+        check_config(config)
+        if n_envs < 1:
+            raise ValueError("n_envs must be at least 1")
+        self.config = config
+        self.seed = seed
+        self.macro_history = MacroHistory(n_envs)
+        self.envs = [EconomyEnv(macro_history=(self.macro_history, i), **config) for i in range(n_envs)]
+        self.obs = None
+        self.snapshots = OrderedDict() # id -> EconomyEnv.snapshot() bytes, oldest first
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def close(self):
+        """Drop the envs and snapshots (call with `lock` held, after in-flight calls are done)."""
+        self.closed = True
+        for env in self.envs:
+            env.agent_manager.ledger.close()
+        self.snapshots.clear()
+
+    @property
+    def n_envs(self) -> int:
+        return len(self.envs)
+
+    @property
+    def obs_dim(self) -> int:
+        return self.envs[0].observation_space.shape[0]
+
+    @property
+    def action_dim(self) -> int:
+        return self.envs[0].action_space.shape[0]
+
+    def describe(self) -> Dict:
+        return {"n_envs": self.n_envs, "seed": self.seed, "config": self.config, "obs_dim": self.obs_dim,
+                "action_dim": self.action_dim, "steps": [env.current_step for env in self.envs],
+                "snapshots": len(self.snapshots)}
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        if seed is not None:
+            self.seed = seed
+        self.obs = np.stack([env.reset(seed=self.seed + i)[0] for i, env in enumerate(self.envs)])
+        return self.obs
+
+    def step(self, actions: np.ndarray):
+        """Returns (obs, rewards, dones, terminal_obs); terminal_obs holds one row per done env."""
+        actions = np.asarray(actions, dtype=np.float32)
+        if actions.size != self.n_envs * self.action_dim:
+            raise ValueError(f"Expected {self.n_envs} x {self.action_dim} actions, got {actions.size} values")
+        actions = actions.reshape(self.n_envs, self.action_dim)
+        if self.obs is None:
+            self.reset()
+        obs = np.empty_like(self.obs)
+        rewards = np.zeros(self.n_envs, dtype=np.float32)
+        dones = np.zeros(self.n_envs, dtype=bool)
+        terminal_obs = []
+        for i, env in enumerate(self.envs):
+            obs[i], rewards[i], terminated, truncated, _ = env.step(actions[i])
+            if terminated or truncated:
+                dones[i] = True
+                terminal_obs.append(obs[i].copy())
+                obs[i], _ = env.reset()
+        self.obs = obs
+        terminal_obs = np.array(terminal_obs, dtype=np.float32).reshape(-1, self.obs_dim)
+        return obs, rewards, dones, terminal_obs
+
+    def snapshot(self, indices: Optional[List[int]] = None) -> List[str]:
+        indices = range(self.n_envs) if indices is None else [int(i) for i in indices]
+        if any(not 0 <= i < self.n_envs for i in indices):
+            raise IndexError(f"Env indices must be in [0, {self.n_envs})")
+        ids = []
+        for i in indices:
+            snapshot_id = uuid.uuid4().hex[:12]
+            self.snapshots[snapshot_id] = self.envs[i].snapshot()
+            ids.append(snapshot_id)
+        while len(self.snapshots) > BATCH_RPC_MAX_SNAPSHOTS:
+            self.snapshots.popitem(last=False)
+        return ids
+
+    def restore(self, snapshots: Dict[int, str]) -> np.ndarray:
+        """Restore env index -> snapshot id (any of this pool's snapshots, e.g. env 0's into every env)."""
+        missing = [snapshot_id for snapshot_id in snapshots.values() if snapshot_id not in self.snapshots]
+        if missing:
+            raise KeyError(f"Unknown snapshot ids: {missing}")
+        if any(not 0 <= int(i) < self.n_envs for i in snapshots):
+            raise IndexError(f"Env indices must be in [0, {self.n_envs})")
+        if self.obs is None:
+            self.reset()
+        for i, snapshot_id in snapshots.items():
+            self.obs[int(i)] = self.envs[int(i)].restore(self.snapshots[snapshot_id])
+        return self.obs
+
+# Live pools: pool_id -> EnvPool
+pools: Dict[str, EnvPool] = {}
+reserved_envs = 0 # Envs of pools still being created (counted against BATCH_RPC_MAX_ENVS)
+capacity_lock = threading.Lock()
+
+router = APIRouter(prefix="/rpc")
+
+class CreatePoolRequest(BaseModel):
+    n_envs: int
+    seed: int = RANDOM_SEED
+    config: Dict = {}
+
+class ResetRequest(BaseModel):
+    seed: Optional[int] = None
+
+class StepRequest(BaseModel):
+    actions: Any # pack_array(...) or nested lists, (n_envs, action_dim)
+
+class SnapshotRequest(BaseModel):
+    indices: Optional[List[int]] = None
+
+class RestoreRequest(BaseModel):
+    snapshots: Dict[int, str]
+
+def error_response(message: str) -> Dict:
+    return {"status": "error", "message": message}
+
+async def run_locked(pool: EnvPool, method, *args):
+    """Run a pool method in a worker thread so the dashboard's event loop keeps serving."""
+    def call():
+        with pool.lock:
+            if pool.closed:
+                raise ValueError("Pool was deleted")
+            return method(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, call)
+
+@router.post("/pools")
+async def create_pool(request: CreatePoolRequest):
+    """Create n_envs envs with the given EconomyEnv config (see POOL_CONFIG_KEYS) and reset them."""
+    global reserved_envs
+    try:
+        check_config(request.config)
+    except ValueError as e:
+        return error_response(str(e))
+    if request.n_envs < 1:
+        return error_response("n_envs must be at least 1")
+    # Reserve the capacity before awaiting, so concurrent creates cannot both pass the cap
+    with capacity_lock:
+        in_use = sum(pool.n_envs for pool in pools.values()) + reserved_envs
+        if in_use + request.n_envs > BATCH_RPC_MAX_ENVS:
+            return error_response(f"Pool would exceed BATCH_RPC_MAX_ENVS ({in_use} of {BATCH_RPC_MAX_ENVS} in use)")
+        reserved_envs += request.n_envs
+    try:
+        pool = await asyncio.get_running_loop().run_in_executor(
+            None, EnvPool, request.n_envs, request.seed, request.config)
+        obs = await run_locked(pool, pool.reset)
+        pool_id = uuid.uuid4().hex[:8]
+        pools[pool_id] = pool
+    except Exception as e: # Anything the env constructor raises on a bad config
+        return error_response(f"Invalid pool config: {e!r}")
+    finally:
+        with capacity_lock:
+            reserved_envs -= request.n_envs
+    return {"status": "success", "pool_id": pool_id, **pool.describe(), "obs": pack_array(obs)}
+
+@router.get("/pools")
+async def list_pools():
+    return {"pools": {pool_id: pool.describe() for pool_id, pool in pools.items()}}
+
+@router.delete("/pools/{pool_id}")
+async def delete_pool(pool_id: str):
+    pool = pools.pop(pool_id, None)
+    if pool is None:
+        return error_response(f"Unknown pool: {pool_id}")
+    # Waits for an in-flight step/reset on this pool; later ones see it closed
+    await run_locked(pool, pool.close)
+    return {"status": "success"}
+
+@router.post("/pools/{pool_id}/reset")
+async def reset_pool(pool_id: str, request: ResetRequest):
+    pool = pools.get(pool_id)
+    if pool is None:
+        return error_response(f"Unknown pool: {pool_id}")
+    try:
+        obs = await run_locked(pool, pool.reset, request.seed)
+    except ValueError as e:
+        return error_response(str(e))
+    return {"status": "success", "obs": pack_array(obs)}
+
+@router.post("/pools/{pool_id}/step")
+async def step_pool(pool_id: str, request: StepRequest):
+    pool = pools.get(pool_id)
+    if pool is None:
+        return error_response(f"Unknown pool: {pool_id}")
+    try:
+        obs, rewards, dones, terminal_obs = await run_locked(pool, pool.step, unpack_array(request.actions))
+    except (ValueError, TypeError, KeyError) as e:
+        return error_response(str(e))
+    return {"status": "success", "obs": pack_array(obs), "rewards": pack_array(rewards),
+            "dones": pack_array(dones), "terminal_obs": pack_array(terminal_obs)}
+
+@router.post("/pools/{pool_id}/snapshot")
+async def snapshot_pool(pool_id: str, request: SnapshotRequest):
+    pool = pools.get(pool_id)
+    if pool is None:
+        return error_response(f"Unknown pool: {pool_id}")
+    try:
+        ids = await run_locked(pool, pool.snapshot, request.indices)
+    except (IndexError, ValueError) as e:
+        return error_response(str(e))
+    return {"status": "success", "snapshot_ids": ids}
+
+@router.post("/pools/{pool_id}/restore")
+async def restore_pool(pool_id: str, request: RestoreRequest):
+    pool = pools.get(pool_id)
+    if pool is None:
+        return error_response(f"Unknown pool: {pool_id}")
+    try:
+        obs = await run_locked(pool, pool.restore, request.snapshots)
+    except (KeyError, IndexError, ValueError) as e:
+        return error_response(str(e))
+    return {"status": "success", "obs": pack_array(obs)}
+
+@router.websocket("/pools/{pool_id}/ws")
+async def pool_websocket(websocket: WebSocket, pool_id: str):
+    """Binary step/reset loop for one pool (frame layout above): one response frame per request frame."""
+    await websocket.accept()
+    pool = pools.get(pool_id)
+    if pool is None:
+        await websocket.send_text(json.dumps({"type": "error", "message": f"Unknown pool: {pool_id}"}))
+        await websocket.close()
+        return
+    empty = np.zeros((0, pool.obs_dim), dtype=np.float32)
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            try:
+                op = frame[0]
+                if op == OP_STEP:
+                    actions = np.frombuffer(frame, dtype="<f4", offset=1)
+                    obs, rewards, dones, terminal_obs = await run_locked(pool, pool.step, actions)
+                elif op == OP_RESET:
+                    seed = struct.unpack_from("<q", frame, 1)[0] if len(frame) >= 9 else None
+                    obs = await run_locked(pool, pool.reset, seed)
+                    rewards, dones, terminal_obs = np.zeros(pool.n_envs), np.zeros(pool.n_envs, dtype=bool), empty
+                else:
+                    raise ValueError(f"Unknown opcode: {op}")
+            except (ValueError, IndexError) as e:
+                await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+                continue
+            await websocket.send_bytes(pack_batch(op, obs, rewards, dones, terminal_obs))
+    except WebSocketDisconnect:
+        pass
+
+class RemotePool:
+    """
+    Client for a pool on a running API server: created, snapshotted and
+    restored over HTTP, stepped and reset over the binary WebSocket.
+    """
+
+    def __init__(self, url: str, n_envs: int, seed: int = RANDOM_SEED, config: Optional[Dict] = None):
+        from websockets.sync.client import connect
+        self.url = url.rstrip("/")
+        created = self._post("/rpc/pools", {"n_envs": n_envs, "seed": seed, "config": config or {}})
+        self.pool_id = created["pool_id"]
+        self.n_envs = created["n_envs"]
+        self.obs_dim = created["obs_dim"]
+        self.ws = connect(self.url.replace("http", "ws", 1) + f"/rpc/pools/{self.pool_id}/ws", max_size=None)
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        from urllib.request import Request, urlopen
+        data = None if body is None else json.dumps(body).encode()
+        request = Request(self.url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        with urlopen(request) as response:
+            result = json.loads(response.read())
+        if result.get("status") == "error":
+            raise RuntimeError(result["message"])
+        return result
+
+    def _post(self, path: str, body: Dict) -> Dict:
+        return self._request("POST", path, body)
+
+    def _call(self, frame: bytes) -> Dict:
+        self.ws.send(frame)
+        reply = self.ws.recv()
+        if isinstance(reply, str):
+            raise RuntimeError(json.loads(reply)["message"])
+        return unpack_batch(reply)
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        frame = bytes([OP_RESET]) + (b"" if seed is None else struct.pack("<q", seed))
+        return self._call(frame)["obs"]
+
+    def step(self, actions: np.ndarray):
+        """Returns (obs, rewards, dones, terminal_obs), as EnvPool.step."""
+        reply = self._call(bytes([OP_STEP]) + np.ascontiguousarray(actions, dtype="<f4").tobytes())
+        return reply["obs"], reply["rewards"], reply["dones"], reply["terminal_obs"]
+
+    def snapshot(self, indices: Optional[List[int]] = None) -> List[str]:
+        return self._post(f"/rpc/pools/{self.pool_id}/snapshot", {"indices": indices})["snapshot_ids"]
+
+    def restore(self, snapshots: Dict[int, str]) -> np.ndarray:
+        return unpack_array(self._post(f"/rpc/pools/{self.pool_id}/restore", {"snapshots": snapshots})["obs"])
+
+    def close(self):
+        self.ws.close()
+        self._request("DELETE", f"/rpc/pools/{self.pool_id}")
+
+def benchmark(pool, steps: int, seed: int = RANDOM_SEED) -> float:
+    """Env steps per second under random actions."""
+    rng = np.random.default_rng(seed)
+    pool.reset(seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        pool.step(rng.random((pool.n_envs, 3), dtype=np.float32))
+    return steps * pool.n_envs / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Step a remote env pool and compare with a local one")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    args = parser.parse_args()
+
+    try:
+        remote = RemotePool(args.url, args.envs, args.seed)
+    except (OSError, RuntimeError) as e:
+        print(f"Could not create a pool on {args.url}: {e}")
+        sys.exit(1)
+    try:
+        remote_rate = benchmark(remote, args.steps, args.seed)
+    finally:
+        remote.close()
+    local_rate = benchmark(EnvPool(args.envs, args.seed), args.steps, args.seed)
+    print(f"Remote: {remote_rate:,.0f} env steps/s, local: {local_rate:,.0f} env steps/s "
+          f"({remote_rate / local_rate:.0%} of local)")
@@ -0,0 +1,333 @@
+import io
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import hashlib
+import zipfile
+import argparse
+from typing import Dict, List, Optional, Tuple
+from economy_sim.config import CHECKPOINT_STORE_DIR, CHECKPOINT_CHUNK_BYTES, CHECKPOINT_COMPRESS_LEVEL
+
+# Layout under the store root:
+#   index.json              name -> {step, timestamp, eval_score, decision_interval, bytes, members}
+#   chunks/<h[:2]>/<h>      zlib-compressed chunk, named by the sha256 of its uncompressed bytes
+# members lists the SB3 .zip's files (data, policy.pth, policy.optimizer.pth, ...) in order as
+# [name, [chunk hashes]]. The .pth files are torch zip archives themselves and are stored as
+# [name, {"zip": members}], one entry per tensor record, so an unchanged tensor dedups even
+# though torch writes a fresh serialization id into every file. Records are split into
+# fixed-size chunks; chunks already in the store are referenced instead of written again.
+INDEX_FILE = "index.json"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Members an inference-only policy needs (no optimizer state)
+POLICY_MEMBERS = ("data", "policy.pth")
+
+# train_ppo --decision-interval k names its final model <name>_every<k>
+INTERVAL_SUFFIX = re.compile(r"_every(\d+)$")
+
+class CheckpointStore:
+    """
+    Content-addressed, deduplicated store of SB3 checkpoints.
+    A single writer (the training process) is assumed; readers can list and
+    load concurrently since chunks are written before the index that
+    references them and the index is replaced atomically.
+    """
+
+    def __init__(self, root: str, chunk_bytes: int = CHECKPOINT_CHUNK_BYTES, level: int = CHECKPOINT_COMPRESS_LEVEL):
+        self.root = root
+        self.chunk_bytes = chunk_bytes
+        self.level = level
+
+    # --- Index ---
+
+    def _index(self) -> Dict:
+        try:
+            with open(os.path.join(self.root, INDEX_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"checkpoints": {}}
+
+    def _write_index(self, index: Dict):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, INDEX_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def checkpoints(self) -> List[Dict]:
+        """Metadata of every checkpoint, oldest step first."""
+        entries = [{"name": name, **{k: v for k, v in entry.items() if k != "members"}}
+                   for name, entry in self._index()["checkpoints"].items()]
+        return sorted(entries, key=lambda e: (e["step"], e["timestamp"]))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index()["checkpoints"]
+
+    def set_score(self, name: str, eval_score: float):
+        index = self._index()
+        index["checkpoints"][name]["eval_score"] = eval_score
+        self._write_index(index)
+
+    def stats(self) -> Dict:
+        index = self._index()
+        referenced = {h for entry in index["checkpoints"].values() for h in self._hashes(entry["members"])}
+        stored = sum(os.path.getsize(self._chunk_path(h)) for h in referenced if os.path.exists(self._chunk_path(h)))
+        return {
+            "checkpoints": len(index["checkpoints"]),
+            "chunks": len(referenced),
+            "logical_bytes": sum(entry["bytes"] for entry in index["checkpoints"].values()),
+            "stored_bytes": stored
+        }
+
+    # --- Chunks ---
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.root, "chunks", digest[:2], digest)
+
+    def _put_chunk(self, data: bytes) -> Tuple[str, int]:
+        """Store one chunk if new. Returns (digest, compressed bytes written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob = zlib.compress(data, self.level)
+        with open(path + ".tmp", "wb") as f:
+            f.write(blob)
+        os.replace(path + ".tmp", path)
+        return digest, len(blob)
+
+    def _put_archive(self, zip_bytes: bytes, totals: Dict[str, int]) -> List:
+        """Chunk every file of a zip archive (recursing into nested .pth archives)."""
+        members = []
+        with zipfile.ZipFile(io.BytesIO(zip_bytes)) as archive:
+            for member in archive.namelist():
+                data = archive.read(member)
+                if member.endswith(".pth") and data.startswith(ZIP_MAGIC):
+                    members.append([member, {"zip": self._put_archive(data, totals)}])
+                    continue
+                hashes = []
+                for start in range(0, len(data), self.chunk_bytes):
+                    digest, written = self._put_chunk(data[start:start + self.chunk_bytes])
+                    hashes.append(digest)
+                    totals["new_bytes"] += written
+                    totals["new_chunks"] += written > 0
+                members.append([member, hashes])
+        return members
+
+    def _read_member(self, hashes: List[str]) -> bytes:
+        parts = []
+        for digest in hashes:
+            with open(self._chunk_path(digest), "rb") as f:
+                parts.append(zlib.decompress(f.read()))
+        return b"".join(parts)
+
+    def _build_archive(self, members: List, skip=()) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, mode="w") as archive:
+            for member, content in members:
+                if member in skip:
+                    continue
+                if isinstance(content, dict):
+                    archive.writestr(member, self._build_archive(content["zip"]))
+                else:
+                    archive.writestr(member, self._read_member(content))
+        return buffer.getvalue()
+
+    @staticmethod
+    def _hashes(members: List):
+        for _, content in members:
+            if isinstance(content, dict):
+                yield from CheckpointStore._hashes(content["zip"])
+            else:
+                yield from content
+
+    # --- Checkpoints ---
+
+    def put(self, zip_bytes: bytes, name: str, step: int, eval_score: Optional[float] = None,
+            decision_interval: Optional[int] = None) -> Dict:
+        """
+        Add (or replace) a checkpoint from the bytes of an SB3 .zip. Returns its index entry.
+        decision_interval: months each of the policy's actions is meant to be held for
+        (None: unknown, see model_decision_interval).
+        """
+        totals = {"new_bytes": 0, "new_chunks": 0}
+        members = self._put_archive(zip_bytes, totals)
+        entry = {
+            "step": int(step),
+            "timestamp": time.time(),
+            "eval_score": eval_score,
+            "decision_interval": None if decision_interval is None else int(decision_interval),
+            "bytes": len(zip_bytes),
+            **totals,
+            "members": members
+        }
+        index = self._index()
+        index["checkpoints"][name] = entry
+        self._write_index(index)
+        return entry
+
+    def put_model(self, model, name: str, step: int, eval_score: Optional[float] = None,
+                  decision_interval: Optional[int] = None) -> Dict:
+        buffer = io.BytesIO()
+        model.save(buffer)
+        return self.put(buffer.getvalue(), name, step, eval_score, decision_interval)
+
+    def zip_bytes(self, name: str, inference_only: bool = False) -> bytes:
+        """Rebuild the checkpoint as an SB3 .zip (only data + policy weights when inference_only)."""
+        members = self._index()["checkpoints"][name]["members"]
+        skip = [member for member, _ in members if member not in POLICY_MEMBERS] if inference_only else ()
+        return self._build_archive(members, skip)
+
+    def matches(self, name: str, zip_bytes: bytes) -> bool:
+        """True if the checkpoint rebuilds to the same files as zip_bytes (names, CRCs and sizes; .pth archives member by member)."""
+        try:
+            return _same_archive(self.zip_bytes(name), zip_bytes)
+        except (KeyError, OSError, ValueError, zipfile.BadZipFile, zlib.error):
+            return False
+
+    def extract(self, name: str, path: str, inference_only: bool = False) -> str:
+        if not path.endswith(".zip"):
+            path += ".zip"
+        with open(path, "wb") as f:
+            f.write(self.zip_bytes(name, inference_only))
+        return path
+
+    def load_model(self, name: str, env=None, device: str = "auto", **kwargs):
+        """Full PPO model (optimizer included), e.g. to continue training."""
+        from stable_baselines3 import PPO
+        return PPO.load(io.BytesIO(self.zip_bytes(name)), env=env, device=device, **kwargs)
+
+    def load_policy(self, name: str, device: str = "auto"):
+        """
+        Inference-only policy: rebuilt from the data and policy weights alone
+        (the optimizer chunks are never read). Has the same predict() as PPO.
+        """
+        from stable_baselines3.common.save_util import load_from_zip_file
+        from stable_baselines3.common.utils import get_device
+        data, params, _ = load_from_zip_file(io.BytesIO(self.zip_bytes(name, inference_only=True)), device=device)
+        policy = data["policy_class"](data["observation_space"], data["action_space"], lambda _: 0.0,
+                                      **data["policy_kwargs"])
+        policy.load_state_dict(params["policy"])
+        policy.to(get_device(device))
+        policy.set_training_mode(False)
+        return policy
+
+    def decision_interval(self, name: str) -> Optional[int]:
+        """Recorded decision interval of a checkpoint (None if it is not in the store or none was recorded)."""
+        entry = self._index()["checkpoints"].get(name)
+        return entry.get("decision_interval") if entry else None
+
+    def delete(self, name: str):
+        index = self._index()
+        del index["checkpoints"][name]
+        self._write_index(index)
+
+    def gc(self) -> int:
+        """Remove chunks no checkpoint references. Returns how many were removed."""
+        referenced = {h for entry in self._index()["checkpoints"].values() for h in self._hashes(entry["members"])}
+        removed = 0
+        chunk_root = os.path.join(self.root, "chunks")
+        for prefix in os.listdir(chunk_root) if os.path.isdir(chunk_root) else []:
+            for digest in os.listdir(os.path.join(chunk_root, prefix)):
+                if digest not in referenced:
+                    os.remove(os.path.join(chunk_root, prefix, digest))
+                    removed += 1
+        return removed
+
+def _same_archive(a: bytes, b: bytes) -> bool:
+    with zipfile.ZipFile(io.BytesIO(a)) as za, zipfile.ZipFile(io.BytesIO(b)) as zb:
+        if za.namelist() != zb.namelist():
+            return False
+        for member in za.namelist():
+            ia, ib = za.getinfo(member), zb.getinfo(member)
+            if ia.CRC == ib.CRC and ia.file_size == ib.file_size:
+                continue
+            # Rebuilt nested .pth archives differ in zip metadata only: compare what they hold
+            data_a, data_b = za.read(member), zb.read(member)
+            if not (member.endswith(".pth") and data_a.startswith(ZIP_MAGIC) and data_b.startswith(ZIP_MAGIC)
+                    and _same_archive(data_a, data_b)):
+                return False
+    return True
+
+def store_for(models_dir: str) -> CheckpointStore:
+    return CheckpointStore(os.path.join(models_dir, CHECKPOINT_STORE_DIR))
+
+def check_model_name(name: str):
+    """Model names come from clients: a bare name only, so they cannot point outside models_dir."""
+    if not name or name in (".", "..") or "/" in name or "\\" in name or os.sep in name:
+        raise ValueError(f"Invalid model name: {name!r}")
+
+def model_decision_interval(models_dir: str, name: str) -> int:
+    """Months a model's actions should be held for: as recorded in the store, else from an _every<k> name, else 1."""
+    recorded = store_for(models_dir).decision_interval(name)
+    if recorded is not None:
+        return recorded
+    match = INTERVAL_SUFFIX.search(name)
+    return int(match.group(1)) if match else 1
+
+def load_policy_by_name(models_dir: str, name: str, device: str = "auto"):
+    """A predict()-capable policy: inference-only from the store if it holds `name`, else models_dir/<name>.zip."""
+    check_model_name(name)
+    store = store_for(models_dir)
+    if name in store:
+        return store.load_policy(name, device)
+    from stable_baselines3 import PPO
+    return PPO.load(os.path.join(models_dir, name), device=device)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicated checkpoint store (models/ppo/store)")
+    parser.add_argument("--models-dir", default="models/ppo")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Checkpoints with step, time and eval score")
+    extract_parser = commands.add_parser("extract", help="Write a checkpoint as a loadable SB3 .zip")
+    extract_parser.add_argument("name")
+    extract_parser.add_argument("out")
+    extract_parser.add_argument("--inference-only", action="store_true", help="Skip optimizer state")
+    import_parser = commands.add_parser("import", help="Move existing .zip checkpoints into the store")
+    import_parser.add_argument("--keep", action="store_true",
+                               help="Keep the .zip files (otherwise deleted once the stored copy rebuilds identically)")
+    commands.add_parser("gc", help="Delete unreferenced chunks")
+    args = parser.parse_args()
+
+    store = store_for(args.models_dir)
+    if args.command == "list":
+        for entry in store.checkpoints():
+            score = "-" if entry["eval_score"] is None else f"{entry['eval_score']:.2f}"
+            print(f"{entry['name']:<40} step {entry['step']:>10} "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['timestamp']))}  score {score}")
+        stats = store.stats()
+        print(f"{stats['checkpoints']} checkpoints, {stats['logical_bytes'] / 1e6:.1f} MB as .zip, "
+              f"{stats['stored_bytes'] / 1e6:.1f} MB stored")
+    elif args.command == "extract":
+        if args.name not in store:
+            print(f"No checkpoint named {args.name}")
+            sys.exit(1)
+        print(f"Wrote {store.extract(args.name, args.out, args.inference_only)}")
+    elif args.command == "import":
+        failed = False
+        for path in sorted(os.listdir(args.models_dir)):
+            if not path.endswith(".zip"):
+                continue
+            full = os.path.join(args.models_dir, path)
+            name = path[:-len(".zip")]
+            # economy_ppo_<n>_steps.zip (CheckpointCallback naming) carries its step
+            parts = name.split("_")
+            step = int(parts[-2]) if len(parts) > 2 and parts[-1] == "steps" and parts[-2].isdigit() else 0
+            with open(full, "rb") as f:
+                original = f.read()
+            entry = store.put(original, name, step)
+            if not store.matches(name, original):
+                print(f"{name}: stored copy does not rebuild to {path}, keeping the .zip")
+                failed = True
+                continue
+            if not args.keep:
+                os.remove(full)
+            print(f"{name}: {entry['bytes'] / 1e6:.2f} MB, {entry['new_bytes'] / 1e6:.2f} MB new")
+        if failed:
+            sys.exit(1)
+    else:
+        print(f"Removed {store.gc()} unreferenced chunks")
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
+from economy_sim.envs.components.agent_manager import HOUSEHOLD_COLUMNS, FIRM_COLUMNS
+
+# On-disk layout of one run (directory ARCHIVE_DIR/<run_id>/):
+#   meta.json       field names + creation time
+#   macro.f64       one row of MACRO_FIELDS per step
+#   households.f64  one (n_households, len(HOUSEHOLD_FIELDS)) block per step
+#   firms.f64       one (n_firms, len(FIRM_FIELDS)) block per step
+#   index.i64       one INDEX_FIELDS row per step, written last (a step exists once indexed)
+# All files are append-only raw float64/int64, so readers can memory-map them.
+MACRO_FIELDS = ("unemployment", "avg_price", "avg_wage", "tax_revenue", "gdp", "gini",
+                "subsistence_failures", "govt_cash")
+HOUSEHOLD_FIELDS = tuple(HOUSEHOLD_COLUMNS)
+FIRM_FIELDS = tuple(FIRM_COLUMNS)
+INDEX_FIELDS = ("step", "households_offset", "n_households", "firms_offset", "n_firms")
+
+class EpisodeWriter:
+    """
+    Appends one record per step of a run to the archive.
+
+    With an executor (single worker, so records stay in order), append() only
+    copies the step's arrays and the file writes and flushes happen there.
+    """
+
+    def __init__(self, root: str, run_id: Optional[str] = None, executor: Optional[Executor] = None):
+        self.executor = executor
+        now = time.time_ns() // 1000 # Run ids sort by creation time (see run_ids)
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S-", time.localtime(now // 1_000_000)) + f"{now % 1_000_000:06d}"
+        self.path = os.path.join(root, self.run_id)
+        os.makedirs(self.path, exist_ok=True)
+
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({
+                "run_id": self.run_id,
+                "created": time.time(),
+                "macro_fields": MACRO_FIELDS,
+                "household_fields": HOUSEHOLD_FIELDS,
+                "firm_fields": FIRM_FIELDS
+            }, f)
+
+        self._macro = open(os.path.join(self.path, "macro.f64"), "ab")
+        self._households = open(os.path.join(self.path, "households.f64"), "ab")
+        self._firms = open(os.path.join(self.path, "firms.f64"), "ab")
+        self._index = open(os.path.join(self.path, "index.i64"), "ab")
+        self._households_offset = self._households.tell() // 8
+        self._firms_offset = self._firms.tell() // 8
+
+    def append(self, step: int, agent_manager):
+        values = dict(agent_manager.get_market_stats(), govt_cash=agent_manager.govt_cash)
+        macro = np.array([values[k] for k in MACRO_FIELDS], dtype=np.float64)
+        households = np.column_stack([agent_manager.household_column(k).astype(np.float64) for k in HOUSEHOLD_FIELDS])
+        firms = np.column_stack([agent_manager.firm_column(k).astype(np.float64) for k in FIRM_FIELDS])
+        self._submit(self._write, step, macro, households, firms)
+
+    def _submit(self, fn, *args):
+        if self.executor is None:
+            fn(*args)
+        else:
+            self.executor.submit(fn, *args).add_done_callback(_report_failure)
+
+    def _write(self, step: int, macro: np.ndarray, households: np.ndarray, firms: np.ndarray):
+        self._macro.write(macro.tobytes())
+        self._households.write(households.tobytes())
+        self._firms.write(firms.tobytes())
+        for f in (self._macro, self._households, self._firms):
+            f.flush()
+
+        # Index row last: readers only see fully written steps
+        row = np.array([step, self._households_offset, len(households), self._firms_offset, len(firms)], dtype=np.int64)
+        self._index.write(row.tobytes())
+        self._index.flush()
+        self._households_offset += households.size
+        self._firms_offset += firms.size
+
+    def close(self):
+        """Close the files (after any pending background writes)."""
+        self._submit(self._close)
+
+    def _close(self):
+        for f in (self._macro, self._households, self._firms, self._index):
+            f.close()
+
+def _report_failure(future):
+    if future.exception() is not None:
+        print(f"Archive write failed: {future.exception()}")
+
+class EpisodeArchive:
+    """
+    Read-only, memory-mapped view of one archived run.
+
+    frame(step) returns array views straight into the mapped files (no copy, no
+    re-simulation). Maps are refreshed when an ongoing run has grown.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.run_id = self.meta["run_id"]
+        self._n_indexed = -1
+        self._refresh()
+
+    def _map(self, name, dtype):
+        file_path = os.path.join(self.path, name)
+        if os.path.getsize(file_path) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r")
+
+    def _refresh(self):
+        n_indexed = os.path.getsize(os.path.join(self.path, "index.i64")) // (8 * len(INDEX_FIELDS))
+        if n_indexed == self._n_indexed:
+            return
+        self._n_indexed = n_indexed
+        self.index = self._map("index.i64", np.int64)[:n_indexed * len(INDEX_FIELDS)].reshape(n_indexed, len(INDEX_FIELDS))
+        self.macro = self._map("macro.f64", np.float64)[:n_indexed * len(MACRO_FIELDS)].reshape(n_indexed, len(MACRO_FIELDS))
+        self._households = self._map("households.f64", np.float64)
+        self._firms = self._map("firms.f64", np.float64)
+        # Step -> row (steps are increasing within a run)
+        self.steps = self.index[:, 0]
+
+    def __len__(self):
+        self._refresh()
+        return self._n_indexed
+
+    def row_of(self, step: int) -> int:
+        self._refresh()
+        row = int(np.searchsorted(self.steps, step))
+        if row >= len(self.steps) or self.steps[row] != step:
+            raise KeyError(f"Step {step} is not in run {self.run_id}")
+        return row
+
+    def frame(self, step: int) -> Dict:
+        """Macro stats plus (n, fields) household and firm arrays for one step."""
+        row = self.row_of(step)
+        _, h_offset, n_households, f_offset, n_firms = (int(v) for v in self.index[row])
+        households = self._households[h_offset:h_offset + n_households * len(HOUSEHOLD_FIELDS)]
+        firms = self._firms[f_offset:f_offset + n_firms * len(FIRM_FIELDS)]
+        return {
+            "step": step,
+            "macro": dict(zip(MACRO_FIELDS, self.macro[row].tolist())),
+            "households": households.reshape(n_households, len(HOUSEHOLD_FIELDS)),
+            "firms": firms.reshape(n_firms, len(FIRM_FIELDS))
+        }
+
+    def macro_series(self, field: str) -> np.ndarray:
+        """Whole-run series of one macro field (a strided view, no copy)."""
+        self._refresh()
+        return self.macro[:, MACRO_FIELDS.index(field)]
+
+def rows_to_states(array: np.ndarray, fields, columns) -> List[Dict]:
+    """Convert archived (n, fields) rows back to get_state()-style dicts."""
+    casts = {np.bool_: bool, np.int64: int, np.float64: float}
+    converters = [casts[columns[field][1]] for field in fields]
+    return [{field: convert(value) for field, convert, value in zip(fields, converters, row)} for row in array.tolist()]
+
+def run_ids(root: str) -> List[str]:
+    """Archived runs, oldest first (run ids start with their creation time)."""
+    if not os.path.isdir(root):
+        return []
+    return [name for name in sorted(os.listdir(root)) if os.path.exists(os.path.join(root, name, "meta.json"))]
+
+def _step_bounds(path: str):
+    """(n_steps, first_step, last_step) from the index file alone, without mapping the run."""
+    row_bytes = 8 * len(INDEX_FIELDS)
+    with open(os.path.join(path, "index.i64"), "rb") as f:
+        n_steps = os.fstat(f.fileno()).st_size // row_bytes
+        if n_steps == 0:
+            return 0, None, None
+        first = int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+        f.seek((n_steps - 1) * row_bytes)
+        last = int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+    return n_steps, first, last
+
+def list_runs(root: str) -> List[Dict]:
+    runs = []
+    for run_id in run_ids(root):
+        n_steps, first_step, last_step = _step_bounds(os.path.join(root, run_id))
+        runs.append({"run_id": run_id, "n_steps": n_steps, "first_step": first_step, "last_step": last_step})
+    return runs
+
+def prune_runs(root: str, keep: int) -> List[str]:
+    """Delete all but the newest `keep` runs (with their ledgers); returns the deleted run ids."""
+    old = run_ids(root)[:-max(1, keep)]
+    for run_id in old:
+        shutil.rmtree(os.path.join(root, run_id), ignore_errors=True)
+    return old
@@ -0,0 +1,22 @@
+import numpy as np
+from typing import Iterator, Optional, Tuple
+from economy_sim.config import EPISODE_LENGTH, RANDOM_SEED, AUDIT_ACTION
+from economy_sim.envs.economy_env import EconomyEnv
+
+def fixed_action_episode(seed: int = RANDOM_SEED, action=AUDIT_ACTION, episode_length: int = EPISODE_LENGTH,
+                         cohort_population: Optional[int] = None, **env_kwargs) -> Iterator[Tuple[EconomyEnv, callable]]:
+    """
+    One seeded episode under a fixed action, for the audit tools (precision_check,
+    ledger_audit). Yields (env, step) once per month; the caller inspects the
+    env, calls step() and inspects it again:
+
+        for env, step in fixed_action_episode(seed):
+            before = env.agent_manager.money_supply()
+            step()
+    """
+    env = EconomyEnv(cohort_population=cohort_population, **env_kwargs)
+    env.reset(seed=seed)
+    action = np.asarray(action, dtype=np.float32)
+    step = lambda: env.step(action)
+    for _ in range(episode_length):
+        yield env, step
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import numpy as np
+from typing import Callable, Dict, Optional
+from economy_sim.config import GOLDEN_DIR, GOLDEN_SEEDS, GOLDEN_STEPS, GOLDEN_RTOL, GOLDEN_ATOL
+from economy_sim.envs.economy_env import action_to_tax_rates
+from economy_sim.envs.components.agent_manager import AgentManager, HOUSEHOLD_COLUMNS, FIRM_COLUMNS, PHASES
+from economy_sim.utils.episode_archive import MACRO_FIELDS, HOUSEHOLD_FIELDS, FIRM_FIELDS
+
+# Golden files: GOLDEN_DIR/manifest.json + one seed_<seed>.npz per case holding the
+# action sequence and, for every step, macro stats, household and firm state (float64)
+# plus a sha256 of the three arrays (equal hashes = bit-identical step).
+TABLES = (("macro", MACRO_FIELDS), ("households", HOUSEHOLD_FIELDS), ("firms", FIRM_FIELDS))
+
+# Backend name -> factory(seed) returning an AgentManager-compatible object.
+# Anything else is looked up as "module:callable".
+BACKENDS: Dict[str, Callable] = {
+    "reference": lambda seed: AgentManager(seed=seed),
+    "float32": lambda seed: AgentManager(seed=seed, float32_probe=True), # Precision probe, see _round_to_float32
+}
+
+def load_backend(name: str) -> Callable:
+    if name in BACKENDS:
+        return BACKENDS[name]
+    if ":" not in name:
+        raise ValueError(f"Unknown backend '{name}' (use one of {sorted(BACKENDS)} or module:callable)")
+    module, attr = name.split(":", 1)
+    return getattr(importlib.import_module(module), attr)
+
+def case_actions(seed: int, steps: int) -> np.ndarray:
+    """The fixed, seeded action sequence of a case (normalized, like the env's actions)."""
+    return np.random.default_rng([seed, steps]).random((steps, 3)).astype(np.float32)
+
+def capture(manager) -> Dict[str, np.ndarray]:
+    """State after a step, through the public column views."""
+    values = dict(manager.get_market_stats(), govt_cash=manager.govt_cash)
+    return {
+        "macro": np.array([values[k] for k in MACRO_FIELDS], dtype=np.float64),
+        "households": np.column_stack([manager.household_column(k).astype(np.float64) for k in HOUSEHOLD_FIELDS]),
+        "firms": np.column_stack([manager.firm_column(k).astype(np.float64) for k in FIRM_FIELDS])
+    }
+
+def capture_live(manager) -> Dict[str, np.ndarray]:
+    """State in the middle of a step (column views are only refreshed between steps)."""
+    def table(agents, columns, fields):
+        return np.array([[columns[k][0](a) for k in fields] for a in agents], dtype=np.float64).reshape(len(agents), len(fields))
+    values = dict(manager.get_market_stats(), govt_cash=manager.govt_cash)
+    return {
+        "macro": np.array([values[k] for k in MACRO_FIELDS], dtype=np.float64),
+        "households": table(manager.households, HOUSEHOLD_COLUMNS, HOUSEHOLD_FIELDS),
+        "firms": table(manager.firms, FIRM_COLUMNS, FIRM_FIELDS)
+    }
+
+def state_hash(state: Dict[str, np.ndarray]) -> str:
+    digest = hashlib.sha256()
+    for name, _ in TABLES:
+        digest.update(np.ascontiguousarray(state[name]).tobytes())
+    return digest.hexdigest()
+
+def first_mismatch(expected: Dict[str, np.ndarray], actual: Dict[str, np.ndarray],
+                   rtol: float, atol: float) -> Optional[Dict]:
+    """First table/agent/field outside tolerance (agents in id order), or None."""
+    for name, fields in TABLES:
+        want, got = expected[name], actual[name]
+        if want.shape != got.shape:
+            return {"table": name, "problem": f"shape {got.shape}, expected {want.shape}"}
+        bad = ~np.isclose(got, want, rtol=rtol, atol=atol, equal_nan=True)
+        if not bad.any():
+            continue
+        if name == "macro":
+            column = int(np.flatnonzero(bad)[0])
+            return {"table": name, "field": fields[column],
+                    "expected": float(want[column]), "actual": float(got[column])}
+        row = int(np.flatnonzero(bad.any(axis=1))[0])
+        column = int(np.argmax(np.abs(got[row] - want[row]) * bad[row]))
+        return {"table": name, "agent": int(want[row, fields.index("id")]), "field": fields[column],
+                "expected": float(want[row, column]), "actual": float(got[row, column])}
+    return None
+
+def record(path: str = GOLDEN_DIR, seeds=GOLDEN_SEEDS, steps: int = GOLDEN_STEPS, backend: str = "reference") -> Dict:
+    """Run the backend (the reference by default) on every case and write the golden files."""
+    factory = load_backend(backend)
+    os.makedirs(path, exist_ok=True)
+    cases = []
+    for seed in seeds:
+        manager = factory(seed)
+        actions = case_actions(seed, steps)
+        states = {name: [] for name, _ in TABLES}
+        hashes = []
+        for t in range(steps):
+            manager.step(action_to_tax_rates(actions[t]))
+            state = capture(manager)
+            for name, _ in TABLES:
+                states[name].append(state[name])
+            hashes.append(state_hash(state))
+
+        file_name = f"seed_{seed}.npz"
+        np.savez_compressed(os.path.join(path, file_name), seed=seed, actions=actions,
+                            hashes=np.array(hashes), **{name: np.stack(rows) for name, rows in states.items()})
+        cases.append({"seed": seed, "file": file_name, "steps": steps, "final_hash": hashes[-1]})
+
+    manifest = {
+        "backend": backend,
+        "created": time.time(),
+        "macro_fields": MACRO_FIELDS,
+        "household_fields": HOUSEHOLD_FIELDS,
+        "firm_fields": FIRM_FIELDS,
+        "cases": cases
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def locate_phase(factory: Callable, seed: int, actions: np.ndarray, step: int, rtol: float, atol: float) -> Dict:
+    """
+    Replay both the reference and the backend up to `step` (0-based) and compare
+    them after every phase of that step, returning the first phase that differs.
+    Backends without phase_hook support are reported with phase None.
+    """
+    reference, candidate = AgentManager(seed=seed), factory(seed)
+    for t in range(step):
+        reference.step(action_to_tax_rates(actions[t]))
+        candidate.step(action_to_tax_rates(actions[t]))
+
+    phases = {"reference": {}, "candidate": {}}
+    for label, manager in (("reference", reference), ("candidate", candidate)):
+        if hasattr(manager, "phase_hook"):
+            manager.phase_hook = lambda phase, m, seen=phases[label]: seen.__setitem__(phase, capture_live(m))
+        manager.step(action_to_tax_rates(actions[step]))
+
+    for phase in PHASES:
+        if phase not in phases["candidate"]:
+            return {"phase": None}
+        mismatch = first_mismatch(phases["reference"][phase], phases["candidate"][phase], rtol, atol)
+        if mismatch:
+            return {"phase": phase, **mismatch}
+    # Every phase matched: the difference comes from end-of-step bookkeeping (e.g. float32 storage)
+    return {"phase": "end_of_step"}
+
+def check(backend: str, path: str = GOLDEN_DIR, rtol: float = GOLDEN_RTOL, atol: float = GOLDEN_ATOL) -> Dict:
+    """Run a backend on every golden case and report the first divergence of each."""
+    factory = load_backend(backend)
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    results = []
+    for case in manifest["cases"]:
+        golden = np.load(os.path.join(path, case["file"]))
+        seed, actions, hashes = int(golden["seed"]), golden["actions"], golden["hashes"]
+        manager = factory(seed)
+        exact, divergence = True, None
+        for t in range(len(actions)):
+            manager.step(action_to_tax_rates(actions[t]))
+            state = capture(manager)
+            exact = exact and state_hash(state) == hashes[t]
+            mismatch = first_mismatch({name: golden[name][t] for name, _ in TABLES}, state, rtol, atol)
+            if mismatch:
+                divergence = {"step": t + 1, **mismatch}
+                divergence["located"] = locate_phase(factory, seed, actions, t, rtol, atol)
+                break
+        status = "diverged" if divergence else ("bit-identical" if exact else "within tolerance")
+        results.append({"seed": seed, "status": status, "divergence": divergence})
+
+    return {"backend": backend, "golden": path, "rtol": rtol, "atol": atol, "cases": results}
+
+def print_report(report: Dict):
+    print(f"Backend '{report['backend']}' vs {report['golden']} (rtol {report['rtol']:g}, atol {report['atol']:g})")
+    for case in report["cases"]:
+        print(f"  seed {case['seed']}: {case['status']}")
+        d = case["divergence"]
+        if d:
+            where = f"agent {d['agent']} " if "agent" in d else ""
+            what = d.get("problem") or f"{d['field']} = {d['actual']:.10g}, expected {d['expected']:.10g}"
+            print(f"    first divergence after step {d['step']}: {d['table']} {where}{what}")
+            located = d["located"]
+            if located.get("phase") in (None, "end_of_step"):
+                print(f"    phase: {located.get('phase') or 'unknown (backend has no phase hooks)'}")
+            else:
+                where = f"agent {located['agent']} " if "agent" in located else ""
+                what = located.get("problem") or f"{located['field']} = {located['actual']:.10g}, expected {located['expected']:.10g}"
+                print(f"    phase: {located['phase']} ({located['table']} {where}{what})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Golden-trajectory equivalence harness for simulation backends")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="Write golden files from the reference AgentManager")
+    record_parser.add_argument("--seeds", type=int, nargs="+", default=list(GOLDEN_SEEDS))
+    record_parser.add_argument("--steps", type=int, default=GOLDEN_STEPS)
+    record_parser.add_argument("--path", default=GOLDEN_DIR)
+    check_parser = commands.add_parser("check", help="Compare a backend against the golden files")
+    check_parser.add_argument("--backend", default="reference", help=f"{sorted(BACKENDS)} or module:callable")
+    check_parser.add_argument("--path", default=GOLDEN_DIR)
+    check_parser.add_argument("--rtol", type=float, default=GOLDEN_RTOL)
+    check_parser.add_argument("--atol", type=float, default=GOLDEN_ATOL)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        manifest = record(args.path, args.seeds, args.steps)
+        print(f"Recorded {len(manifest['cases'])} golden cases of {args.steps} steps in {args.path}")
+    else:
+        report = check(args.backend, args.path, args.rtol, args.atol)
+        print_report(report)
+        sys.exit(1 if any(case["status"] == "diverged" for case in report["cases"]) else 0)
@@ -0,0 +1,62 @@
+import sys
+import argparse
+import numpy as np
+from typing import Dict, Optional
+from economy_sim.config import EPISODE_LENGTH, RANDOM_SEED, AUDIT_ACTION
+from economy_sim.envs.components.ledger import LEDGER_KINDS, MONEY_SOURCES, conservation_errors
+from economy_sim.utils.fixed_episode import fixed_action_episode
+
+def audit_episode(seed: int = RANDOM_SEED, action=AUDIT_ACTION, episode_length: int = EPISODE_LENGTH,
+                  cohort_population: Optional[int] = None, max_problems: int = 20) -> Dict:
+    """
+    Run one episode and check every step's ledger rows against the account
+    balances before and after it. Returns per-kind totals over the episode,
+    the money printed, and the first problems found (empty if money was
+    conserved everywhere except at the printing points).
+    """
+    totals = np.zeros(len(LEDGER_KINDS))
+    rows = 0
+    problems = []
+    for env, step in fixed_action_episode(seed, action, episode_length, cohort_population):
+        manager = env.agent_manager
+        before = manager.account_balances()
+        step()
+        step_rows = manager.ledger.step_rows()
+        rows += len(step_rows["amount"])
+        totals += manager.ledger.totals
+        if len(problems) < max_problems:
+            problems += [f"step {env.current_step}: {p}"
+                         for p in conservation_errors(step_rows, before, manager.account_balances())]
+
+    kind_totals = dict(zip(LEDGER_KINDS, totals.tolist()))
+    return {
+        "seed": seed,
+        "episode_length": episode_length,
+        "rows": rows,
+        "totals": kind_totals,
+        "printed": sum(kind_totals[k] for k in MONEY_SOURCES),
+        "problems": problems[:max_problems]
+    }
+
+def print_report(report: Dict):
+    print(f"Ledger audit over {report['episode_length']} steps (seed {report['seed']}): {report['rows']} rows")
+    for kind, total in report["totals"].items():
+        print(f"  {kind:<18}{total:>16.2f}")
+    print(f"Money printed: {report['printed']:.2f}")
+    if report["problems"]:
+        print("Conservation FAILED:")
+        for problem in report["problems"]:
+            print(f"  {problem}")
+    else:
+        print("Money conserved at every step (outside the printing points)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check money conservation against the flow ledger")
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    parser.add_argument("--steps", type=int, default=EPISODE_LENGTH)
+    parser.add_argument("--cohort-population", type=int, default=None)
+    args = parser.parse_args()
+
+    report = audit_episode(seed=args.seed, episode_length=args.steps, cohort_population=args.cohort_population)
+    print_report(report)
+    sys.exit(1 if report["problems"] else 0)
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import subprocess
+import urllib.request
+import json
+from economy_sim.config import (
+    STARTUP_IMPORT_BUDGET_S,
+    STARTUP_LISTEN_BUDGET_S,
+    STARTUP_READY_BUDGET_S
+)
+
+SERVER_MODULE = "economy_sim.utils.api_server"
+
+def profile_imports(module: str = SERVER_MODULE, top: int = 15):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    Returns (total_seconds, [(cumulative_seconds, module_name), ...] slowest first).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        timings.append((int(parts[1]) / 1e6, parts[2].strip()))
+
+    # The requested module is the last top-level entry; its cumulative time is the total
+    total = next((t for t, name in reversed(timings) if name == module), 0.0)
+    slowest = sorted(timings, reverse=True)[:top]
+    return total, slowest
+
+def profile_server_startup(port: int = 8765, timeout: float = 120.0):
+    """
+    Launch the API server and poll /ready.
+    Returns (seconds_until_listening, seconds_until_ready) (None if not reached).
+    """
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", SERVER_MODULE, "--port", str(port)],
+        cwd=os.getcwd(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    listening = None
+    ready = None
+    try:
+        while time.perf_counter() - start < timeout and server.poll() is None:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1.0) as response:
+                    state = json.loads(response.read())
+                if listening is None:
+                    listening = time.perf_counter() - start
+                if state.get("ready") or state.get("error"):
+                    ready = time.perf_counter() - start
+                    break
+            except OSError:
+                pass # Not listening yet
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait()
+    return listening, ready
+
+def run_startup_check(include_server: bool = True) -> bool:
+    """Print the slowest imports and startup timings. Returns True if all budgets are met."""
+    ok = True
+
+    total, slowest = profile_imports()
+    print(f"Import {SERVER_MODULE}: {total:.3f}s (budget {STARTUP_IMPORT_BUDGET_S:.1f}s)")
+    print("Slowest imports (cumulative):")
+    for seconds, name in slowest:
+        print(f"  {seconds:8.3f}s  {name}")
+    if total > STARTUP_IMPORT_BUDGET_S:
+        print(">> Import budget exceeded")
+        ok = False
+
+    if include_server:
+        listening, ready = profile_server_startup()
+        for label, value, budget in (("listening", listening, STARTUP_LISTEN_BUDGET_S),
+                                     ("ready", ready, STARTUP_READY_BUDGET_S)):
+            if value is None:
+                print(f"Server {label}: not reached (budget {budget:.1f}s)")
+                ok = False
+            else:
+                print(f"Server {label}: {value:.3f}s (budget {budget:.1f}s)")
+                if value > budget:
+                    print(f">> {label.capitalize()} budget exceeded")
+                    ok = False
+
+    print("Startup budget check " + ("passed" if ok else "FAILED"))
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if run_startup_check() else 1)
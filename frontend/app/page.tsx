@@ -8,6 +8,7 @@ import { ControlPanel } from "@/components/dashboard/ControlPanel";
 import { Charts } from "@/components/dashboard/Charts";
 import { FirmsTable } from "@/components/dashboard/FirmsTable";
 import { HouseholdsTable } from "@/components/dashboard/HouseholdsTable";
+import { TrainingPanel, TrainingMessage } from "@/components/dashboard/TrainingPanel";
 
 // Types for our data
 interface SimulationData {
@@ -49,6 +50,17 @@ interface SimulationData {
     subsistence_failed: boolean;
     contract_remaining: number;
   }>;
+  households_summary?: {
+    total: number;
+    employed: number;
+    avg_skill: number;
+    avg_reservation_wage: number;
+    avg_contract_remaining: number;
+    poverty_rate: number;
+    avg_cash: number;
+    avg_wage: number;
+  };
+  macro?: Record<string, number>; // Rolling macro features (MACRO_DASHBOARD_FEATURES)
 }
 
 export default function Dashboard() {
@@ -56,6 +68,7 @@ export default function Dashboard() {
   const [history, setHistory] = useState<SimulationData[]>([]);
   const [isConnected, setIsConnected] = useState(false);
   const [isRunning, setIsRunning] = useState(false);
+  const [training, setTraining] = useState<TrainingMessage[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
 
   const [speed, setSpeed] = useState(1.0);
@@ -98,10 +111,25 @@ export default function Dashboard() {
       ws.onopen = () => {
         console.log('Connected to Simulation Server');
         setIsConnected(true);
+        // Catch up on the training run (if any); new iterations arrive over the socket
+        fetch('http://localhost:8000/training')
+          .then(res => res.json())
+          .then(res => setTraining(res.messages))
+          .catch(err => console.error("Failed to fetch training telemetry", err));
       };
 
       ws.onmessage = (event) => {
         const newData: SimulationData = JSON.parse(event.data);
+        // Typed messages (errors, branch results, ...) are not simulation frames
+        const messageType = (newData as any).type;
+        if (messageType) {
+          if (messageType === 'error') console.error('Simulation server:', (newData as any).message);
+          else if (messageType === 'training') {
+            setTraining(prev => [...prev.slice(-199), newData as unknown as TrainingMessage]);
+          }
+          else console.log('Simulation server:', messageType, newData);
+          return;
+        }
         setData(newData);
         setHistory(prev => {
           const newHistory = [...prev, newData];
@@ -225,7 +253,17 @@ export default function Dashboard() {
                 <h2 className="text-2xl font-bold text-slate-200">Households Demographics</h2>
                 <p className="text-slate-400">Population wealth distribution, employment status, and skill levels.</p>
               </div>
-              <HouseholdsTable households={data.households} />
+              <HouseholdsTable households={data.households} summary={data.households_summary} />
+            </div>
+          )}
+
+          {activeView === 'training' && (
+            <div className="animate-in fade-in duration-500">
+              <div className="mb-6">
+                <h2 className="text-2xl font-bold text-slate-200">Agent Training</h2>
+                <p className="text-slate-400">Live PPO rollout statistics streamed from the training process.</p>
+              </div>
+              <TrainingPanel messages={training} />
             </div>
           )}
         </main>
@@ -2,17 +2,33 @@ import React from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
 
+interface HouseholdsSummary {
+    total: number;
+    employed: number;
+    avg_skill: number;
+    avg_reservation_wage: number;
+    avg_contract_remaining: number;
+    poverty_rate: number;
+    avg_cash: number;
+    avg_wage: number;
+}
+
 interface HouseholdsTableProps {
     households: any[];
+    summary?: HouseholdsSummary;
 }
 
-export function HouseholdsTable({ households }: HouseholdsTableProps) {
-    // Calculate summary stats
-    const total = households.length;
-    const employed = households.filter(h => h.employed).length;
+export function HouseholdsTable({ households, summary }: HouseholdsTableProps) {
+    // Summary stats come from the server (the table itself is only a window of the population)
+    const total = summary ? summary.total : households.length;
+    const employed = summary ? summary.employed : households.filter(h => h.employed).length;
     const unemployed = total - employed;
-    const avgSkill = households.reduce((acc, h) => acc + h.skill, 0) / total;
-    const avgResWage = households.reduce((acc, h) => acc + h.reservation_wage, 0) / total;
+    const avgSkill = summary ? summary.avg_skill : households.reduce((acc, h) => acc + h.skill, 0) / total;
+    const avgResWage = summary ? summary.avg_reservation_wage : households.reduce((acc, h) => acc + h.reservation_wage, 0) / total;
+    const avgContract = summary ? summary.avg_contract_remaining : households.filter(h => h.employed).reduce((acc, h) => acc + h.contract_remaining, 0) / (employed || 1);
+    const povertyRate = summary ? summary.poverty_rate : households.filter(h => h.subsistence_failed).length / total;
+    const avgCash = summary ? summary.avg_cash : households.reduce((acc, h) => acc + h.cash, 0) / total;
+    const avgWage = summary ? summary.avg_wage : households.filter(h => h.employed).reduce((acc, h) => acc + h.wage, 0) / (employed || 1);
 
     return (
         <div className="space-y-4">
@@ -40,25 +56,25 @@ export function HouseholdsTable({ households }: HouseholdsTableProps) {
                 <Card className="bg-slate-900 border-slate-800 p-4">
                     <div className="text-sm text-slate-400">Avg Job Security</div>
                     <div className="text-2xl font-bold text-blue-400">
-                        {(households.filter(h => h.employed).reduce((acc, h) => acc + h.contract_remaining, 0) / (employed || 1)).toFixed(1)} mo
+                        {avgContract.toFixed(1)} mo
                     </div>
                 </Card>
                 <Card className="bg-slate-900 border-slate-800 p-4">
                     <div className="text-sm text-slate-400">Poverty Rate</div>
                     <div className="text-2xl font-bold text-red-400">
-                        {((households.filter(h => h.subsistence_failed).length / total) * 100).toFixed(1)}%
+                        {(povertyRate * 100).toFixed(1)}%
                     </div>
                 </Card>
                 <Card className="bg-slate-900 border-slate-800 p-4">
                     <div className="text-sm text-slate-400">Avg Household Wealth</div>
                     <div className="text-2xl font-bold text-green-400">
-                        ${(households.reduce((acc, h) => acc + h.cash, 0) / total).toFixed(0)}
+                        ${avgCash.toFixed(0)}
                     </div>
                 </Card>
                 <Card className="bg-slate-900 border-slate-800 p-4">
                     <div className="text-sm text-slate-400">Avg Real Wage</div>
                     <div className="text-2xl font-bold text-yellow-400">
-                        ${(households.filter(h => h.employed).reduce((acc, h) => acc + h.wage, 0) / (employed || 1)).toFixed(0)}
+                        ${avgWage.toFixed(0)}
                     </div>
                 </Card>
             </div>
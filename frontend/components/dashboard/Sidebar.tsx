@@ -1,5 +1,5 @@
 import React from 'react';
-import { LayoutDashboard, Building2, Users, Settings, BookOpen, Activity } from 'lucide-react';
+import { LayoutDashboard, Building2, Users, Settings, BookOpen, Activity, BrainCircuit } from 'lucide-react';
 import { Button } from "@/components/ui/button";
 
 interface SidebarProps {
@@ -12,6 +12,7 @@ export function Sidebar({ activeView, onViewChange }: SidebarProps) {
         { id: 'overview', label: 'Overview', icon: LayoutDashboard },
         { id: 'firms', label: 'Firms Market', icon: Building2 },
         { id: 'households', label: 'Households', icon: Users },
+        { id: 'training', label: 'Training', icon: BrainCircuit },
         // { id: 'settings', label: 'Settings', icon: Settings },
         // { id: 'docs', label: 'Documentation', icon: BookOpen },
     ];
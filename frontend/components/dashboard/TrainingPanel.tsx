@@ -0,0 +1,123 @@
+import React from 'react';
+import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
+import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
+import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
+
+export interface TrainingMessage {
+    run: string;
+    iteration: number;
+    timesteps: number;
+    fps: number;
+    rollout_seconds: number;
+    update_seconds: number;
+    episodes: number;
+    episode_return_mean: number | null;
+    macro: { gdp: number; unemployment: number; tax_revenue: number };
+    train: Record<string, number>;
+}
+
+interface TrainingPanelProps {
+    messages: TrainingMessage[];
+}
+
+export function TrainingPanel({ messages }: TrainingPanelProps) {
+    if (messages.length === 0) {
+        return (
+            <Card className="bg-slate-900 border-slate-800 p-6 text-slate-400">
+                No training run is reporting. Start one with <code className="text-slate-200">python -m economy_sim.training.train_ppo</code>.
+            </Card>
+        );
+    }
+
+    const latest = messages[messages.length - 1];
+    const run = messages.filter((m) => m.run === latest.run);
+
+    return (
+        <div className="space-y-4">
+            <div className="grid grid-cols-4 gap-4">
+                <Card className="bg-slate-900 border-slate-800 p-4">
+                    <div className="text-sm text-slate-400">Timesteps</div>
+                    <div className="text-2xl font-bold text-blue-400">{latest.timesteps.toLocaleString()}</div>
+                </Card>
+                <Card className="bg-slate-900 border-slate-800 p-4">
+                    <div className="text-sm text-slate-400">FPS</div>
+                    <div className="text-2xl font-bold text-green-400">{latest.fps.toFixed(0)}</div>
+                </Card>
+                <Card className="bg-slate-900 border-slate-800 p-4">
+                    <div className="text-sm text-slate-400">Rollout / Update</div>
+                    <div className="text-2xl font-bold text-yellow-400">
+                        {latest.rollout_seconds.toFixed(1)}s / {latest.update_seconds.toFixed(1)}s
+                    </div>
+                </Card>
+                <Card className="bg-slate-900 border-slate-800 p-4">
+                    <div className="text-sm text-slate-400">Episode Return</div>
+                    <div className="text-2xl font-bold text-slate-200">
+                        {latest.episode_return_mean === null ? '-' : latest.episode_return_mean.toFixed(1)}
+                    </div>
+                </Card>
+            </div>
+
+            <Card className="bg-slate-900 border-slate-800 flex flex-col h-[350px]">
+                <CardHeader>
+                    <CardTitle className="text-slate-200">Run {latest.run}</CardTitle>
+                </CardHeader>
+                <CardContent className="flex-1 min-h-0">
+                    <ResponsiveContainer width="100%" height="100%">
+                        <LineChart data={run}>
+                            <CartesianGrid strokeDasharray="3 3" stroke="#1e293b" />
+                            <XAxis dataKey="timesteps" stroke="#475569" />
+                            <YAxis yAxisId="left" stroke="#4ade80" />
+                            <YAxis yAxisId="right" orientation="right" stroke="#f87171" />
+                            <Tooltip
+                                contentStyle={{ backgroundColor: '#0f172a', borderColor: '#1e293b' }}
+                                itemStyle={{ color: '#e2e8f0' }}
+                            />
+                            <Line yAxisId="left" type="monotone" dataKey="episode_return_mean" stroke="#4ade80" strokeWidth={2} dot={false} name="Episode Return" connectNulls />
+                            <Line yAxisId="right" type="monotone" dataKey="macro.unemployment" stroke="#ef4444" strokeWidth={2} dot={false} name="Unemployment" />
+                        </LineChart>
+                    </ResponsiveContainer>
+                </CardContent>
+            </Card>
+
+            <Card className="bg-slate-900 border-slate-800">
+                <CardHeader>
+                    <CardTitle className="text-slate-200">Iterations</CardTitle>
+                </CardHeader>
+                <CardContent className="max-h-[400px] overflow-y-auto">
+                    <Table>
+                        <TableHeader>
+                            <TableRow className="border-slate-800 hover:bg-slate-900">
+                                <TableHead className="text-slate-400">Iteration</TableHead>
+                                <TableHead className="text-slate-400">Timesteps</TableHead>
+                                <TableHead className="text-slate-400">FPS</TableHead>
+                                <TableHead className="text-slate-400">Rollout</TableHead>
+                                <TableHead className="text-slate-400">Update</TableHead>
+                                <TableHead className="text-slate-400">Return</TableHead>
+                                <TableHead className="text-slate-400">Unemployment</TableHead>
+                                <TableHead className="text-slate-400">Loss</TableHead>
+                            </TableRow>
+                        </TableHeader>
+                        <TableBody>
+                            {[...run].reverse().map((m) => (
+                                <TableRow key={m.iteration} className="border-slate-800 hover:bg-slate-800">
+                                    <TableCell className="font-medium text-slate-200">{m.iteration}</TableCell>
+                                    <TableCell className="text-slate-300">{m.timesteps.toLocaleString()}</TableCell>
+                                    <TableCell className="text-slate-300">{m.fps.toFixed(0)}</TableCell>
+                                    <TableCell className="text-slate-300">{m.rollout_seconds.toFixed(2)}s</TableCell>
+                                    <TableCell className="text-slate-300">{m.update_seconds.toFixed(2)}s</TableCell>
+                                    <TableCell className="text-slate-300">
+                                        {m.episode_return_mean === null ? '-' : m.episode_return_mean.toFixed(1)}
+                                    </TableCell>
+                                    <TableCell className="text-slate-300">{(m.macro.unemployment * 100).toFixed(1)}%</TableCell>
+                                    <TableCell className="text-slate-300">
+                                        {m.train['train/loss'] === undefined ? '-' : m.train['train/loss'].toFixed(3)}
+                                    </TableCell>
+                                </TableRow>
+                            ))}
+                        </TableBody>
+                    </Table>
+                </CardContent>
+            </Card>
+        </div>
+    );
+}